@@ -0,0 +1,36 @@
+"""
+Scaling of batch_derivative over a process pool on a physics-formula corpus.
+
+    python benchmarks/bench_batch.py
+"""
+import os
+import time
+
+from generators import physics_corpus
+from mathphysicslib.ast_parser import clear_parse_cache
+from mathphysicslib.core import batch_derivative, derivative
+
+
+def main(count=4000):
+    corpus = physics_corpus(count, size=6)
+    path = {"v": 2, "m": 1}
+
+    clear_parse_cache()   # every run parses the corpus from scratch (workers inherit the cache)
+    start = time.perf_counter()
+    serial = [derivative(s, path) for s in corpus]
+    t_serial = time.perf_counter() - start
+
+    cores = os.cpu_count() or 1
+    print(f"{count} formulas, d^3/dv^2 dm, {cores} cores")
+    print(f"  plain loop    {t_serial * 1e3:9.1f} ms")
+    for workers in sorted({1, 2, 4, cores}):
+        clear_parse_cache()
+        start = time.perf_counter()
+        results = batch_derivative(corpus, path, workers=workers)
+        elapsed = time.perf_counter() - start
+        assert results == serial
+        print(f"  workers={workers:<4d} {elapsed * 1e3:9.1f} ms   speedup {t_serial / elapsed:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
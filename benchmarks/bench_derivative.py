@@ -0,0 +1,52 @@
+"""
+High-order and mixed derivatives of nested polynomials.
+
+Times core.derivative (one memo shared along the whole path) against
+differentiating each step with a fresh memo.
+
+    python benchmarks/bench_derivative.py
+"""
+import time
+
+from generators import nested_polynomial
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.autodiff import gradient
+from mathphysicslib.core import derivative, normalize_respect_to
+from mathphysicslib.rules import differentiate
+
+
+def fresh_memo_derivative(expr, respect_to, order=1):
+    for var in normalize_respect_to(respect_to, order):
+        expr = differentiate(expr, var)
+    return expr
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    cases = [
+        ("d^10/dx^10, depth 3", nested_polynomial(3), "x", 10),
+        ("d^10/dx^10, depth 4", nested_polynomial(4), "x", 10),
+        ("{x: 3, y: 2}, depth 4", nested_polynomial(4), {"x": 3, "y": 2}, 1),
+    ]
+    for name, expr, respect_to, order in cases:
+        shared, t_shared = timed(derivative, expr, respect_to, order)
+        fresh, t_fresh = timed(fresh_memo_derivative, expr, respect_to, order)
+        assert shared == fresh
+        print(f"{name:<24} shared memo {t_shared * 1e3:9.1f} ms   fresh memo {t_fresh * 1e3:9.1f} ms")
+
+    # Gradient of a many-variable expression: one reverse sweep vs one derivative per variable
+    names = [f"q{i}" for i in range(40)]
+    lagrangian = parse_to_func(" + ".join(f"{a}**2*{b} + {a}*{b}" for a, b in zip(names, names[1:])))
+    swept, t_sweep = timed(gradient, lagrangian, names)
+    each, t_each = timed(lambda: [derivative(lagrangian, v) for v in names])
+    assert swept == each
+    print(f"{'gradient, 40 variables':<24} one sweep   {t_sweep * 1e3:9.1f} ms   per variable {t_each * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Memory retained by a parsed formula corpus, with and without interning.
+
+    python benchmarks/bench_interning.py
+"""
+import time
+import tracemalloc
+
+from generators import formula_corpus
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import interning
+
+def measure(sources, intern):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if intern:
+        with interning():
+            trees = [parse_to_func(s, cache=False) for s in sources]
+    else:
+        trees = [parse_to_func(s, cache=False) for s in sources]
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del trees
+    return retained, elapsed
+
+
+def main():
+    sources = formula_corpus()
+    plain, t_plain = measure(sources, intern=False)
+    shared, t_shared = measure(sources, intern=True)
+    print(f"{len(sources)} formulas")
+    print(f"  plain     {plain / 2**20:8.2f} MiB  {t_plain * 1e3:8.1f} ms")
+    print(f"  interned  {shared / 2**20:8.2f} MiB  {t_shared * 1e3:8.1f} ms")
+    print(f"  memory ratio {plain / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Set and dict workloads on deep expression trees.
+
+Compares the cached key()/__hash__ of the Expr nodes against a reference that
+rebuilds and re-sorts the whole key tuple on every call (the old behaviour).
+
+    python benchmarks/bench_keys.py
+"""
+import time
+
+from mathphysicslib.expresso import Add, Mul, Pow, Var, Constant
+
+
+def recursive_key(expr):
+    # Reference: recompute the canonical key from scratch, like the uncached nodes did
+    if isinstance(expr, (Constant, Var)):
+        return expr.key()
+    if isinstance(expr, Pow):
+        return ("Pow", recursive_key(expr.base), recursive_key(expr.exponent))
+    children = expr.terms if isinstance(expr, Add) else expr.factors
+    tag, identity = ("Add", 0) if isinstance(expr, Add) else ("Mul", 1)
+    consts = [c.value for c in children if isinstance(c, Constant)]
+    rest = tuple(sorted(recursive_key(c) for c in children if not isinstance(c, Constant)))
+    return (tag, rest, consts[0] if consts else identity)
+
+
+def deep_tree(depth, seed=0):
+    x, y = Var("x"), Var("y")
+    expr = Add(x, seed)
+    for i in range(depth):
+        expr = Add(Mul(expr, y, i + 2), Pow(x, i + 1))
+    return expr
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(depth=150, count=200):
+    trees = [deep_tree(depth, seed) for seed in range(count)]
+    probes = [deep_tree(depth, seed) for seed in range(count)]  # equal, but distinct objects
+
+    def cached_set():
+        s = set(trees)
+        assert all(p in s for p in probes)
+
+    def cached_dict():
+        d = {t: i for i, t in enumerate(trees)}
+        assert all(d[p] == i for i, p in enumerate(probes))
+
+    def recomputed_set():
+        s = {hash(recursive_key(t)) for t in trees}
+        assert all(hash(recursive_key(p)) in s for p in probes)
+
+    def recomputed_dict():
+        d = {recursive_key(t): i for i, t in enumerate(trees)}
+        assert all(d[recursive_key(p)] == i for i, p in enumerate(probes))
+
+    print(f"{count} trees of depth {depth}")
+    for name, fn in [("set (cached)", cached_set), ("set (recomputed)", recomputed_set),
+                     ("dict (cached)", cached_dict), ("dict (recomputed)", recomputed_dict)]:
+        print(f"  {name:<20} {timed(fn) * 1e3:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Per-node memory and construction throughput on large generated trees.
+
+    python benchmarks/bench_nodes.py
+"""
+import time
+import tracemalloc
+
+from generators import random_tree
+from mathphysicslib.expresso import Add, Mul, Pow, Var, variadic_flatten
+
+
+def count_nodes(expr):
+    stack, seen = [expr], 0
+    while stack:
+        node = stack.pop()
+        seen += 1
+        if isinstance(node, Add):
+            stack.extend(node.terms)
+        elif isinstance(node, Mul):
+            stack.extend(node.factors)
+        elif isinstance(node, Pow):
+            stack.extend((node.base, node.exponent))
+    return seen
+
+
+def main(trees=200, size=500):
+    start = time.perf_counter()
+    built = [random_tree(size, seed) for seed in range(trees)]
+    elapsed = time.perf_counter() - start
+    del built
+
+    # Rebuild the same trees under tracemalloc (it slows allocation, so it is not timed)
+    tracemalloc.start()
+    built = [random_tree(size, seed) for seed in range(trees)]
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = sum(count_nodes(t) for t in built)
+
+    start = time.perf_counter()
+    for t in built:
+        if isinstance(t, Add):
+            variadic_flatten(t, Add)
+        elif isinstance(t, Mul):
+            variadic_flatten(t, Mul)
+    flat = time.perf_counter() - start
+
+    # Growing a sum one term at a time re-flattens the nested Add on every step
+    names = [Var(f"v{i}") for i in range(1000)]
+    start = time.perf_counter()
+    total = Add()
+    for v in names:
+        total = Add(total, Mul(v, 2))
+    incremental = time.perf_counter() - start
+
+    print(f"{trees} trees, {nodes} nodes")
+    print(f"  memory       {retained / nodes:8.1f} bytes/node")
+    print(f"  construction {nodes / elapsed / 1e3:8.1f} k nodes/s")
+    print(f"  flatten      {flat * 1e3:8.2f} ms")
+    print(f"  grow a 1000-term sum {incremental * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Thousands of trajectories of an anharmonic oscillator: one lockstep batch versus a loop
+of single integrations, and the energy drift of RK45 versus symplectic Verlet.
+
+    python benchmarks/bench_ode.py
+"""
+import time
+
+import numpy as np
+
+from mathphysicslib.ode import ODESystem, solve, trajectory
+
+
+def main(count=5000, t_end=10.0):
+    system = ODESystem.hamiltonian("c*p**2 + k*q**4", ["q"], ["p"], params={"c": 0.5, "k": 1.0})
+    y0 = np.stack([np.linspace(0.1, 1.0, count), np.zeros(count)], axis=1)
+
+    start = time.perf_counter()
+    batched = solve(system, y0, (0, t_end))
+    batch_time = time.perf_counter() - start
+
+    sample = range(0, count, max(1, count // 50))
+    start = time.perf_counter()
+    looped = [solve(system, y0[i], (0, t_end)) for i in sample]
+    loop_time = (time.perf_counter() - start) * count / len(sample)
+    assert np.allclose(looped, batched[list(sample)], atol=1e-4)
+
+    print(f"{count} trajectories to t={t_end}")
+    print(f"  lockstep batch  {batch_time * 1e3:9.1f} ms")
+    print(f"  one at a time   {loop_time * 1e3:9.1f} ms (extrapolated)   ({loop_time / batch_time:.0f}x)")
+
+    energy = lambda y: 0.5 * y[1] ** 2 + y[0] ** 4
+    for method, options in (("rk45", {}), ("dop853", {}), ("verlet", {"step": 0.02})):
+        drift = max(abs(energy(y) - 1.0) for _, y in
+                    trajectory(system, [1.0, 0.0], (0, 1000), method=method, **options))
+        print(f"  {method:<7} energy drift over t=1000: {drift:.2e}")
+
+
+if __name__ == "__main__":
+    main()
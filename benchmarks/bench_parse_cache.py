@@ -0,0 +1,37 @@
+"""
+Re-parsing a working set of formula strings: uncached vs LRU-cached vs parse_many.
+
+    python benchmarks/bench_parse_cache.py
+"""
+import random
+import time
+
+from generators import formula_corpus
+from mathphysicslib.ast_parser import parse_to_func, parse_many, parse_cache_info, clear_parse_cache
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(rounds=10):
+    formulas = formula_corpus(2000, size=4)
+    requests = formulas * rounds
+    random.Random(1).shuffle(requests)
+
+    clear_parse_cache()
+    t_uncached = timed(lambda: [parse_to_func(s, cache=False) for s in requests])
+    t_cached = timed(lambda: [parse_to_func(s) for s in requests])
+    info = parse_cache_info()
+    clear_parse_cache()
+    t_bulk = timed(lambda: parse_many(requests))
+
+    print(f"{len(requests)} parses of {len(formulas)} distinct formulas")
+    print(f"  uncached    {t_uncached * 1e3:9.1f} ms")
+    print(f"  LRU cache   {t_cached * 1e3:9.1f} ms   (hits={info.hits}, misses={info.misses})")
+    print(f"  parse_many  {t_bulk * 1e3:9.1f} ms   (deduped, interned)")
+
+
+if __name__ == "__main__":
+    main()
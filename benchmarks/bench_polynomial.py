@@ -0,0 +1,50 @@
+"""
+Polynomial expansion: sparse Poly engine versus distributing Mul over Add on trees.
+
+    python benchmarks/bench_polynomial.py
+"""
+import time
+import tracemalloc
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Add, Mul
+from mathphysicslib.polynomial import Poly
+
+
+def tree_multiply(a, b):
+    # (a1 + a2 + ...) * (b1 + b2 + ...) as a sum of products, built from nodes
+    left = a.terms if isinstance(a, Add) else (a,)
+    right = b.terms if isinstance(b, Add) else (b,)
+    return Add.add_fold(*[Mul.mul_fold(x, y) for x in left for y in right])
+
+
+def tree_power(base, n):
+    result = base
+    for _ in range(n - 1):
+        result = tree_multiply(result, base)
+    return result
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(powers=(5, 10, 20)):
+    base = parse_to_func("x + y + z + 1")
+    print("(x + y + z + 1)**n")
+    for n in powers:
+        tree, tree_time, tree_peak = measure(lambda: tree_power(base, n))
+        poly, poly_time, poly_peak = measure(lambda: Poly.from_expr(base) ** n)
+        assert Poly.from_expr(tree) == poly
+        print(f"  n={n:<3d} {len(poly):5d} terms   trees {tree_time * 1e3:9.1f} ms {tree_peak / 1e6:7.1f} MB"
+              f"   poly {poly_time * 1e3:7.1f} ms {poly_peak / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
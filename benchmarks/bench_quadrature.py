@@ -0,0 +1,37 @@
+"""
+Many definite integrals of one integrand: one batched quad() call versus a loop of calls.
+
+    python benchmarks/bench_quadrature.py
+"""
+import time
+
+import numpy as np
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.quadrature import quad
+
+
+def main(count=5000):
+    # Damped-oscillator energy shape, integrated over time for many stiffnesses and spans
+    expr = parse_to_func("m*v**2 + k*x**2 + b*v*x")
+    upper = np.linspace(0.5, 5.0, count)
+    k = np.linspace(1.0, 10.0, count)
+    constants = {"m": 2.0, "v": 0.5, "b": 0.1}
+
+    start = time.perf_counter()
+    batched = quad(expr, "x", (0, upper), params=dict(constants, k=k))
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = [quad(expr, "x", (0, float(u)), params=dict(constants, k=float(kk))).value
+              for u, kk in zip(upper, k)]
+    loop_time = time.perf_counter() - start
+    assert np.allclose(batched.value, looped, rtol=1e-12)
+
+    print(f"{count} integrals, {batched.evaluations} evaluations")
+    print(f"  batched  {batch_time * 1e3:8.1f} ms")
+    print(f"  looped   {loop_time * 1e3:8.1f} ms   ({loop_time / batch_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Startup cost of a precomputed expression set: parsing text versus loading the binary format.
+
+    python benchmarks/bench_serialize.py
+"""
+import os
+import random
+import tempfile
+import time
+
+from generators import polynomial_source
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.autodiff import jacobian
+from mathphysicslib.serialize import save, load
+
+
+def main(functions=40, names=("x", "y", "z", "u", "v", "w")):
+    rng = random.Random(0)
+    sources = [polynomial_source(rng, names, terms=12) for _ in range(functions)]
+    exprs = [e for row in jacobian(sources, list(names)) for e in row]
+    texts = [repr(e) for e in exprs]
+
+    start = time.perf_counter()
+    parsed = [parse_to_func(t, cache=False) for t in texts]
+    parse_time = time.perf_counter() - start
+    assert parsed == exprs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jacobian.mplx")
+        save(exprs, path)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        with load(path) as f:
+            loaded = list(f)
+        load_time = time.perf_counter() - start
+        assert loaded == exprs
+
+        start = time.perf_counter()
+        with load(path) as f:
+            one = f[len(f) // 2]
+        lazy_time = time.perf_counter() - start
+        assert one == exprs[len(exprs) // 2]
+
+    text_size = sum(len(t) for t in texts)
+    print(f"{len(exprs)} expressions")
+    print(f"  parse text      {parse_time * 1e3:8.1f} ms   {text_size / 1e3:7.1f} kB")
+    print(f"  load binary     {load_time * 1e3:8.1f} ms   {size / 1e3:7.1f} kB")
+    print(f"  load one (lazy) {lazy_time * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
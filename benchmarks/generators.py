@@ -0,0 +1,113 @@
+"""
+Deterministic workload generators shared by the benchmark scripts and benchmarks/run.py.
+
+Every generator takes a seed (or is fully determined by its size), so two runs, or two
+commits, time exactly the same inputs.
+"""
+import random
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Add, Mul, Pow, Var
+
+NAMES = ["x", "y", "z", "m", "k", "g", "t", "v", "q", "p"]
+
+
+def wide_sum(n, seed=0):
+    # c1*v1**k1 + c2*v2**k2 + ... with n distinct variables, so no terms combine
+    rng = random.Random(seed)
+    return Add(*[Mul(Pow(Var(f"w{i}"), rng.randint(1, 4)), rng.randint(2, 9)) for i in range(n)])
+
+
+def wide_product(n, seed=0):
+    rng = random.Random(seed)
+    return Mul(*[Pow(Var(f"w{i}"), rng.randint(1, 4)) for i in range(n)], rng.randint(2, 9))
+
+
+def deep_product(depth):
+    # (((x + 1)*y + 2)*x + 3)*y ... : products nested 'depth' deep (the sums stop flattening)
+    x, y = Var("x"), Var("y")
+    expr = Add(x, 1)
+    for i in range(depth):
+        expr = Add(Mul(expr, y if i % 2 == 0 else x), i + 2)
+    return expr
+
+
+def power_tower(height, seed=0):
+    # (((x**a)**b)**c)... built without folding, the input Pow.pow_fold collapses
+    rng = random.Random(seed)
+    expr = Var("x")
+    for _ in range(height):
+        expr = Pow(expr, rng.randint(2, 3))
+    return expr
+
+
+def random_tree(size, seed=0, names=("x", "y", "z", "t")):
+    # Random Add/Mul/Pow tree over 'size' leaves, built bottom-up pairwise
+    rng = random.Random(seed)
+    leaves = [Var(rng.choice(names)) for _ in range(size)]
+    while len(leaves) > 1:
+        a, b = leaves.pop(), leaves.pop()
+        kind = rng.random()
+        if kind < 0.45:
+            node = Add(a, b, rng.randint(1, 5))
+        elif kind < 0.9:
+            node = Mul(a, b, rng.randint(2, 5))
+        else:
+            node = Pow(a, rng.randint(2, 4))
+        leaves.insert(0, node)
+    return leaves[0]
+
+
+def polynomial_source(rng, names=NAMES, terms=8):
+    # "c*a**i*b**j + ..." over three variables per term
+    parts = []
+    for _ in range(terms):
+        factors = [f"{n}**{rng.randint(1, 4)}" for n in rng.sample(list(names), 3)]
+        parts.append("*".join([str(rng.randint(1, 9))] + factors))
+    return " + ".join(parts)
+
+
+# Physics-flavoured building blocks: energies, forces, oscillators
+_PHYSICS_TERMS = [
+    "m*v**2",                 # kinetic energy (times 2)
+    "m*g*h",                  # gravitational potential
+    "k*x**2",                 # spring potential (times 2)
+    "q*E*x",                  # work in a uniform field
+    "m*w**2*x**2",            # harmonic oscillator
+    "p**2*m**3",              # relativistic correction shape
+    "G*M*m*r**3",
+    "L**2*m*r**2",            # centrifugal term
+    "b*v",                    # linear drag
+    "c*v**2",                 # quadratic drag
+]
+
+
+def physics_formula(rng, size=4):
+    terms = rng.sample(_PHYSICS_TERMS, size)
+    return " + ".join(f"{rng.randint(1, 9)}*{t}" for t in terms)
+
+
+def physics_corpus(count=1000, seed=0, size=4):
+    rng = random.Random(seed)
+    return [physics_formula(rng, size) for _ in range(count)]
+
+
+def formula_corpus(count=2000, seed=0, size=8):
+    # Sums of c*a**i*b terms over NAMES; many formulas share terms
+    rng = random.Random(seed)
+    formulas = []
+    for _ in range(count):
+        terms = []
+        for _ in range(size):
+            a, b = rng.sample(NAMES, 2)
+            terms.append(f"{rng.randint(1, 9)}*{a}**{rng.randint(1, 4)}*{b}")
+        formulas.append(" + ".join(terms))
+    return formulas
+
+
+def nested_polynomial(depth):
+    # ((x**2 + x*y + 1)**2 + y*x + 1)**2 + ...
+    source = "x**2 + x*y + 1"
+    for _ in range(depth - 1):
+        source = f"({source})**2 + y*x + 1"
+    return parse_to_func(source)
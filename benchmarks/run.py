@@ -0,0 +1,321 @@
+"""
+Benchmark suite for the hot paths, with JSON output for comparing commits.
+
+    python benchmarks/run.py                          # print a table
+    python benchmarks/run.py --output before.json     # save results
+    python benchmarks/run.py --compare before.json    # table with ratios against a saved run
+    python benchmarks/run.py --filter parse           # only cases whose name contains "parse"
+
+Each case is timed like timeit: the call count per sample is chosen so a sample lasts at
+least --min-time seconds, and the best of --repeat samples is reported per call.
+With --compare, the exit status is 1 when any case is slower than --threshold times
+the saved result.
+"""
+import argparse
+import atexit
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import generators
+from mathphysicslib.ast_parser import parse_to_func, parse_file, clear_parse_cache
+from mathphysicslib.core import derivative, integral
+from mathphysicslib.expresso import Add, Mul, Pow, Var, variadic_flatten
+from mathphysicslib.ode import ODESystem, solve
+from mathphysicslib.rewrite import partial_eval
+from mathphysicslib.series import series
+from mathphysicslib.simplify import SIMPLIFY_RULES, simplify
+
+CASES = {}
+
+# Values for the physics_corpus symbols other than x, for the numeric cases
+PHYSICS_CONSTANTS = {n: 1.5 for n in ("m", "v", "g", "h", "k", "q", "E", "w", "p", "G", "M", "r", "L", "b", "c")}
+
+
+def case(name):
+    # Register a setup function; it builds the inputs and returns the callable to time
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+@case("construct.add_wide")
+def _():
+    terms = [Mul(Var(f"w{i}"), i + 2) for i in range(1000)]
+    return lambda: Add(*terms)
+
+
+@case("construct.mul_wide")
+def _():
+    factors = [Pow(Var(f"w{i}"), i % 4 + 1) for i in range(1000)]
+    return lambda: Mul(*factors)
+
+
+@case("construct.pow")
+def _():
+    x = Var("x")
+    return lambda: [Pow(x, k) for k in range(2, 102)]
+
+
+@case("construct.random_tree")
+def _():
+    return lambda: generators.random_tree(500)
+
+
+@case("hash.dedupe_deep")
+def _():
+    trees = [generators.deep_product(150) for _ in range(50)]
+    return lambda: len(set(trees))
+
+
+@case("key.deep")
+def _():
+    trees = [generators.deep_product(150) for _ in range(50)]
+    return lambda: [t.key() for t in trees]
+
+
+@case("eq.deep_distinct_objects")
+def _():
+    a, b = generators.deep_product(300), generators.deep_product(300)
+    return lambda: a == b
+
+
+@case("flatten.wide_sum")
+def _():
+    expr = generators.wide_sum(2000)
+    return lambda: variadic_flatten(expr, Add)
+
+
+@case("pow_fold.tower")
+def _():
+    tower = generators.power_tower(200)
+    return lambda: Pow.pow_fold(tower.base, tower.exponent)
+
+
+@case("parse.physics")
+def _():
+    corpus = generators.physics_corpus(200)
+    return lambda: [parse_to_func(s, cache=False) for s in corpus]
+
+
+@case("parse.wide")
+def _():
+    source = " + ".join(generators.formula_corpus(50))
+    return lambda: parse_to_func(source, cache=False)
+
+
+@case("parse.file_stream")
+def _():
+    # 2000 lines with subtraction, division and calls, streamed in chunks of 256 lines
+    formulas = [f"({s}) - sin({s})/{k + 2}" for k, s in enumerate(generators.physics_corpus(2000))]
+    fp = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+    with fp:
+        fp.write("\n".join(formulas) + "\n")
+    atexit.register(os.remove, fp.name)
+
+    def run():
+        clear_parse_cache()
+        return sum(1 for _ in parse_file(fp.name, chunk_lines=256))
+    return run
+
+
+@case("derivative.nested_polynomial")
+def _():
+    expr = generators.nested_polynomial(3)
+    return lambda: derivative(expr, "x", 4)
+
+
+@case("derivative.physics")
+def _():
+    exprs = [parse_to_func(s) for s in generators.physics_corpus(50)]
+    return lambda: [derivative(e, {"v": 1, "m": 1}) for e in exprs]
+
+
+@case("derivative.forward_mode")
+def _():
+    expr = generators.random_tree(300)
+    points = [0.1 + i / 1000 for i in range(1000)]
+    at = {"x": points, "y": 0.5, "z": 0.7, "t": 0.3}
+    return lambda: derivative(expr, {"x": 2, "y": 1}, at=at)
+
+
+@case("integral.physics")
+def _():
+    exprs = [parse_to_func(s) for s in generators.physics_corpus(50)]
+    return lambda: [integral(e, "x", bounds=(0, 2), params=PHYSICS_CONSTANTS) for e in exprs]
+
+
+@case("integral.many_bounds")
+def _():
+    expr = parse_to_func(generators.physics_corpus(1)[0])
+    upper = [0.5 + i / 1000 for i in range(1000)]
+    return lambda: integral(expr, "x", bounds=(0, upper), params=PHYSICS_CONSTANTS)
+
+
+@case("integral.sparse_grid_3d")
+def _():
+    expr = parse_to_func("m*(x**2 + y**2)*(1 + x*y*z)")
+    bounds = {"x": (0, 1), "y": (0, 2), "z": (0, 3)}
+    return lambda: integral(expr, {"x": 1, "y": 1, "z": 1}, bounds=bounds, params={"m": 2.0})
+
+
+@case("integral.qmc_6d")
+def _():
+    expr = Pow(parse_to_func("(1 + a)*(1 + b)*(1 + c)*(1 + d)*(1 + e)*(1 + f)"), -1)
+    names = ["a", "b", "c", "d", "e", "f"]
+    return lambda: integral(expr, names, bounds=[(0, 1)] * 6, method="qmc", seed=0,
+                            points=4096, max_points=4096)
+
+
+@case("ode.batch_rk45")
+def _():
+    system = ODESystem.hamiltonian("c*p**2 + k*q**4", ["q"], ["p"], params={"c": 0.5, "k": 1.0})
+    y0 = [[0.1 + i / 1000, 0.0] for i in range(1000)]
+    return lambda: solve(system, y0, (0, 5))
+
+
+@case("series.lorentz")
+def _():
+    # kinetic energy m*c**2*(gamma - 1), gamma expanded in v to order 30 with symbolic m, c
+    gamma = Pow(parse_to_func("1 + k*v**2"), -0.5)
+    expr = Mul(parse_to_func("m*c**2"), Add(gamma, -1))
+    return lambda: series(expr, "v", order=30)
+
+
+@case("rewrite.partial_eval_sweep")
+def _():
+    # sweep one parameter of a large model; subtrees without it are returned untouched
+    expr = Add(*[parse_to_func(s) for s in generators.physics_corpus(200)])
+    masses = [0.5 + i / 20 for i in range(20)]
+    return lambda: [partial_eval(expr, {"m": m}) for m in masses]
+
+
+def _simplify_model():
+    return Add(*[Mul(Pow(Mul(Var(f"a{i}"), Var(f"b{i}")), 2), Pow(Var(f"a{i}"), -1)) for i in range(2000)])
+
+
+@case("simplify.cold")
+def _():
+    expr = _simplify_model()
+
+    def run():
+        SIMPLIFY_RULES.clear_cache()
+        return simplify(expr)
+    return run
+
+
+@case("simplify.incremental")
+def _():
+    # one edited term of an already simplified model: only the edited path is rewritten
+    expr = _simplify_model()
+    simplify(expr)
+    edits = iter(range(1 << 62))
+    return lambda: simplify(Add(expr, Pow(Mul(Var("x"), Var(f"y{next(edits)}")), 2)))
+
+
+def measure(fn, repeat, min_time):
+    """Best and median seconds per call over 'repeat' samples of an auto-sized call count."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    samples.sort()
+    return {"best": samples[0], "median": samples[len(samples) // 2], "number": number, "repeat": repeat}
+
+
+def run(names, repeat, min_time):
+    results = {}
+    for name in names:
+        try:
+            fn = CASES[name]()
+            fn()   # warm up, and surface NotImplementedError before timing
+        except NotImplementedError as exc:
+            results[name] = {"skipped": str(exc) or "not implemented"}
+            continue
+        results[name] = measure(fn, repeat, min_time)
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def report(results, baseline=None, threshold=None):
+    # Print a table; returns the names of regressed cases when comparing
+    regressed = []
+    for name, r in results.items():
+        if "skipped" in r:
+            print(f"  {name:<30} skipped ({r['skipped']})")
+            continue
+        line = f"  {name:<30} {r['best'] * 1e3:10.3f} ms"
+        old = (baseline or {}).get(name)
+        if old and "best" in old:
+            ratio = r["best"] / old["best"]
+            line += f"   {ratio:6.2f}x vs {old['best'] * 1e3:.3f} ms"
+            if threshold is not None and ratio > threshold:
+                line += "   REGRESSION"
+                regressed.append(name)
+        print(line)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="write results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", help="JSON file of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="slowdown ratio reported as a regression (default 1.25)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    names = [n for n in CASES if args.filter in n]
+    results = run(names, args.repeat, args.min_time)
+    document = {"meta": metadata(), "results": results}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)["results"]
+    if args.output == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+        return 0
+    regressed = report(results, baseline, args.threshold if baseline else None)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(document, fp, indent=2)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,13 @@
 from .core import derivative, integral, validate_var_name, normalize_respect_to
-__all__ = ["derivative", "integral", "validate_var_name", "normalize_respect_to"]
\ No newline at end of file
+from .core import batch_map, batch_derivative, BatchError
+from .autodiff import gradient, jacobian, hessian, derivative_at
+from .polynomial import Poly, expand
+from .series import Series, series
+from .rewrite import subs, partial_eval
+from .simplify import simplify
+from .profiling import profile
+__all__ = ["derivative", "integral", "validate_var_name", "normalize_respect_to",
+           "batch_map", "batch_derivative", "BatchError",
+           "gradient", "jacobian", "hessian", "derivative_at", "Poly", "expand",
+           "Series", "series", "subs", "partial_eval",
+           "simplify", "profile"]
\ No newline at end of file
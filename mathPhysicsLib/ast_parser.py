@@ -1,27 +1,368 @@
 import ast
+import collections
+import functools
+import io
+import itertools
+import keyword
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
 
-from mathphysicslib.expresso import Constant,Mul, Add, Var, Pow
+from mathphysicslib.expresso import Constant,Mul, Add, Var, Pow, Func, FUNCTIONS, intern, interning_enabled
 
-def parse_to_func(func: str):
+PARSE_CACHE_SIZE = 4096
+
+def parse_to_func(func: str, cache=True):
+    """
+    Parse a formula string into an Expr.
+    Results are kept in a bounded LRU cache keyed by the source string (nodes are
+    immutable, so handing out the same tree again is safe); pass cache=False to
+    bypass it. See parse_cache_info() for hit/miss statistics. Inside interning()
+    the result is interned, including a tree cached before the block was entered.
+    """
     if not isinstance(func, str):
         raise TypeError("expression must be in string form")
-    node = ast.parse(func, mode="eval").body
+    if cache:
+        expr = _cached_parse(func)
+        return intern(expr) if interning_enabled() else expr
+    return _parse(func)
+
+def _parse(func):
+    try:
+        node = ast.parse(func, mode="eval").body
+    except (RecursionError, MemoryError):
+        # CPython's parser gives up on very deep input (long sums, power towers)
+        node = _parse_deep(func)
+    except SyntaxError as e:
+        if "too many nested parentheses" not in str(e):
+            raise
+        node = _parse_deep(func)
     return convert(node)
 
+def _parse_miss(func):
+    # Cache misses look _parse up at call time, so an instrumented _parse (see profiling) sees them
+    return _parse(func)
+
+_cached_parse = functools.lru_cache(maxsize=PARSE_CACHE_SIZE)(_parse_miss)
+
+def parse_cache_info():
+    # (hits, misses, maxsize, currsize) of the parse cache
+    return _cached_parse.cache_info()
+
+def clear_parse_cache():
+    _cached_parse.cache_clear()
+
+def set_parse_cache_size(maxsize):
+    """Resize the parse cache (None = unbounded, 0 = disabled). Clears it and its statistics."""
+    global _cached_parse
+    if maxsize is not None and (not isinstance(maxsize, int) or maxsize < 0):
+        raise ValueError("cache size must be a non-negative integer or None")
+    _cached_parse = functools.lru_cache(maxsize=maxsize)(_parse_miss)
+
+def parse_many(funcs, share=True):
+    """
+    Parse a batch of formula strings, returning the trees in input order.
+      - Each distinct string is parsed once (through the parse cache).
+      - With share=True the results are interned, so equal subtrees across the
+        whole batch (and equal formulas) are the same objects.
+    """
+    funcs = list(funcs)
+    for f in funcs:
+        if not isinstance(f, str):
+            raise TypeError("expression must be in string form")
+    parsed = {}
+    for f in funcs:
+        if f not in parsed:
+            parsed[f] = parse_to_func(f)
+    if share:
+        parsed = {f: intern(e) for f, e in parsed.items()}
+    return [parsed[f] for f in funcs]
+
+def parse_file(path, workers=None, chunk_lines=4096, encoding="utf-8"):
+    """
+    Stream the formulas of a text file, one per line, as (line number, result) pairs:
+
+        for line_no, expr in parse_file("formulas.txt", workers=4):
+            if isinstance(expr, Exception):
+                ...   # the line did not parse; expr is the exception
+
+    - The file is read 'chunk_lines' lines at a time, so memory stays bounded whatever
+      its size. Blank lines and lines starting with '#' are skipped; line numbers
+      count from 1 and include them.
+    - A line that fails to parse yields its exception instead of an Expr, and the
+      stream goes on.
+    - workers=None (or 1) parses in this process. With more, chunks are parsed by a
+      process pool, at most 2*workers chunks in flight, and results are still yielded
+      in file order; Exprs come back as one serialized DAG per chunk.
+    Raises:
+      - ValueError for a non-positive 'workers' or 'chunk_lines' (on the call itself).
+      - OSError / UnicodeDecodeError from reading the file, while iterating.
+    """
+    if workers is None:
+        workers = 1
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("workers must be a positive integer")
+    if not isinstance(chunk_lines, int) or chunk_lines < 1:
+        raise ValueError("chunk_lines must be a positive integer")
+    chunks = _read_chunks(path, chunk_lines, encoding)
+    if workers == 1:
+        return (pair for numbers, lines in chunks for pair in zip(numbers, _parse_chunk(lines)))
+    return _parse_parallel(chunks, workers)
+
+def _read_chunks(path, chunk_lines, encoding):
+    # (line numbers, formulas) per chunk of the file, comments and blank lines dropped
+    with open(path, encoding=encoding) as fp:
+        numbered = enumerate(fp, 1)
+        while True:
+            block = list(itertools.islice(numbered, chunk_lines))
+            if not block:
+                return
+            block = [(k, line.strip()) for k, line in block]
+            block = [(k, line) for k, line in block if line and not line.startswith("#")]
+            if block:
+                yield [k for k, _ in block], [line for _, line in block]
+
+def _parse_chunk(lines):
+    results = []
+    for line in lines:
+        try:
+            results.append(parse_to_func(line))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+def _parse_packed(lines):
+    # Worker side of parse_file: the chunk's results, Exprs as one serialized DAG
+    from mathphysicslib.core import _pack   # core imports this module
+    return _pack(_parse_chunk(lines))
+
+def _parse_parallel(chunks, workers):
+    from mathphysicslib.core import _unpack
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        try:
+            for numbers, lines in chunks:
+                pending.append((numbers, pool.submit(_parse_packed, lines)))
+                if len(pending) >= 2 * workers:
+                    numbers, future = pending.popleft()
+                    yield from zip(numbers, _unpack(future.result()))
+            while pending:
+                numbers, future = pending.popleft()
+                yield from zip(numbers, _unpack(future.result()))
+        finally:
+            # closed early (or failed): drop the chunks no worker has started
+            for _, future in pending:
+                future.cancel()
+
 def convert(node):
-    
-    if isinstance(node, ast.Constant):
-        if isinstance(node.value, (int, float)):
-            return Constant(node.value)
-        raise TypeError("Constant type is invalid")
-
-    if isinstance(node, ast.Name):
-        return Var(node.id)
-
-    if isinstance(node, ast.BinOp):
-        if isinstance(node.op, ast.Add):
-            return Add(convert(node.left), convert(node.right))
-        if isinstance(node.op, ast.Mult):
-            return Mul(convert(node.left), convert(node.right))
-        if isinstance(node.op, ast.Pow):
-            return Pow(convert(node.left), convert(node.right))
\ No newline at end of file
+    """
+    Convert a Python ast expression node into an Expr.
+      - Iterative (explicit stack), so nesting depth is not limited by the recursion limit.
+      - Chains of + and - (and of * and /) are gathered and built as one Add (Mul), so an
+        n-term sum costs O(n) instead of re-flattening at every level. a - b becomes
+        a + b*(-1) and a / b becomes a * b**-1; dividing by a number multiplies by its
+        reciprocal, exactly for integers (x/2 -> x*(1/2)).
+      - Unary minus negates (a constant directly), unary plus is dropped.
+      - Calls of the FUNCTIONS build Func nodes; sqrt(u) becomes u**0.5.
+    Raises:
+      - TypeError for syntax outside this grammar (comparisons, %, subscripts, ...)
+        and for constants that are not numbers.
+      - ValueError for unknown functions, a wrong number of arguments, or a division
+        by zero.
+    """
+    results = {}   # id(ast node) -> converted Expr
+    stack = [(node, None)]   # (ast node, its operands once they have been pushed)
+    while stack:
+        n, operands = stack.pop()
+        if isinstance(n, ast.Constant):
+            if isinstance(n.value, (int, float)):
+                results[id(n)] = Constant(n.value)
+                continue
+            raise TypeError("Constant type is invalid")
+        if isinstance(n, ast.Name):
+            results[id(n)] = Var(n.id)
+            continue
+        if operands is None:
+            operands = _operands(n)
+            stack.append((n, operands))
+            stack.extend((o, None) for o, _ in reversed(operands))
+            continue
+        values = [results.pop(id(o)) for o, _ in operands]
+        if isinstance(n, ast.BinOp) and isinstance(n.op, _ADDITIVE):
+            results[id(n)] = Add(*[_negate(v) if inverted else v
+                                   for v, (_, inverted) in zip(values, operands)])
+        elif isinstance(n, ast.BinOp) and isinstance(n.op, _MULTIPLICATIVE):
+            results[id(n)] = Mul(*[_reciprocal(v) if inverted else v
+                                   for v, (_, inverted) in zip(values, operands)])
+        elif isinstance(n, ast.BinOp):
+            results[id(n)] = Pow(*values)
+        elif isinstance(n, ast.UnaryOp):
+            results[id(n)] = _negate(values[0]) if isinstance(n.op, ast.USub) else values[0]
+        elif n.func.id == "sqrt":
+            results[id(n)] = Pow(values[0], 0.5)
+        else:
+            results[id(n)] = Func(n.func.id, values[0])
+    return results[id(node)]
+
+_ADDITIVE = (ast.Add, ast.Sub)
+_MULTIPLICATIVE = (ast.Mult, ast.Div)
+
+def _operands(node):
+    """
+    Operand ast nodes of a supported node, each with a flag telling whether it enters
+    inverted (negated in a sum, reciprocal in a product). For + and - (and * and /) the
+    whole chain of the operator family is gathered, left to right: a - (b - c) -> a, -b, +c.
+    """
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+        return [(node.left, False), (node.right, False)]
+    if isinstance(node, ast.BinOp) and isinstance(node.op, _ADDITIVE + _MULTIPLICATIVE):
+        family = _ADDITIVE if isinstance(node.op, _ADDITIVE) else _MULTIPLICATIVE
+        inverse = family[1]
+        operands = []
+        stack = [(node, False)]
+        while stack:
+            n, inverted = stack.pop()
+            if isinstance(n, ast.BinOp) and isinstance(n.op, family):
+                stack.append((n.right, inverted != isinstance(n.op, inverse)))
+                stack.append((n.left, inverted))
+            else:
+                operands.append((n, inverted))
+        return operands
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        return [(node.operand, False)]
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        name = node.func.id
+        if name != "sqrt" and name not in FUNCTIONS:
+            raise ValueError(f"unknown function {name!r}")
+        if len(node.args) != 1 or node.keywords or isinstance(node.args[0], ast.Starred):
+            raise ValueError(f"{name}() takes exactly one argument")
+        return [(node.args[0], False)]
+    raise TypeError(f"unsupported syntax: {type(getattr(node, 'op', node)).__name__}")
+
+def _negate(value):
+    if isinstance(value, Constant):
+        return Constant(-value.value)
+    return Mul(value, -1)
+
+def _reciprocal(value):
+    if isinstance(value, Constant):
+        v = value.value
+        if v == 0:
+            raise ValueError("Division by zero")
+        if isinstance(v, int):
+            v = Fraction(1, v)
+            return Constant(int(v) if v.denominator == 1 else v)
+        return Constant(1 / v)
+    return Pow(value, -1)
+
+# Operator table for _parse_deep: token -> (precedence, right associative, ast operator)
+_BINARY = {
+    "+": (10, False, ast.Add), "-": (10, False, ast.Sub),
+    "*": (20, False, ast.Mult), "/": (20, False, ast.Div), "//": (20, False, ast.FloorDiv),
+    "%": (20, False, ast.Mod), "@": (20, False, ast.MatMult),
+    "**": (40, True, ast.Pow),
+}
+_UNARY = {"+": ast.UAdd, "-": ast.USub, "~": ast.Invert}
+_UNARY_PRECEDENCE = 30   # binds tighter than * but looser than ** on its right: -x**2 == -(x**2)
+
+def _parse_deep(source):
+    """
+    Fallback expression parser for input nested too deeply for ast.parse.
+    Iterative operator-precedence (shunting-yard) parser over the tokenize stream that
+    produces the same ast nodes as ast.parse for arithmetic: names, numbers, binary and
+    unary operators, parentheses and function calls.
+    """
+    output = []    # operand stack of ast nodes
+    ops = []       # ("bin", token) | ("unary", token) | ("(",) | ("call", name, [argument count])
+    expect_operand = True
+
+    def reduce_top():
+        entry = ops.pop()
+        if entry[0] == "unary":
+            output.append(ast.UnaryOp(op=_UNARY[entry[1]](), operand=output.pop()))
+        else:
+            right = output.pop()
+            left = output.pop()
+            output.append(ast.BinOp(left=left, op=_BINARY[entry[1]][2](), right=right))
+
+    def reduce_to_bracket():
+        while ops and ops[-1][0] in ("bin", "unary"):
+            reduce_top()
+        if not ops:
+            raise SyntaxError("unmatched ')'")
+
+    try:
+        tokens = [t for t in tokenize.generate_tokens(io.StringIO(source).readline)
+                  if t.type not in (tokenize.NL, tokenize.NEWLINE, tokenize.COMMENT,
+                                    tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)]
+    except (tokenize.TokenError, IndentationError) as e:
+        raise SyntaxError(str(e)) from None
+    pos = 0
+    while pos < len(tokens):
+        tok = tokens[pos]
+        pos += 1
+        text = tok.string
+        if tok.type == tokenize.NAME:
+            if not expect_operand:
+                raise SyntaxError(f"unexpected name {text!r}")
+            if text in ("True", "False", "None"):
+                output.append(ast.Constant(value={"True": True, "False": False, "None": None}[text]))
+            elif keyword.iskeyword(text):
+                raise SyntaxError(f"unsupported keyword {text!r}")
+            elif pos < len(tokens) and tokens[pos].string == "(":
+                pos += 1
+                ops.append(("call", text, [0]))
+                continue   # still expecting an operand (or ')')
+            else:
+                output.append(ast.Name(id=text, ctx=ast.Load()))
+            expect_operand = False
+        elif tok.type == tokenize.NUMBER:
+            if not expect_operand:
+                raise SyntaxError(f"unexpected number {text!r}")
+            output.append(ast.Constant(value=ast.literal_eval(text)))
+            expect_operand = False
+        elif tok.type == tokenize.OP and text == "(":
+            if not expect_operand:
+                raise SyntaxError("unexpected '('")
+            ops.append(("(",))
+        elif tok.type == tokenize.OP and text == ")":
+            if expect_operand and not (ops and ops[-1][0] == "call" and ops[-1][2][0] == 0):
+                raise SyntaxError("unexpected ')'")
+            reduce_to_bracket()
+            entry = ops.pop()
+            if entry[0] == "call":
+                count = entry[2][0] + (0 if expect_operand else 1)
+                args = output[len(output) - count:] if count else []
+                del output[len(output) - count:]
+                output.append(ast.Call(func=ast.Name(id=entry[1], ctx=ast.Load()), args=args, keywords=[]))
+            expect_operand = False
+        elif tok.type == tokenize.OP and text == ",":
+            if expect_operand:
+                raise SyntaxError("unexpected ','")
+            reduce_to_bracket()
+            if ops[-1][0] != "call":
+                raise SyntaxError("',' outside a function call")
+            ops[-1][2][0] += 1
+            expect_operand = True
+        elif tok.type == tokenize.OP and expect_operand and text in _UNARY:
+            ops.append(("unary", text))
+        elif tok.type == tokenize.OP and not expect_operand and text in _BINARY:
+            precedence, right_assoc, _ = _BINARY[text]
+            while ops and ops[-1][0] in ("bin", "unary"):
+                top = ops[-1]
+                top_precedence = _UNARY_PRECEDENCE if top[0] == "unary" else _BINARY[top[1]][0]
+                if top_precedence > precedence or (top_precedence == precedence and not right_assoc):
+                    reduce_top()
+                else:
+                    break
+            ops.append(("bin", text))
+            expect_operand = True
+        else:
+            raise SyntaxError(f"unexpected token {text!r}")
+    if expect_operand:
+        raise SyntaxError("unexpected end of expression")
+    while ops:
+        if ops[-1][0] not in ("bin", "unary"):
+            raise SyntaxError("unmatched '('")
+        reduce_top()
+    return output[0]
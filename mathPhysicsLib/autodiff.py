@@ -0,0 +1,413 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; numeric mode then works on Python scalars
+    np = None
+
+import itertools
+import math
+from fractions import Fraction
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.core import validate_var_name
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Pow, Func
+from mathphysicslib.numeric import _UFUNC_NAMES
+from mathphysicslib.rules import power_rule, exponent_rule, function_rule
+from mathphysicslib.series import elementary_series
+
+def gradient(expr, variables, at=None):
+    """
+    All first partials of one expression from a single reverse-accumulation sweep.
+
+        gradient("x**2*y + y**3", ["x", "y"])                 -> [2*x*y, x**2 + 3*y**2]
+        gradient("x**2*y + y**3", ["x", "y"], at={"x": 1, "y": xs})
+
+    - Symbolic mode (at=None) returns a list of Expr, one per variable.
+    - Numeric mode evaluates the DAG at the point(s) in 'at' (scalars or NumPy arrays)
+      and returns a list of values instead, without building derivative trees.
+    Cost is one forward and one backward pass over the expression DAG, whatever the
+    number of variables.
+    """
+    names = _names(variables)
+    dag = build_dag(_as_expr(expr))
+    if at is None:
+        return _symbolic_sweep(dag, dag.outputs[0], names)
+    values = _evaluate(dag, at)
+    return _numeric_sweep(dag, dag.outputs[0], names, values)
+
+def jacobian(exprs, variables, at=None):
+    """
+    Matrix of partials d(exprs[i])/d(variables[j]) as a list of rows.
+    All expressions share one DAG (and, in numeric mode, one forward evaluation);
+    each row is one reverse sweep over it.
+    """
+    names = _names(variables)
+    dag = build_dag([_as_expr(e) for e in exprs])
+    if at is None:
+        return [_symbolic_sweep(dag, out, names) for out in dag.outputs]
+    values = _evaluate(dag, at)
+    return [_numeric_sweep(dag, out, names, values) for out in dag.outputs]
+
+def hessian(expr, variables, at=None):
+    """Matrix of second partials: the Jacobian of the symbolic gradient."""
+    names = _names(variables)
+    return jacobian(gradient(expr, names), names, at)
+
+def derivative_at(expr, respect_to, at, order=1):
+    """
+    Value of the derivative of 'expr' along a differentiation path at the point(s) 'at',
+    by forward-mode automatic differentiation: no derivative Expr is ever built.
+
+        derivative_at("(x**2 + y)**8", "x", {"x": xs, "y": 1.0}, order=3)
+        derivative_at("x**3*y**2*z", {"x": 2, "y": 1, "z": 1}, {"x": 1.0, "y": 2.0, "z": 3.0})
+
+    - The path is normalized by normalize_respect_to, as in core.derivative.
+    - Every DAG entry depending on the path's variables carries a truncated Taylor
+      polynomial in them: x_j is kept up to the power m_j it appears with in the path,
+      so a path of distinct variables uses hyper-dual numbers (2**k coefficients) and
+      a repeated variable a univariate Taylor series (order + 1 coefficients). The
+      derivative is m_1!...m_r! times the top coefficient.
+    - 'at' values may be NumPy arrays; every coefficient is then an array and each
+      node costs a few array operations per pair of coefficients. The result then
+      always has the broadcast shape of the arrays, even where it is constant.
+    Raises:
+      - ValueError when 'at' lacks a variable of 'expr'.
+    """
+    from mathphysicslib.core import normalize_respect_to   # core imports this module lazily
+    path = normalize_respect_to(respect_to, order)
+    dag = build_dag(_as_expr(expr))
+    values = _evaluate(dag, at)
+    output = dag.outputs[0]
+    if not path:
+        return _shaped(values[output], at)
+    names = list(dict.fromkeys(path))
+    algebra = _Truncated([path.count(n) for n in names])
+    active = _active(dag, names)
+    if not active[output]:
+        return _shaped(0.0, at)
+    series = [None] * len(dag.nodes)
+    for i, (node, arg_ids) in enumerate(zip(dag.nodes, dag.args)):
+        if not active[i]:
+            continue
+        operands = [series[a] if active[a] else values[a] for a in arg_ids]
+        if isinstance(node, Var):
+            series[i] = algebra.variable(values[i], names.index(node.name))
+        elif isinstance(node, Add):
+            series[i] = algebra.add(operands, [active[a] for a in arg_ids])
+        elif isinstance(node, Mul):
+            series[i] = algebra.mul(operands, [active[a] for a in arg_ids])
+        elif isinstance(node, Pow):
+            base, exponent = operands
+            if not active[arg_ids[1]]:
+                series[i] = algebra.power(base, exponent)
+            elif not active[arg_ids[0]]:
+                series[i] = algebra.exp(algebra.scale(exponent, _log(base)))
+            else:
+                series[i] = algebra.exp(algebra.times(exponent, algebra.log(base)))
+        elif isinstance(node, Func):
+            series[i] = algebra.function(operands[0], node.name)
+        else:
+            raise TypeError(f"cannot differentiate {type(node).__name__}")
+    return _shaped(algebra.derivative(series[output]), at)
+
+def _shaped(value, at):
+    # A value at array points, broadcast to the points' shape (a fresh float array)
+    shapes = [np.shape(v) for v in at.values() if not isinstance(v, (int, float))]
+    if np is None or not shapes:
+        return value
+    return np.broadcast_to(np.asarray(value, dtype=float), np.broadcast_shapes(*shapes)).copy()
+
+class _Truncated:
+    """
+    Arithmetic on polynomials in r infinitesimals truncated at x_j**(m_j + 1): a value is
+    the list of its coefficients, indexed by the mixed-radix number of each monomial's
+    exponents. Coefficients are scalars or NumPy arrays.
+    """
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.strides = []
+        size = 1
+        for m in orders:
+            self.strides.append(size)
+            size *= m + 1
+        self.size = size
+        self.total = sum(orders)   # nilpotency: u**(total + 1) == 0 when u(0) == 0
+        exponents = list(itertools.product(*[range(m + 1) for m in reversed(orders)]))
+        exponents = [tuple(reversed(e)) for e in exponents]
+        # products[g]: the (a, b) coefficient pairs whose monomials multiply into monomial g
+        self.products = [[] for _ in range(size)]
+        for ea in exponents:
+            for eb in exponents:
+                eg = [x + y for x, y in zip(ea, eb)]
+                if all(x <= m for x, m in zip(eg, orders)):
+                    self.products[self.flat(eg)].append((self.flat(ea), self.flat(eb)))
+        self.factorial = math.prod(math.factorial(m) for m in orders)
+
+    def flat(self, exponents):
+        return sum(e * s for e, s in zip(exponents, self.strides))
+
+    def variable(self, value, j):
+        coefficients = [0.0] * self.size
+        coefficients[0] = value
+        coefficients[self.strides[j]] = 1.0
+        return coefficients
+
+    def add(self, operands, is_series):
+        total = [0.0] * self.size
+        for operand, series in zip(operands, is_series):
+            if series:
+                total = [a + b for a, b in zip(total, operand)]
+            else:
+                total[0] = total[0] + operand
+        return total
+
+    def mul(self, operands, is_series):
+        # plain factors only scale: multiply them together first
+        scale = 1.0
+        product = None
+        for operand, series in zip(operands, is_series):
+            if not series:
+                scale = scale * operand
+            elif product is None:
+                product = operand
+            else:
+                product = self.times(product, operand)
+        return self.scale(product, scale)
+
+    def scale(self, a, factor):
+        if type(factor) is float and factor == 1.0:
+            return a
+        return [c * factor for c in a]
+
+    def times(self, a, b):
+        # Coefficients that are plain zeros (most of them, for seeds and constants) are skipped
+        result = []
+        for pairs in self.products:
+            c = None
+            for i, j in pairs:
+                x, y = a[i], b[j]
+                if (type(x) is float and x == 0.0) or (type(y) is float and y == 0.0):
+                    continue
+                c = x * y if c is None else c + x * y
+            result.append(0.0 if c is None else c)
+        return result
+
+    def power(self, a, e):
+        if type(e) is int and e >= 0:
+            # exact and division-free (bases may vanish): square and multiply
+            if e == 0:
+                return [1.0] + [0.0] * (self.size - 1)
+            result = a
+            for bit in bin(e)[3:]:
+                result = self.times(result, result)
+                if bit == "1":
+                    result = self.times(result, a)
+            return result
+        # a**e = a0**e * sum_n C(e, n) u**n with u = a/a0 - 1, which vanishes at 0
+        a0 = a[0]
+        u = self.scale(a, 1 / a0)
+        u[0] = 0.0
+        return self.scale(self._series(u, _binomials(e, self.total)), a0 ** e)
+
+    def log(self, a):
+        # log a0 + sum_n (-1)**(n+1) u**n / n
+        u = self.scale(a, 1 / a[0])
+        u[0] = 0.0
+        result = self._series(u, [0.0] + [(-1) ** (n + 1) / n for n in range(1, self.total + 1)])
+        result[0] = _log(a[0])
+        return result
+
+    def exp(self, a):
+        # exp(a0) * sum_n u**n / n! with u = a - a0
+        u = list(a)
+        u[0] = 0.0
+        factor = _exp(a[0])
+        return self.scale(self._series(u, [1 / math.factorial(n) for n in range(self.total + 1)]), factor)
+
+    def function(self, a, name):
+        # sum_n f^(n)(a0)/n! * u**n with u = a - a0; the Taylor coefficients of f at a0
+        # come from the series of f(a0 + t)
+        u = list(a)
+        u[0] = 0.0
+        t = [a[0], 1.0] + [0.0] * (self.total - 1)
+        return self._series(u, elementary_series(name, t, self.total, _call))
+
+    def _series(self, u, coefficients):
+        # sum_n coefficients[n] * u**n for nilpotent u (Horner)
+        result = [coefficients[-1]] + [0.0] * (self.size - 1)
+        for c in reversed(coefficients[:-1]):
+            result = self.times(result, u)
+            result[0] = result[0] + c
+        return result
+
+    def derivative(self, a):
+        return a[-1] * self.factorial
+
+def _binomials(e, n):
+    # C(e, 0..n) for any (array) exponent e
+    coefficients = [1.0]
+    for k in range(n):
+        coefficients.append(coefficients[-1] * (e - k) / (k + 1))
+    return coefficients
+
+def _exp(value):
+    if np is not None and not isinstance(value, (int, float)):
+        return np.exp(value)
+    return math.exp(value)
+
+def _as_expr(expr):
+    if isinstance(expr, str):
+        return parse_to_func(expr)
+    if not isinstance(expr, Expr):
+        raise TypeError("expression must be an Expr or a string")
+    return expr
+
+def _names(variables):
+    names = []
+    for v in variables:
+        if isinstance(v, Var):
+            v = v.name
+        validate_var_name(v)
+        names.append(v)
+    return names
+
+def _active(dag, names):
+    # active[i]: entry i depends on at least one of the requested variables
+    wanted = set(names)
+    active = []
+    for node, arg_ids in zip(dag.nodes, dag.args):
+        if isinstance(node, Var):
+            active.append(node.name in wanted)
+        else:
+            active.append(any(active[a] for a in arg_ids))
+    return active
+
+def _symbolic_sweep(dag, output, names):
+    active = _active(dag, names)
+    contributions = [[] for _ in dag.nodes]
+    contributions[output].append(Constant(1))
+    adjoints = [None] * len(dag.nodes)
+    # Entries are topologically ordered, so walking backwards visits every user of an
+    # entry before the entry itself: its adjoint is complete when we reach it.
+    for i in range(output, -1, -1):
+        if not contributions[i] or not active[i]:
+            continue
+        adj = Add.add_fold(*contributions[i])
+        contributions[i] = None
+        adjoints[i] = adj
+        node, arg_ids = dag.nodes[i], dag.args[i]
+        args = [dag.nodes[a] for a in arg_ids]
+        if isinstance(node, Add):
+            for a in arg_ids:
+                if active[a]:
+                    contributions[a].append(adj)
+        elif isinstance(node, Mul):
+            for k, a in enumerate(arg_ids):
+                if active[a]:
+                    contributions[a].append(Mul.mul_fold(adj, *args[:k], *args[k + 1:]))
+        elif isinstance(node, Pow):
+            base, exponent = arg_ids
+            if active[exponent]:
+                contributions[exponent].append(Mul.mul_fold(adj, exponent_rule(args[0], args[1])))
+            if active[base]:
+                contributions[base].append(Mul.mul_fold(adj, power_rule(args[0], args[1])))
+        elif isinstance(node, Func):
+            contributions[arg_ids[0]].append(Mul.mul_fold(adj, function_rule(node.name, args[0])))
+    result = []
+    for name in names:
+        i = dag.index.get(Var(name))
+        result.append(adjoints[i] if i is not None and adjoints[i] is not None else Constant(0))
+    return result
+
+def _evaluate(dag, at):
+    # Forward pass: the value of every DAG entry at the given point(s)
+    point = {}
+    array_mode = False
+    for name, value in at.items():
+        validate_var_name(name)
+        if np is not None and not isinstance(value, (int, float)):
+            value = np.asarray(value)
+            value = value.astype(np.result_type(value, np.float64), copy=False)
+            array_mode = True
+        point[name] = value
+    values = []
+    for node, arg_ids in zip(dag.nodes, dag.args):
+        if isinstance(node, Constant):
+            v = node.value
+            values.append(float(v) if isinstance(v, Fraction) else v)
+        elif isinstance(node, Var):
+            if node.name not in point:
+                raise ValueError(f"no value given for variable {node.name}")
+            values.append(point[node.name])
+        elif isinstance(node, Add):
+            total = values[arg_ids[0]]
+            for a in arg_ids[1:]:
+                total = total + values[a]
+            values.append(total)
+        elif isinstance(node, Mul):
+            product = values[arg_ids[0]]
+            for a in arg_ids[1:]:
+                product = product * values[a]
+            values.append(product)
+        elif isinstance(node, Pow):
+            base = values[arg_ids[0]]
+            if array_mode and isinstance(base, (int, float)):
+                base = float(base)
+            values.append(base ** values[arg_ids[1]])
+        elif isinstance(node, Func):
+            values.append(_call(node.name, values[arg_ids[0]]))
+        else:
+            raise TypeError(f"cannot evaluate {type(node).__name__}")
+    return values
+
+def _log(value):
+    if np is not None and not isinstance(value, (int, float)):
+        return np.log(value)
+    return math.log(value)
+
+def _call(name, value):
+    # name(value) for a scalar or an array of values
+    if np is not None and not isinstance(value, (int, float)):
+        return getattr(np, _UFUNC_NAMES.get(name, name))(value)
+    return getattr(math, name)(value)
+
+def _numeric_sweep(dag, output, names, values):
+    active = _active(dag, names)
+    adjoints = [None] * len(dag.nodes)
+    adjoints[output] = 1.0
+    for i in range(output, -1, -1):
+        adj = adjoints[i]
+        if adj is None or not active[i]:
+            continue
+        node, arg_ids = dag.nodes[i], dag.args[i]
+        partials = []
+        if isinstance(node, Add):
+            partials = [(a, adj) for a in arg_ids]
+        elif isinstance(node, Mul):
+            # product of the other factors via prefix/suffix products (no division, zero-safe)
+            n = len(arg_ids)
+            prefix = [1.0] * (n + 1)
+            for k in range(n):
+                prefix[k + 1] = prefix[k] * values[arg_ids[k]]
+            suffix = 1.0
+            for k in range(n - 1, -1, -1):
+                partials.append((arg_ids[k], adj * prefix[k] * suffix))
+                suffix = suffix * values[arg_ids[k]]
+        elif isinstance(node, Pow):
+            base, exponent = arg_ids
+            b, e = values[base], values[exponent]
+            partials.append((base, adj * e * b ** (e - 1)))
+            if active[exponent]:
+                partials.append((exponent, adj * values[i] * _log(b)))
+        elif isinstance(node, Func):
+            slope = elementary_series(node.name, [values[arg_ids[0]], 1.0], 1, _call)[1]
+            partials.append((arg_ids[0], adj * slope))
+        for a, contribution in partials:
+            if active[a]:
+                adjoints[a] = contribution if adjoints[a] is None else adjoints[a] + contribution
+    result = []
+    for name in names:
+        i = dag.index.get(Var(name))
+        result.append(adjoints[i] if i is not None and adjoints[i] is not None else 0.0)
+    return result
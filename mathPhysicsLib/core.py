@@ -1,3 +1,13 @@
+import functools
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Expr
+from mathphysicslib.rules import differentiate
+from mathphysicslib.serialize import dumps, loads
+
 def validate_var_name(name: str):
     if not isinstance(name, str):
         raise TypeError("variable type is invalid")
@@ -47,28 +57,185 @@ def normalize_respect_to(respect_to, order=1):
         raise TypeError("variable type is invalid")
     return variable_list
 
-def derivative(func, respect_to, order=1):
+def derivative(func, respect_to, order=1, at=None):
     """
-    Placeholder derivative.
-    - Uses normalize_respect_to to compute a differentiation path.
+    Symbolic derivative of an Expr (or formula string) along a differentiation path.
+    - Uses normalize_respect_to to compute the path, e.g. {"x": 3, "y": 2} -> x, x, x, y, y.
     - Returns "func" unchanged when the path is empty.
+    - One (subexpression, variable) -> derivative memo is shared by every step of the path,
+      so subtrees that reappear in later derivatives are not differentiated again.
+    - With at={var: value}, returns the derivative's value at that point (values may be
+      NumPy arrays of points) by forward-mode differentiation (autodiff.derivative_at),
+      without building the derivative expression.
     """
     path = normalize_respect_to(respect_to, order)
     if not path:
         return func
     if func is None:
         raise ValueError("function cannot be empty")
-    raise NotImplementedError("derivative not implemented yet")
+    if isinstance(func, str):
+        func = parse_to_func(func)
+    if at is not None:
+        from mathphysicslib.autodiff import derivative_at   # autodiff imports this module
+        return derivative_at(func, path, at)
+    cache = {}
+    for var in path:
+        func = differentiate(func, var, cache)
+    return func
 
-def integral(func, respect_to, order=1):
+def integral(func, respect_to, order=1, bounds=None, params=None, method=None, **options):
     """
-    Placeholder integral.
+    Integral of an Expr (or formula string).
     - Uses normalize_respect_to to compute an integration path.
     - Returns "func" unchanged when the path is empty.
+    - With bounds, the definite integral is computed numerically and returned as a
+      QuadResult (value, error, evaluations). 'options' go to the method's function.
+        - one variable, bounds=(a, b): adaptive Gauss-Kronrod (quadrature.quad). Bounds
+          and params may be arrays: one integral per broadcast element, all evaluated together.
+        - several variables ({"x": 1, "y": 1, "z": 1} or ["x", "y", "z"]): bounds is a
+          dict {var: (a, b)} or a list of pairs in path order, and 'method' is "sparse"
+          (Smolyak sparse grid, the default; it falls back to qmc when its levels do not
+          converge) or "qmc" (randomized quasi-Monte Carlo),
+          see cubature.sparse_grid / cubature.qmc.
+    - Symbolic (indefinite) integration is not implemented yet.
+    Raises:
+      - ValueError when a variable repeats in a definite integral, or on an unknown method.
     """
     path = normalize_respect_to(respect_to, order)
     if not path:
         return func
     if func is None:
         raise ValueError("function cannot be empty")
-    raise NotImplementedError("integral not implemented yet")
+    if bounds is None:
+        raise NotImplementedError("integral not implemented yet")
+    if isinstance(func, str):
+        func = parse_to_func(func)
+    # quadrature and cubature compile through numeric, which imports this module
+    from mathphysicslib import cubature, quadrature
+    if method is None:
+        method = "gauss-kronrod" if len(path) == 1 else "sparse"
+    if method == "gauss-kronrod":
+        if len(path) != 1:
+            raise ValueError("gauss-kronrod integrates over exactly one variable")
+        if isinstance(bounds, dict):
+            bounds = bounds[path[0]]
+        return quadrature.quad(func, path[0], bounds, params, **options)
+    if method not in cubature.METHODS:
+        raise ValueError(f"unknown method {method!r}, expected 'gauss-kronrod' or one of {cubature.METHODS}")
+    if len(path) == 1 and not isinstance(bounds, dict) and len(bounds) == 2 \
+            and not isinstance(bounds[0], (list, tuple)):
+        bounds = [bounds]
+    integrate = cubature.sparse_grid if method == "sparse" else cubature.qmc
+    return integrate(func, path, bounds, params, **options)
+
+class BatchError(Exception):
+    """
+    The failure of one item in batch_map / batch_derivative.
+    With errors="capture" it is returned in place of the item's result; with
+    errors="raise" the first one (in input order) is raised.
+    """
+
+    def __init__(self, index, error_type, message, details=""):
+        super().__init__(index, error_type, message, details)
+        self.index = index
+        self.error_type = error_type
+        self.message = message
+        self.details = details   # formatted traceback from the worker
+
+    def __str__(self):
+        return f"item {self.index}: {self.error_type}: {self.message}"
+
+    def __repr__(self):
+        return f"BatchError({self.index}, {self.error_type!r}, {self.message!r})"
+
+def batch_map(fn, items, workers=None, chunksize=None, errors="capture"):
+    """
+    Apply 'fn' to every item over a process pool and return the results in input order.
+
+        batch_map(parse_to_func, formulas, workers=8)
+
+    - Items are sent in chunks (default: about four chunks per worker) to amortize
+      inter-process overhead. Expr items and results travel as one serialized DAG per
+      chunk, so shared subtrees are shipped once and deep trees do not hit pickle's
+      recursion limit; everything else is pickled.
+    - 'fn' must be picklable (a module-level function or a functools.partial of one).
+    - workers=None uses every core; workers=1 (or a single chunk) runs in this process.
+    - errors="capture" puts a BatchError in the slot of each failing item,
+      errors="raise" raises the first BatchError after the batch has run.
+    """
+    if errors not in ("capture", "raise"):
+        raise ValueError("errors must be 'capture' or 'raise'")
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError("workers must be a positive integer")
+    if chunksize is None:
+        chunksize = max(1, -(-len(items) // (workers * 4)))
+    if not isinstance(chunksize, int) or chunksize < 1:
+        raise ValueError("chunksize must be a positive integer")
+    starts = range(0, len(items), chunksize)
+    if workers == 1 or len(starts) <= 1:
+        results = _apply(fn, items, 0)
+    else:
+        payloads = [(fn, start, _pack(items[start:start + chunksize])) for start in starts]
+        results = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(payloads))) as pool:
+            for packed in pool.map(_run_chunk, payloads):
+                results.extend(_unpack(packed))
+    if errors == "raise":
+        for r in results:
+            if isinstance(r, BatchError):
+                raise r
+    return results
+
+def batch_derivative(funcs, respect_to, order=1, workers=None, chunksize=None, errors="capture"):
+    """
+    derivative() of many formulas (Exprs or strings) along one differentiation path,
+    in parallel. The path is validated once, up front, with normalize_respect_to;
+    strings are parsed in the workers. See batch_map for the remaining arguments.
+    """
+    path = tuple(normalize_respect_to(respect_to, order))
+    return batch_map(functools.partial(_derive_along, path=path), funcs,
+                     workers=workers, chunksize=chunksize, errors=errors)
+
+def _derive_along(func, path):
+    return derivative(func, list(path))
+
+def _apply(fn, items, first_index):
+    results = []
+    for k, item in enumerate(items):
+        try:
+            results.append(fn(item))
+        except Exception as exc:
+            results.append(BatchError(first_index + k, type(exc).__name__, str(exc),
+                                      traceback.format_exc()))
+    return results
+
+def _run_chunk(payload):
+    # Worker side: decode a chunk, apply fn item by item, encode the results
+    fn, start, packed = payload
+    return _pack(_apply(fn, _unpack(packed), start))
+
+def _pack(values):
+    # Expr values go into one serialized DAG (positions recorded); the rest stay as they are
+    positions = [k for k, v in enumerate(values) if isinstance(v, Expr)]
+    if not positions:
+        return None, (), values
+    try:
+        blob = dumps([values[k] for k in positions])
+    except TypeError:
+        return None, (), values   # not storable in the binary format: let pickle handle it
+    rest = list(values)
+    for k in positions:
+        rest[k] = None
+    return blob, positions, rest
+
+def _unpack(packed):
+    blob, positions, values = packed
+    if blob is None:
+        return list(values)
+    values = list(values)
+    for k, expr in zip(positions, loads(blob)):
+        values[k] = expr
+    return values
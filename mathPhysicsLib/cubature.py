@@ -0,0 +1,331 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; multi-dimensional integration requires it
+    np = None
+
+import functools
+import itertools
+import math
+
+from mathphysicslib.core import batch_map
+from mathphysicslib.expresso import Expr, Var
+from mathphysicslib.numeric import compile
+from mathphysicslib.quadrature import QuadResult
+
+# Joe-Kuo primitive polynomials and initial direction numbers (new-joe-kuo-6.21201),
+# one (degree s, coefficients a, m_1..m_s) row per Sobol dimension after the first.
+_SOBOL_TABLE = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+_BITS = 32
+SOBOL_MAX_DIM = len(_SOBOL_TABLE) + 1
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71)
+METHODS = ("sparse", "qmc")
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("multi-dimensional integration requires NumPy")
+
+@functools.lru_cache(maxsize=None)
+def _directions(dim):
+    """Unscrambled Sobol direction numbers v_1..v_32 (as 32-bit ints) of each dimension."""
+    table = [[1 << (_BITS - k) for k in range(1, _BITS + 1)]]
+    for s, a, m in _SOBOL_TABLE[:dim - 1]:
+        v = [m[k] << (_BITS - 1 - k) for k in range(s)]
+        for k in range(s, _BITS):
+            x = v[k - s] ^ (v[k - s] >> s)
+            for r in range(1, s):
+                if (a >> (s - 1 - r)) & 1:
+                    x ^= v[k - r]
+            v.append(x)
+        table.append(v)
+    return tuple(tuple(v) for v in table)
+
+def _scramble(directions, rng):
+    # Linear matrix scramble: multiply the bits (MSB first) of every direction number
+    # by a random lower-triangular binary matrix with unit diagonal, over GF(2)
+    lower = np.tril(rng.integers(0, 2, (_BITS, _BITS)), -1) + np.eye(_BITS, dtype=np.int64)
+    place = np.uint64(1) << np.arange(_BITS - 1, -1, -1, dtype=np.uint64)
+    bits = (np.asarray(directions, dtype=np.uint64)[:, None] & place) != 0
+    scrambled = (bits.astype(np.int64) @ lower.T) & 1
+    return (scrambled.astype(np.uint64) * place).sum(axis=1, dtype=np.uint64)
+
+def sobol(n, dim, seed=None, scramble=True, skip=0):
+    """
+    Points skip .. skip+n-1 of the 'dim'-dimensional Sobol sequence, as an (n, dim) array in [0, 1).
+
+    - scramble=True applies a random linear matrix scramble and digital shift drawn
+      from 'seed' (Matousek): the points stay a low-discrepancy net, but every point
+      is uniformly distributed, so independent seeds give independent unbiased estimates.
+      The same seed always gives the same sequence, so blocks can be generated separately.
+    - Balance properties hold for runs of a power-of-two length starting at a multiple of it.
+    Raises:
+      - ValueError if dim is not in 1..SOBOL_MAX_DIM or the indices exceed 2**32.
+    """
+    _require_numpy()
+    if not 1 <= dim <= SOBOL_MAX_DIM:
+        raise ValueError(f"Sobol points are available in 1..{SOBOL_MAX_DIM} dimensions")
+    if skip < 0 or n < 0 or skip + n > 1 << _BITS:
+        raise ValueError("Sobol indices must lie in [0, 2**32)")
+    directions = _directions(dim)
+    shift = [0] * dim
+    if scramble:
+        rng = np.random.default_rng(seed)
+        directions = [_scramble(v, rng) for v in directions]
+        shift = [int(rng.integers(0, 1 << _BITS)) for _ in range(dim)]
+    v = np.array(list(directions), dtype=np.uint64).T      # (bits, dim)
+    index = np.arange(skip, skip + n, dtype=np.uint64)
+    x = np.tile(np.array(shift, dtype=np.uint64), (n, 1))
+    for bit in range(max(1, int(skip + n - 1).bit_length())):
+        on = ((index >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        x[on] ^= v[bit]
+    return x * (1.0 / (1 << _BITS))
+
+def halton(n, dim, seed=None, scramble=True, skip=0):
+    """
+    Points skip .. skip+n-1 of the 'dim'-dimensional Halton sequence, as an (n, dim) array in [0, 1).
+
+    - Dimension j is the radical inverse in the j-th prime base. scramble=True replaces
+      every digit position by an independent random permutation of the digits drawn
+      from 'seed' (random digit scrambling), which removes the correlation of the
+      higher bases and makes each point uniformly distributed.
+    Raises:
+      - ValueError if dim is not in 1..len(_PRIMES).
+    """
+    _require_numpy()
+    if not 1 <= dim <= len(_PRIMES):
+        raise ValueError(f"Halton points are available in 1..{len(_PRIMES)} dimensions")
+    rng = np.random.default_rng(seed) if scramble else None
+    index = np.arange(skip, skip + n, dtype=np.int64)
+    points = np.empty((n, dim))
+    for j, base in enumerate(_PRIMES[:dim]):
+        # enough digits to reach double precision
+        digits = int(math.ceil(53 * math.log(2) / math.log(base)))
+        if not scramble:
+            digits = max(1, int(math.ceil(math.log(skip + n + 1, base))) + 1)
+        rest = index.copy()
+        x = np.zeros(n)
+        scale = 1.0 / base
+        for _ in range(digits):
+            digit = rest % base
+            if rng is not None:
+                digit = rng.permutation(base)[digit]
+            x += digit * scale
+            rest //= base
+            scale /= base
+        points[:, j] = x
+    return points
+
+SEQUENCES = {"sobol": sobol, "halton": halton}
+
+def _prepare(expr, variables, bounds, params):
+    # -> (compiled fn, lower corners, widths, param values); bounds: dict or pairs in order
+    if not isinstance(expr, Expr):
+        raise TypeError("integrand must be an Expr")
+    names = [v.name if isinstance(v, Var) else v for v in variables]
+    if len(set(names)) != len(names):
+        raise ValueError("each integration variable may appear only once")
+    if isinstance(bounds, dict):
+        if set(bounds) != set(names):
+            raise ValueError("bounds must be given for exactly the integration variables")
+        bounds = [bounds[n] for n in names]
+    bounds = [tuple(map(float, pair)) for pair in bounds]
+    if len(bounds) != len(names) or any(len(pair) != 2 for pair in bounds):
+        raise ValueError("one (lower, upper) pair is needed per integration variable")
+    if any(math.isinf(v) for pair in bounds for v in pair):
+        raise ValueError("multi-dimensional integration needs finite bounds")
+    params = dict(params or {})
+    if set(params) & set(names):
+        raise ValueError("integration variables cannot be parameters")
+    _require_numpy()
+    fn = compile(expr, names + list(params), backend="numpy")
+    lower = np.array([a for a, _ in bounds])
+    width = np.array([b - a for a, b in bounds])
+    return fn, lower, width, [float(v) for v in params.values()]
+
+def _evaluate(fn, unit, lower, width, values):
+    # f at the points a + (b - a) * u of the unit-cube rows 'unit'
+    x = lower + width * unit
+    return np.broadcast_to(fn(*x.T, *values), (len(unit),))
+
+@functools.lru_cache(maxsize=64)
+def _clenshaw_curtis(level, resolution):
+    """
+    Nested Clenshaw-Curtis rule of 'level' on [0, 1], with the nodes given as integer
+    positions on the grid of level 'resolution' (node J sits at (1 - cos(pi J / M)) / 2,
+    M = 2**(resolution - 1)), so nodes shared between levels compare equal.
+    """
+    if level == 1:
+        return np.array([1 << (resolution - 2)]), np.array([1.0])
+    n = 1 << (level - 1)                     # intervals: 2**(level-1) + 1 nodes
+    j = np.arange(n + 1)
+    w = np.ones(n + 1)
+    for k in range(1, n // 2 + 1):
+        b = 1.0 if 2 * k == n else 2.0
+        w -= b / (4 * k * k - 1) * np.cos(2 * k * j * np.pi / n)
+    w *= np.where((j == 0) | (j == n), 1.0, 2.0) / n
+    return j << (resolution - level), w / 2
+
+def _multi_indices(dim, low, high):
+    # Multi-indices i (every i_k >= 1) with low <= |i| <= high
+    for total in range(max(low, dim), high + 1):
+        for cuts in itertools.combinations(range(1, total), dim - 1):
+            bounds = (0,) + cuts + (total,)
+            yield tuple(bounds[k + 1] - bounds[k] for k in range(dim))
+
+@functools.lru_cache(maxsize=16)
+def smolyak_grid(dim, level):
+    """
+    Smolyak sparse grid of 'level' (0, 1, 2, ...) on the unit cube, from nested
+    Clenshaw-Curtis rules: returns (points, weights, coarse_weights) where the
+    coarse weights are the level-1 rule on the same points (zero where unused),
+    so one set of integrand values gives both estimates. Exact for polynomials of
+    total degree 2*level + 1.
+    """
+    _require_numpy()
+    resolution = level + 2
+    q = dim + level
+    positions, fine, coarse = [], [], []
+    # terms of the level-k combination formula (offset 0), then those of level k-1
+    for offset in (0, 1):
+        qq = q - offset
+        if qq < dim:
+            continue
+        for index in _multi_indices(dim, qq - dim + 1, qq):
+            coef = (-1) ** (qq - sum(index)) * math.comb(dim - 1, qq - sum(index))
+            rules = [_clenshaw_curtis(l, resolution) for l in index]
+            grids = np.meshgrid(*[r[0] for r in rules], indexing="ij")
+            positions.append(np.stack([g.ravel() for g in grids], axis=1))
+            w = functools.reduce(np.multiply.outer, [r[1] for r in rules]).ravel() * coef
+            fine.append(w if offset == 0 else np.zeros_like(w))
+            coarse.append(w if offset == 1 else np.zeros_like(w))
+    positions = np.concatenate(positions)
+    shape = ((1 << (resolution - 1)) + 1,) * dim
+    if math.prod(shape) < 1 << 63:
+        # merge shared nodes through one integer key per point (much faster than rows)
+        keys, inverse = np.unique(np.ravel_multi_index(positions.T, shape), return_inverse=True)
+        unique = np.stack(np.unravel_index(keys, shape), axis=1)
+    else:
+        unique, inverse = np.unique(positions, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    points = (1 - np.cos(np.pi * unique / (1 << (resolution - 1)))) / 2
+    grid = (points, np.bincount(inverse, np.concatenate(fine), len(unique)),
+            np.bincount(inverse, np.concatenate(coarse), len(unique)))
+    for array in grid:
+        array.flags.writeable = False   # shared through the cache
+    return grid
+
+def sparse_grid(expr, variables, bounds, params=None, abs_tol=1.49e-8, rel_tol=1.49e-8,
+                level=None, max_level=8, fallback="qmc"):
+    """
+    Integral of an Expr over a box by Smolyak sparse grids.
+
+        sparse_grid(parse_to_func("x**2*y*z"), ["x", "y", "z"], {"x": (0, 1), "y": (0, 2), "z": (0, 1)})
+
+    - The level grows from 1 until two successive levels agree within
+      max(abs_tol, rel_tol * |value|) or 'max_level' is reached; level=k computes that
+      level only. The error estimate is the difference from the previous level.
+    - If 'max_level' is reached before two levels agree, the sparse grid has not
+      converged and its value cannot be trusted (peaked integrands need levels far
+      beyond it). With fallback="qmc" the integral is then computed by qmc() with the
+      same tolerances, and the result counts the evaluations of both; with
+      fallback=None a ValueError is raised.
+    - Each level evaluates the compiled integrand on all its grid points in one call.
+      Sparse grids suit smooth integrands in a few to a dozen dimensions.
+    Raises:
+      - ValueError on bad bounds (they must be finite) or variables not covered, or
+        when the levels do not converge and there is no fallback.
+      - ImportError without NumPy.
+    """
+    if fallback not in (None, "qmc"):
+        raise ValueError(f"unknown fallback {fallback!r}, expected 'qmc' or None")
+    fn, lower, width, values = _prepare(expr, variables, bounds, params)
+    volume = float(np.prod(width))
+    evaluations = 0
+    levels = [level] if level is not None else range(1, max_level + 1)
+    for k in levels:
+        points, weights, coarse = smolyak_grid(len(lower), k)
+        f = _evaluate(fn, points, lower, width, values)
+        evaluations += len(points)
+        value = volume * float(f @ weights)
+        error = abs(value - volume * float(f @ coarse))
+        if error <= max(abs_tol, rel_tol * abs(value)):
+            break
+    else:
+        if level is None:
+            if fallback is None:
+                raise ValueError(f"sparse grid did not converge by level {max_level}: "
+                                 f"{value} differs from the previous level by {error}")
+            result = qmc(expr, variables, bounds, params, abs_tol=abs_tol, rel_tol=rel_tol)
+            return result._replace(evaluations=result.evaluations + evaluations)
+    return QuadResult(value, error, evaluations)
+
+def _qmc_block(block, integrand, lower, width, values, sequence):
+    # Sum of f over points start..stop of one randomized sequence (worker-safe)
+    expr, names = integrand
+    fn = compile(expr, names, backend="numpy")
+    seed, start, stop = block
+    unit = SEQUENCES[sequence](stop - start, len(lower), seed=seed, skip=start)
+    return float(_evaluate(fn, unit, lower, width, values).sum())
+
+def qmc(expr, variables, bounds, params=None, abs_tol=1.49e-8, rel_tol=1e-4,
+        sequence="sobol", points=1024, replicates=8, max_points=1 << 20, seed=None,
+        workers=None, block=1 << 16):
+    """
+    Integral of an Expr over a box by randomized quasi-Monte Carlo.
+
+        qmc(expr, ["x", "y", "z", "u"], bounds, sequence="halton", seed=1)
+
+    - 'replicates' independently scrambled Sobol (or Halton) sequences each give an
+      unbiased estimate; the value is their mean and the error their standard error.
+      Points per replicate start at 'points' and double, extending the same sequences,
+      until the error is within max(abs_tol, rel_tol * |value|) or 'max_points' is reached.
+    - The points are evaluated in vectorized blocks of at most 'block' per call. With
+      workers=n the blocks are spread over n processes by core.batch_map.
+    Raises:
+      - ValueError on bad bounds, an unknown sequence or too many dimensions for it.
+      - ImportError without NumPy.
+    """
+    if sequence not in SEQUENCES:
+        raise ValueError(f"unknown sequence {sequence!r}, expected one of {tuple(SEQUENCES)}")
+    if replicates < 2:
+        raise ValueError("at least two replicates are needed for an error estimate")
+    fn, lower, width, values = _prepare(expr, variables, bounds, params)
+    names = [v.name if isinstance(v, Var) else v for v in variables] + list(params or {})
+    seeds = np.random.SeedSequence(seed).generate_state(replicates, dtype=np.uint64)
+    volume = float(np.prod(width))
+    sums = np.zeros(replicates)
+    done, n = 0, points
+    while True:
+        blocks = [(int(s), start, min(start + block, n)) for s in seeds for start in range(done, n, block)]
+        if workers is None:
+            partial = [float(_evaluate(fn, SEQUENCES[sequence](stop - start, len(lower), seed=s, skip=start),
+                                       lower, width, values).sum()) for s, start, stop in blocks]
+        else:
+            task = functools.partial(_qmc_block, integrand=(expr, names), lower=lower, width=width,
+                                     values=values, sequence=sequence)
+            partial = batch_map(task, blocks, workers=workers, errors="raise")
+        per_replicate = len(blocks) // replicates
+        sums += np.add.reduceat(partial, range(0, len(blocks), per_replicate))
+        done = n
+        estimates = volume * sums / n
+        value = float(estimates.mean())
+        error = float(estimates.std(ddof=1) / math.sqrt(replicates))
+        if error <= max(abs_tol, rel_tol * abs(value)) or 2 * n > max_points:
+            break
+        n *= 2
+    return QuadResult(value, error, replicates * n)
@@ -0,0 +1,143 @@
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Func, children
+
+class DAG:
+    """
+    Expression DAG: every distinct subexpression of one or more trees, stored once.
+
+      - nodes[i]   : the Expr for entry i (the first equal subtree encountered)
+      - args[i]    : tuple of entry indices of its operands, in stored order
+      - uses[i]    : how many operand slots (plus outputs) refer to entry i
+      - outputs    : entry index of each input tree, in input order
+      - index      : Expr -> entry index (structural lookup)
+
+    Entries are topologically ordered: operands always come before the nodes using them,
+    so a single forward pass evaluates everything and a reverse pass accumulates adjoints.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.args = []
+        self.uses = []
+        self.outputs = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __repr__(self):
+        return f"DAG({len(self.nodes)} nodes, {len(self.outputs)} outputs)"
+
+    def add(self, expr):
+        """Insert a tree (sharing entries with what is already there) and return its root index."""
+        if not isinstance(expr, Expr):
+            raise TypeError("DAG entries must be Expr nodes")
+        seen = {}   # id(node) -> entry index, so shared objects are only looked up once
+        stack = [(expr, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in seen:
+                continue
+            i = self.index.get(node)
+            if i is not None:
+                seen[id(node)] = i
+                continue
+            ops = children(node)
+            if ops and not expanded:
+                stack.append((node, True))
+                for c in ops:
+                    if not isinstance(c, Expr):
+                        raise TypeError(f"cannot add non-expression operand {c!r}")
+                    stack.append((c, False))
+                continue
+            arg_ids = tuple(seen[id(c)] for c in ops)
+            for a in arg_ids:
+                self.uses[a] += 1
+            i = len(self.nodes)
+            self.nodes.append(node)
+            self.args.append(arg_ids)
+            self.uses.append(0)
+            self.index[node] = i
+            seen[id(node)] = i
+        root = seen[id(expr)]
+        self.uses[root] += 1
+        self.outputs.append(root)
+        return root
+
+    def map(self, fn):
+        """
+        Evaluate fn(node, operand_values) once per entry, in topological order.
+        Returns the list of values, indexed like 'nodes'.
+        """
+        values = []
+        for node, arg_ids in zip(self.nodes, self.args):
+            values.append(fn(node, [values[i] for i in arg_ids]))
+        return values
+
+    def shared(self):
+        # Entries referenced more than once, i.e. the common subexpressions
+        return [self.nodes[i] for i, n in enumerate(self.uses) if n > 1 and self.args[i]]
+
+def build_dag(exprs):
+    """
+    Common-subexpression elimination: turn one Expr or a batch of them into a DAG in
+    which each structurally distinct subexpression appears exactly once.
+
+        dag = build_dag([hamiltonian, lagrangian])
+        values = dag.map(evaluate_node)
+        h, l = (values[i] for i in dag.outputs)
+    """
+    dag = DAG()
+    if isinstance(exprs, Expr):
+        exprs = [exprs]
+    for e in exprs:
+        dag.add(e)
+    return dag
+
+def distinct_subtrees(exprs):
+    """
+    The distinct subtrees of 'exprs', operands first, as (nodes, operand numbers, roots).
+    Like build_dag, but equal subtrees are merged only when their constants have the
+    same types too: build_dag merges 2 and 2.0 (they compare equal), which conversions
+    that must keep the exact constants (serialization, polynomials) cannot do.
+    Raises:
+      - TypeError for inputs or operands that are not Expr nodes.
+    """
+    nodes, node_args, outputs = [], [], []
+    numbers = {}   # typed key -> node number
+    seen = {}      # id(node) -> node number, so shared objects are keyed once
+    for expr in exprs:
+        if not isinstance(expr, Expr):
+            raise TypeError("expression must be an Expr")
+        stack = [(expr, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in seen:
+                continue
+            if not isinstance(node, Expr):
+                raise TypeError(f"cannot add non-expression operand {node!r}")
+            operands = children(node)
+            if operands and not expanded:
+                stack.append((node, True))
+                stack.extend((o, False) for o in reversed(operands))
+                continue
+            arg_ids = tuple(seen[id(o)] for o in operands)
+            key = _typed_key(node, arg_ids)
+            number = numbers.get(key)
+            if number is None:
+                number = numbers[key] = len(nodes)
+                nodes.append(node)
+                node_args.append(arg_ids)
+            seen[id(node)] = number
+        outputs.append(seen[id(expr)])
+    return nodes, node_args, outputs
+
+def _typed_key(node, arg_ids):
+    if isinstance(node, Constant):
+        v = node.value
+        # hex() also keeps -0.0 apart from 0.0
+        return (Constant, type(v), v.hex() if isinstance(v, float) else v)
+    if isinstance(node, (Var, Func)):
+        return (type(node), node.name, arg_ids)
+    if isinstance(node, (Add, Mul)):
+        return (type(node), tuple(sorted(arg_ids)))   # operand order does not matter
+    return (type(node), arg_ids)
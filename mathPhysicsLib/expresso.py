@@ -1,52 +1,297 @@
-class Expr:
-    pass # Base class for all expressions (placeholder)
+import weakref
+from contextlib import contextmanager
+
+# Interning (hash-consing) state: one weak-value table shared by every node type.
+# Entries disappear with their last outside reference, so the table never keeps trees alive.
+_intern_table = weakref.WeakValueDictionary()
+_interning = False
+
+# Nodes are frozen, so constructors write their slots through object.__setattr__
+_set = object.__setattr__
+
+class InternKey:
+    """
+    Intern-table key: a canonical key with its hash computed once (tuples rehash recursively),
+    and for composite nodes their children, which must be the same (interned) objects.
+    """
+    __slots__ = ("key", "hash", "args")
+    def __init__(self, key, hash_value, args=None):
+        self.key = key
+        self.hash = hash_value
+        self.args = args
+    def __hash__(self):
+        return self.hash
+    def __eq__(self, other):
+        # Interned children share key objects, so this compare short-circuits on identity
+        if self.hash != other.hash or not keys_equal(self.key, other.key):
+            return False
+        a, b = self.args, other.args
+        if a is b or all(x is y for x, y in zip(a, b)):
+            return True
+        # Add/Mul operands are stored in construction order: compare them as a multiset
+        return self.key[0] in ("Add", "Mul") and sorted(map(id, a)) == sorted(map(id, b))
+
+class ExprMeta(type):
+    def __call__(cls, *args):
+        node = type.__call__(cls, *args)
+        if not _interning or node._key is None:
+            return node
+        ikey = _intern_key(node)
+        shared = _intern_table.get(ikey)
+        if shared is not None:
+            return shared   # a hit matched children that are interned already
+        if ikey.args is not None and not all(map(_is_interned, ikey.args)):
+            return _intern_tree(node)
+        _intern_table[ikey] = node
+        return node
+
+def _intern_key(node):
+    if isinstance(node, Constant):
+        # 2 and 2.0 compare equal but must not be merged into one node
+        return InternKey((node._key, type(node.value)), node._hash)
+    if isinstance(node, Var):
+        return InternKey(node._key, node._hash)
+    # Nor may x**2 and x**2.0: composites also compare their children by identity
+    return InternKey(node._key, node._hash, children(node))
+
+def _is_interned(node):
+    # The table holds this very node (so, recursively, its children too)
+    return isinstance(node, Expr) and node._key is not None and _intern_table.get(_intern_key(node)) is node
+
+class Expr(metaclass=ExprMeta):
+    """
+    Base class for all expressions.
+
+    Every node computes its structural key and hash once, at construction, from
+    the cached values of its children, so key(), __hash__ and __eq__ never walk
+    the tree again. Nodes are immutable (slots only, no __dict__, tuple-backed
+    children), so the cached key can never go stale.
+    """
+    __slots__ = ("_key", "_hash", "__weakref__")
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def key(self):
+        k = self._key
+        if k is None:
+            raise TypeError(f"{type(self).__name__} has a non-expression operand and no structural key")
+        return k
+
+    def __eq__(self, other):
+        # Same node is trivially equal; otherwise cached hashes reject most mismatches cheaply
+        if self is other:
+            return True
+        return isinstance(other, Expr) and self._hash == other._hash and keys_equal(self.key(), other.key())
+
+    def __hash__(self):
+        if self._hash is None:
+            self.key()  # raises for nodes without a key
+        return self._hash
+
+def keys_equal(a, b):
+    """
+    Compare two structural keys. Keys of deep trees are deeply nested tuples, which
+    the built-in comparison walks recursively; when that overflows, fall back to an
+    explicit-stack walk.
+    """
+    try:
+        return a == b
+    except RecursionError:
+        pass
+    stack = [(a, b)]
+    while stack:
+        a, b = stack.pop()
+        if a is b:
+            continue
+        if type(a) is tuple and type(b) is tuple:
+            if len(a) != len(b):
+                return False
+            stack.extend(zip(a, b))
+        elif type(a) is tuple or type(b) is tuple or a != b:
+            return False
+    return True
+
+def constant_key(v):
+    # Canonical key of a constant value (integral floats compare like ints)
+    if v == 0:
+        return ("Const", 0)
+    if isinstance(v, float):
+        if v.is_integer():
+            return ("Const", int(v))
+        return ("Const", v)
+    return ("Const", v)
 
 class Constant(Expr):
+    __slots__ = ("value",)
     def __init__(self, value):
-        self.value = value
+        key = constant_key(value)
+        _set(self, "value", value)
+        _set(self, "_key", key)
+        _set(self, "_hash", hash(key))
     def __repr__(self):
         return str(self.value)
-    
-    def key(self):
-        v = self.value
-        if v == 0:
-            return ("Const", 0)
-        if isinstance(v, float):
-            if v.is_integer():
-                return ("Const", int(v))
-            return ("Const", v)
-        if isinstance(v, int):
-            return ("Const", v)
-        return ("Const", v)
-    
-    def __eq__(self, other):
-        # Equality works only if other is also Constant and has same value
-        return isinstance(other, Constant) and self.key() == other.key()
-    def __hash__(self):
-        return hash(self.key())
+    def __reduce__(self):
+        return (Constant, (self.value,))
     
 def constant_conversion(const):
     # Helper: wrap int/float into Constant (excludes bools)
-    if  (isinstance(const, int) or isinstance(const, float)) and not isinstance(const, bool):
+    if isinstance(const, (int, float)):
+        if isinstance(const, bool):
+            raise TypeError("Boolean expression is not supported")
         return Constant(const)
-    elif isinstance(const, bool):
-        raise TypeError("Boolean expression is not supported")
-    else:
-        return const
+    return const
     
 class Var(Expr):
+    __slots__ = ("name",)
     def __init__(self, name):
-        self.name = name
+        key = ("Var", name)
+        _set(self, "name", name)
+        _set(self, "_key", key)
+        _set(self, "_hash", hash(key))
     def __repr__(self):
         return self.name
-    def key(self):
-        n = self.name
-        return ("Var", n)
-    def __eq__(self, other):
-        # Equality works only if other is Var with same name
-        return isinstance(other, Var) and self.key() == other.key()
-    def __hash__(self):
-        return hash(self.key())
+    def __reduce__(self):
+        return (Var, (self.name,))
+
+def variadic_key(tag, children, identity):
+    """
+    Canonical (key, hash) of an Add/Mul built from its children's cached values.
+      - Non-constant child keys are sorted, so operand order does not matter.
+      - The hash combines the sorted child hashes instead of hashing the nested key tuple.
+      - Returns (None, None) when a child is not an Expr.
+    """
+    keys = []
+    hashes = []
+    const_val = None
+    for c in children:
+        if not isinstance(c, Expr) or c._key is None:
+            return None, None
+        if isinstance(c, Constant):
+            if const_val is None:
+                const_val = c.value
+        else:
+            keys.append(c._key)
+            hashes.append(c._hash)
+    if const_val is None:
+        const_val = identity
+    keys.sort()
+    hashes.sort()
+    return (tag, tuple(keys), const_val), hash((tag, tuple(hashes), const_val))
+
+def like_group(group, key):
+    # Walk a hash bucket: each group links to the previous group with the same hash (group[-1])
+    while group is not None and not (group[0] is key or keys_equal(group[0], key)):
+        group = group[-1]
+    return group
+
+def collect_terms(terms):
+    """
+    Group like terms of a sum in one pass over a hash map: 2*x + y + 3*x -> 5*x + y.
+      - A term rest*c (c the numeric factor of a Mul) is grouped under the key of 'rest',
+        computed from the cached child keys without building the Mul.
+      - Terms that occur once are kept as the same object; cancelled groups are dropped.
+    Returns (terms, constant): 'constant' collects products that were purely numeric.
+    """
+    buckets = {}
+    groups = []   # [grouping key, first term, has coefficient, coefficient, count, previous group with the same hash]
+    constant = 0
+    merged = False
+    for t in terms:
+        if not isinstance(t, Expr) or t._key is None:
+            groups.append([None, t, False, 1, 1, None])   # no structural key: never combined
+            continue
+        if isinstance(t, Mul) and isinstance(t.factors[-1], Constant):
+            factors = t.factors
+            coef, has_coef = factors[-1].value, True
+            if len(factors) == 1:
+                constant = constant + coef
+                merged = True
+                continue
+            if len(factors) == 2:
+                key, hash_value = factors[0]._key, factors[0]._hash
+            else:
+                key, hash_value = variadic_key("Mul", factors[:-1], 1)
+        else:
+            coef, has_coef = 1, False
+            key, hash_value = t._key, t._hash
+        head = buckets.get(hash_value)
+        group = like_group(head, key) if head is not None else None
+        if group is None:
+            group = [key, t, has_coef, coef, 1, head]
+            groups.append(group)
+            buckets[hash_value] = group
+        else:
+            group[3] = group[3] + coef
+            group[4] += 1
+            merged = True
+    if not merged:
+        return terms, 0
+    collected = []
+    for _, t, has_coef, coef, count, _ in groups:
+        if count == 1:
+            collected.append(t)
+        elif coef != 0:
+            collected.append(Mul.mul_fold(*(t.factors[:-1] if has_coef else (t,)), coef))
+    return collected, constant
+
+def collect_factors(factors):
+    """
+    Group equal bases of a product in one pass over a hash map: x * y * x**2 -> x**3 * y.
+      - Exponents of a base are summed (numerically when all are constants) and the
+        power is rebuilt with Pow.pow_fold, so x * x**-1 folds to 1.
+      - Factors whose base occurs once are kept as the same object.
+    Returns (factors, constant): 'constant' collects powers that folded to a number.
+    """
+    buckets = {}
+    groups = []   # [grouping key, first factor, base, exponents, previous group with the same hash]
+    merged = False
+    for f in factors:
+        if isinstance(f, Pow):
+            base, exponent = f.base, f.exponent
+        else:
+            base, exponent = f, None
+        if not isinstance(base, Expr) or base._key is None:
+            groups.append([None, f, base, [exponent], None])   # no structural key: never combined
+            continue
+        key, hash_value = base._key, base._hash
+        head = buckets.get(hash_value)
+        group = like_group(head, key) if head is not None else None
+        if group is None:
+            group = [key, f, base, [exponent], head]
+            groups.append(group)
+            buckets[hash_value] = group
+        else:
+            group[3].append(exponent)
+            merged = True
+    if not merged:
+        return factors, 1
+    collected = []
+    constant = 1
+    for _, f, base, exponents, _ in groups:
+        if len(exponents) == 1:
+            collected.append(f)
+            continue
+        exponents = [Constant(1) if e is None else e for e in exponents]
+        if all(isinstance(e, Constant) for e in exponents):
+            total = Constant(sum(e.value for e in exponents))
+        else:
+            total = Add.add_fold(*exponents)
+        power = Pow.pow_fold(base, total)
+        if isinstance(power, Constant):
+            constant = constant * power.value
+        else:
+            collected.append(power)
+    return collected, constant
 
 def variadic_flatten(expr, func_type):
     """
@@ -59,123 +304,138 @@ def variadic_flatten(expr, func_type):
     field = variadic_field[func_type]
     if not isinstance(expr, func_type):
         return expr
-    for x in getattr(expr, field):
-        if isinstance(x, func_type):
-            # Recursive flattening of nested structure
-            flattened.extend(getattr(variadic_flatten(x, func_type), field))
-        else:
+    # Depth-first over nested operands with an explicit stack of iterators (keeps operand order)
+    stack = [iter(getattr(expr, field))]
+    while stack:
+        for x in stack[-1]:
+            if isinstance(x, func_type):
+                stack.append(iter(getattr(x, field)))
+                break
             flattened.append(x)
+        else:
+            stack.pop()
     return func_type(*flattened)
 
 class Add(Expr):
+    __slots__ = ("terms",)
     def __init__(self, *terms):
-        self.terms = []
+        collected = []
         total = 0 # sum of constant
         for i in terms:
             i = constant_conversion(i)
             if isinstance(i, Constant):
                 total = total + i.value # fold constants together
             elif isinstance(i, Add):
-                # flatten nested Adds
-                i = variadic_flatten(i, Add)
+                # flatten nested Adds (their terms are already flat and converted)
                 for j in i.terms:
-                    j = constant_conversion(j)
                     if isinstance(j, Constant):
                         total = total + j.value
                     else:
-                        self.terms.append(j)
+                        collected.append(j)
             else:
-                self.terms.append(i)
+                collected.append(i)
+        if len(collected) > 1:
+            # like terms: x + 2*x -> 3*x
+            collected, folded = collect_terms(collected)
+            total = total + folded
         if total != 0:        
-            self.terms.append(Constant(total)) # keep final constant if nonzero
-        if not self.terms:
-            self.terms = [Constant(0)] # ensure empty sum becomes 0
+            collected.append(Constant(total)) # keep final constant if nonzero
+        if not collected:
+            collected = [Constant(0)] # ensure empty sum becomes 0
+        collected = tuple(collected)
+        key, hash_value = variadic_key("Add", collected, 0)
+        _set(self, "terms", collected)
+        _set(self, "_key", key)
+        _set(self, "_hash", hash_value)
                 
+    @staticmethod
+    def add_fold(*terms):
+        """
+        Smart factory for Add: like Add(*terms), but returns the lone term (or Constant)
+        instead of a one-term Add, e.g. add_fold(x, 0) -> x and add_fold(2, 3) -> 5.
+        """
+        expr = Add(*terms)
+        if len(expr.terms) == 1:
+            return expr.terms[0]
+        return expr
+
     def __repr__(self):
         # Pretty-print as "(a + b + c)"
         return "(" + " + ".join(map(str, self.terms)) + ")"
-
-    def key(self):
-        child_keys = [t.key() for t in self.terms]
-        not_const = []
-        consts = []
-        for i, j in zip(self.terms, child_keys):
-            if isinstance(i, Constant):
-                consts.append(i.value)
-            else:
-                not_const.append(j)
-        if consts:
-            const_val = consts[0]
-        else: 
-            const_val = 0
-        not_const_sorted = tuple(sorted(not_const))
-        return ("Add", not_const_sorted, const_val)
-
-    def __eq__(self, other):
-        return isinstance(other, Add) and self.key() == other.key()
-    
-    def __hash__(self):
-        return hash(self.key())
+    def __reduce__(self):
+        return (Add, self.terms)
 
 class Mul(Expr):
+    __slots__ = ("factors",)
     def __init__(self, *factors):
-        self.factors = []
+        collected = []
         product = 1  # product of constant
         for i in factors:
             i = constant_conversion(i)
             if isinstance(i, Constant) and i.value == 0:
-                self.factors = [Constant(0)]
-                return
+                collected = None
+                break
             elif isinstance(i, Constant) and i.value != 0:
                 product = product * i.value  # fold constants together
             elif isinstance(i, Mul):
-                # flatten nested Mul
-                i = variadic_flatten(i, Mul)
+                # flatten nested Mul (its factors are already flat and converted)
                 for j in i.factors:
-                    j = constant_conversion(j)
                     if isinstance(j, Constant):
                         product = product * j.value
                     else:
-                        self.factors.append(j)
+                        collected.append(j)
             else:
-                self.factors.append(i)
-        if product != 1:
-            self.factors.append(Constant(product))  # keep final constant if not 1
-        if not self.factors:
-            self.factors = [Constant(1)]  # ensure empty product becomes 1
+                collected.append(i)
+        if collected is not None and len(collected) > 1:
+            # equal bases: x * x**2 -> x**3
+            collected, folded = collect_factors(collected)
+            product = product * folded
+        if collected is None or product == 0:
+            collected = [Constant(0)]  # any zero factor makes the product 0
+        else:
+            if product != 1:
+                collected.append(Constant(product))  # keep final constant if not 1
+            if not collected:
+                collected = [Constant(1)]  # ensure empty product becomes 1
+        collected = tuple(collected)
+        key, hash_value = variadic_key("Mul", collected, 1)
+        _set(self, "factors", collected)
+        _set(self, "_key", key)
+        _set(self, "_hash", hash_value)
+
+    @staticmethod
+    def mul_fold(*factors):
+        """
+        Smart factory for Mul: like Mul(*factors), but returns the lone factor (or Constant)
+        instead of a one-factor Mul, e.g. mul_fold(x, 1) -> x and mul_fold(x, 0) -> 0.
+        """
+        expr = Mul(*factors)
+        if len(expr.factors) == 1:
+            return expr.factors[0]
+        return expr
+
     def __repr__(self):
         return "(" + " * ".join(map(str, self.factors)) + ")"
-    
-    def key(self):
-        child_keys = [t.key() for t in self.factors]
-        not_const = []
-        consts = []
-        for i, j in zip(self.factors, child_keys):
-            if isinstance(i, Constant):
-                consts.append(i.value)
-            else:
-                not_const.append(j)
-        if consts:
-            const_val = consts[0]
-        else: 
-            const_val = 1
-        not_const_sorted = tuple(sorted(not_const))
-        return ("Mul", not_const_sorted, const_val)
-
-    def __eq__(self, other):
-        # Compare ignoring term order by sorting string representations (will make proper key later)
-        return isinstance(other, Mul) and self.key() == other.key()
-    
-    def __hash__(self):
-        return hash(self.key())
+    def __reduce__(self):
+        return (Mul, self.factors)
 
 # Mapping of variadic classes to their attribute fields
 variadic_field = {Add:"terms", Mul:"factors"}
 
 class Pow(Expr):
+    __slots__ = ("base", "exponent")
     def __init__(self,base, exponent):
-        self.base = constant_conversion(base)
-        self.exponent = constant_conversion(exponent)
+        base = constant_conversion(base)
+        exponent = constant_conversion(exponent)
+        _set(self, "base", base)
+        _set(self, "exponent", exponent)
+        if (isinstance(base, Expr) and isinstance(exponent, Expr)
+            and base._key is not None and exponent._key is not None):
+            _set(self, "_key", ("Pow", base._key, exponent._key))
+            _set(self, "_hash", hash(("Pow", base._hash, exponent._hash)))
+        else:
+            _set(self, "_key", None)
+            _set(self, "_hash", None)
 
     @staticmethod
     def pow_fold(base, exponent):
@@ -190,10 +450,44 @@ class Pow(Expr):
          - 0**0 -> raises 
          - 0**negative -> raises Division by zero
          - We intentionally do not distribute over products/sums or evaluate floats here to avoid rounding errors.
+         - Folding is iterative: towers like (((x**2)**3)**...)**4 of any height fold
+           without recursion.
         """
-        base = constant_conversion(base)
-        exponent = constant_conversion(exponent)
-        # Trivial identities & guarded zero cases
+        # Exponents of enclosing Pows still waiting to be combined with the folded base
+        # (outermost first), i.e. the explicit stack of the recursive definition.
+        pending = []
+        while True:
+            base = constant_conversion(base)
+            exponent = constant_conversion(exponent)
+            result = Pow._fold_identities(base, exponent)
+            if result is None:
+                if isinstance(base, Pow):
+                    # (x**a)**b: fold the inner power first
+                    pending.append(exponent)
+                    base, exponent = base.base, base.exponent
+                    continue
+                # Keep as Pow
+                result = Pow(base, exponent)
+            while pending:
+                outer = pending.pop()
+                if not isinstance(result, Pow):
+                    # inner became non Pow, try folding at inner
+                    folded = Pow._fold_identities(result, outer)
+                    result = folded if folded is not None else Pow(result, outer)
+                elif (isinstance(outer, Constant) and isinstance(result.exponent, Constant)
+                      and isinstance(outer.value, int) and isinstance(result.exponent.value, int)):
+                    # (x**a)**b -> x**(a*b), when a,b are ints
+                    base, exponent = result.base, Constant(outer.value * result.exponent.value)
+                    break
+                else:
+                    # Can't combine exponents, keep folded inner
+                    result = Pow(result, outer)
+            else:
+                return result
+
+    @staticmethod
+    def _fold_identities(base, exponent):
+        """Trivial identities, guarded zero cases and int**int folding; None if none applies."""
         if isinstance(exponent, Constant) and exponent.value == 0:
             if isinstance(base, Constant) and base.value == 0:
                 raise ValueError("Can't compute 0**0")
@@ -213,29 +507,126 @@ class Pow(Expr):
         if (isinstance(base, Constant) and isinstance(exponent, Constant) 
             and type(base.value) == int and type(exponent.value) == int
             and exponent.value >= 0):
-            return Constant(base.value**exponent.value)            
-        # (x**a)**b -> x**(a*b), when a,b are ints
-        if isinstance(base, Pow):
-            inner = Pow.pow_fold(base.base, base.exponent)
-            if isinstance(inner, Pow):
-                if (isinstance(exponent, Constant) and isinstance(inner.exponent, Constant)
-                    and isinstance(exponent.value, int) and isinstance(inner.exponent.value, int)):
-                    prod = exponent.value * inner.exponent.value
-                    return Pow.pow_fold(inner.base, Constant(prod))
-                # Can't combine exponents, keep folded inner
-                return Pow(inner, exponent)
-            else:
-                # inner become non Pow, try folding at inner
-                return Pow.pow_fold(inner, exponent)
-        # Keep as Pow    
-        return Pow(base, exponent)
+            return Constant(base.value**exponent.value)
+        return None
                      
     def __repr__(self):
         return f"({self.base} ** {self.exponent})"
-    def key(self):
-        return ("Pow", self.base.key(), self.exponent.key())
-    def __eq__(self, other):
-        # Compare base & exponent as-is
-        return isinstance(other, Pow) and self.key() == other.key()
-    def __hash__(self):
-        return hash(self.key())
\ No newline at end of file
+    def __reduce__(self):
+        return (Pow, (self.base, self.exponent))
+
+# One-argument elementary functions a Func node may apply
+FUNCTIONS = ("exp", "log", "sin", "cos", "tan", "sinh", "cosh", "tanh", "asin", "acos", "atan")
+
+# Exact values at the points where they are rational: (name, argument) -> value
+_EXACT_VALUES = {("exp", 0): 1, ("log", 1): 0, ("sin", 0): 0, ("cos", 0): 1, ("tan", 0): 0,
+                 ("sinh", 0): 0, ("cosh", 0): 1, ("tanh", 0): 0, ("asin", 0): 0,
+                 ("acos", 1): 0, ("atan", 0): 0}
+
+class Func(Expr):
+    """A named elementary function (one of FUNCTIONS) applied to one operand: sin(x)."""
+    __slots__ = ("name", "arg")
+    def __init__(self, name, arg):
+        if name not in FUNCTIONS:
+            raise ValueError(f"unknown function {name!r}, expected one of {FUNCTIONS}")
+        arg = constant_conversion(arg)
+        _set(self, "name", name)
+        _set(self, "arg", arg)
+        if isinstance(arg, Expr) and arg._key is not None:
+            _set(self, "_key", ("Func", name, arg._key))
+            _set(self, "_hash", hash(("Func", name, arg._hash)))
+        else:
+            _set(self, "_key", None)
+            _set(self, "_hash", None)
+
+    @staticmethod
+    def func_fold(name, arg):
+        """
+        Smart factory for Func: the exact value where it is a rational number
+        (exp(0) -> 1, log(1) -> 0, sin(0) -> 0, ...), otherwise Func(name, arg).
+        Floating-point values are never computed here, as in Pow.pow_fold.
+        """
+        arg = constant_conversion(arg)
+        if isinstance(arg, Constant) and not isinstance(arg.value, bool):
+            try:
+                value = _EXACT_VALUES.get((name, arg.value))
+            except TypeError:   # unhashable constant value
+                value = None
+            if value is not None:
+                return Constant(value)
+        return Func(name, arg)
+
+    def __repr__(self):
+        return f"{self.name}({self.arg})"
+    def __reduce__(self):
+        return (Func, (self.name, self.arg))
+
+def children(expr):
+    # Operands of a node in stored order; leaves have none
+    if isinstance(expr, Pow):
+        return (expr.base, expr.exponent)
+    if isinstance(expr, Func):
+        return (expr.arg,)
+    field = variadic_field.get(type(expr))
+    if field is not None:
+        return getattr(expr, field)
+    return ()
+
+def set_interning(enabled):
+    """Turn interning of newly constructed nodes on or off. Returns the previous setting."""
+    global _interning
+    previous = _interning
+    _interning = bool(enabled)
+    return previous
+
+def interning_enabled():
+    return _interning
+
+@contextmanager
+def interning(enabled=True):
+    """
+    Intern every node constructed inside the block:
+
+        with interning():
+            a = parse_to_func("x**2 + y")
+            b = parse_to_func("y + x**2")
+        assert a is b
+    """
+    previous = set_interning(enabled)
+    try:
+        yield
+    finally:
+        set_interning(previous)
+
+def intern(expr):
+    """Return the shared, interned copy of an existing tree (rebuilt bottom-up)."""
+    if not isinstance(expr, Expr):
+        return expr
+    with interning():
+        return _intern_tree(expr)
+
+def _intern_tree(expr):
+    # Rebuild bottom-up (post-order, explicit stack) so every node is constructed from interned children
+    done = {}   # id(original node) -> interned node
+    stack = [(expr, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in done:
+            continue
+        if _is_interned(node):
+            done[id(node)] = node   # already interned, and so is everything below it
+            continue
+        args = children(node)
+        if not args:
+            done[id(node)] = type(node)(node.value if isinstance(node, Constant) else node.name)
+        elif not expanded:
+            stack.append((node, True))
+            stack.extend((a, False) for a in args if isinstance(a, Expr))
+        else:
+            args = [done[id(a)] if isinstance(a, Expr) else a for a in args]
+            done[id(node)] = Func(node.name, *args) if isinstance(node, Func) else type(node)(*args)
+    return done[id(expr)]
+
+def intern_table_size():
+    # Number of live interned nodes
+    return len(_intern_table)
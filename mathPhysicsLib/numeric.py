@@ -0,0 +1,263 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; compile() falls back to plain Python scalars
+    np = None
+
+import math
+from fractions import Fraction
+
+from mathphysicslib.core import validate_var_name
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Pow, Func
+
+BACKENDS = ("numpy", "math")
+_CHUNK = 64   # operands per generated statement in the "math" backend
+# NumPy ufuncs named differently from the math module's functions (and Func names)
+_UFUNC_NAMES = {"asin": "arcsin", "acos": "arccos", "atan": "arctan"}
+
+def compile(expr, variables, backend=None):
+    """
+    Compile an Expr tree into one Python callable (lambdify-style).
+
+        f = compile(parse_to_func("x**2 + 3*x*y"), ["x", "y"])
+        f(xs, ys)             # whole NumPy arrays, broadcast together
+        f(xs, ys, out=buf)    # write the result into an existing array
+
+    'expr' may also be a list/tuple of Exprs: the callable then returns a tuple and
+    'out' is a matching sequence of buffers (or None entries). The trees are compiled
+    through a common-subexpression DAG, so every distinct subexpression (within or
+    across trees) is computed once per call.
+
+    Backends:
+      - "numpy": arguments are converted to arrays, broadcast to a common shape and
+        promoted to at least float64. Every node is one ufunc call, and Add/Mul
+        accumulate in place so a node costs one temporary, however many operands.
+      - "math": plain Python arithmetic on scalars (the default when NumPy is absent).
+        'out=' is not supported.
+
+    Raises:
+      - TypeError on non-Expr input or operands.
+      - ValueError when the expression uses variables not listed in 'variables',
+        or the backend is unknown.
+      - ImportError when the NumPy backend is requested but NumPy is not installed.
+    """
+    if backend is None:
+        backend = "numpy" if np is not None else "math"
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "numpy" and np is None:
+        raise ImportError("the numpy backend requires NumPy")
+    batch = isinstance(expr, (list, tuple))
+    exprs = list(expr) if batch else [expr]
+    if not all(isinstance(e, Expr) for e in exprs):
+        raise TypeError("expression must be an Expr")
+    if not exprs:
+        raise ValueError("nothing to compile")
+    names = []
+    for v in variables:
+        if isinstance(v, Var):
+            v = v.name
+        validate_var_name(v)
+        names.append(v)
+    if len(set(names)) != len(names):
+        raise ValueError("variables must be distinct")
+    dag = build_dag(exprs)
+    used = {node.name for node in dag.nodes if isinstance(node, Var)}
+    missing = sorted(used - set(names))
+    if missing:
+        raise ValueError(f"expression uses variables not listed: {', '.join(missing)}")
+    source, namespace = _generate(dag, names, backend, batch)
+    exec(source, namespace)
+    fn = namespace["compiled"]
+    fn.source = source
+    fn.variables = tuple(names)
+    return fn
+
+def _constant_value(value):
+    # Exact rationals are evaluated in floating point
+    if isinstance(value, Fraction):
+        return float(value)
+    return value
+
+class _Emitter:
+    """Turns a DAG into straight-line code, one temporary per entry."""
+
+    def __init__(self, names, backend):
+        self.backend = backend
+        self.args = {name: f"a{i}" for i, name in enumerate(names)}
+        self.namespace = {"np": np, "math": math, "_prepare": _prepare, "_fill": _fill,
+                          "_scalar_call": _scalar_call}
+        self.constants = {}
+        self.lines = []
+        self.counter = 0
+        self.written_to_out = {}   # temporary -> 'out' buffer it was computed into
+
+    def constant(self, value):
+        value = _constant_value(value)
+        ident = (type(value), value)
+        name = self.constants.get(ident)
+        if name is None:
+            name = self.constants[ident] = f"c{len(self.constants)}"
+            self.namespace[name] = value
+        return name
+
+    def temp(self):
+        self.counter += 1
+        return f"t{self.counter}"
+
+    def emit(self, node, operands, varying, out_name):
+        """
+        Emit the statement(s) computing 'node' from already-emitted operand names.
+        'varying' tells which operands depend on a variable (arrays, for NumPy);
+        'out_name' is the output buffer to compute into when the node is an output.
+        """
+        if isinstance(node, Pow):
+            op = "power"
+        elif isinstance(node, Add):
+            op = "add"
+        else:
+            op = "multiply"
+        if len(operands) == 1:
+            return operands[0]
+        if op == "power" and self.backend == "numpy" and varying[0] and _small_power(node.exponent):
+            return self.emit_small_power(operands[0], node.exponent.value, out_name)
+        target = self.temp()
+        if self.backend == "math":
+            symbol = {"add": " + ", "multiply": " * ", "power": " ** "}[op]
+            # Bounded chunks per statement: one huge a + b + ... chain overflows Python's compiler
+            self.lines.append(f"{target} = {symbol.join(operands[:_CHUNK])}")
+            for k in range(_CHUNK, len(operands), _CHUNK):
+                self.lines.append(f"{target} = {target}{symbol}{symbol.join(operands[k:k + _CHUNK])}")
+            return target
+        # Put array operands first: the first ufunc call then returns a fresh array
+        # of the full broadcast shape, which the remaining operands update in place.
+        if op != "power":
+            order = sorted(range(len(operands)), key=lambda i: not varying[i])
+            operands = [operands[i] for i in order]
+            in_place = varying[order[0]]
+        else:
+            in_place = False
+        out = ""
+        if out_name is not None and any(varying):
+            out = f", out={out_name}"
+            self.written_to_out[target] = out_name
+        self.lines.append(f"{target} = np.{op}({operands[0]}, {operands[1]}{out})")
+        for extra in operands[2:]:
+            if in_place:
+                self.lines.append(f"np.{op}({target}, {extra}, out={target})")
+            else:
+                self.lines.append(f"{target} = np.{op}({target}, {extra})")
+        return target
+
+    def emit_function(self, name, operand, varying, out_name):
+        # One call of the elementary function: math.<name> or its NumPy ufunc
+        target = self.temp()
+        if self.backend == "math":
+            self.lines.append(f"{target} = math.{name}({operand})")
+            return target
+        out = ""
+        if out_name is not None and varying:
+            out = f", out={out_name}"
+            self.written_to_out[target] = out_name
+        self.lines.append(f"{target} = np.{_UFUNC_NAMES.get(name, name)}({operand}{out})")
+        return target
+
+    def emit_small_power(self, base, n, out_name):
+        # x**n by square-and-multiply, in place in one temporary: np.power is up to two
+        # orders of magnitude slower for negative bases (exponents 2 and below keep it)
+        target = self.temp()
+        out = ""
+        if out_name is not None:
+            out = f", out={out_name}"
+            self.written_to_out[target] = out_name
+        for k, bit in enumerate(bin(n)[3:]):
+            if k == 0:
+                self.lines.append(f"{target} = np.square({base}{out})")
+            else:
+                self.lines.append(f"np.square({target}, out={target})")
+            if bit == "1":
+                self.lines.append(f"np.multiply({target}, {base}, out={target})")
+        return target
+
+def _small_power(exponent):
+    return isinstance(exponent, Constant) and type(exponent.value) is int and 3 <= exponent.value <= 16
+
+def _generate(dag, names, backend, batch):
+    em = _Emitter(names, backend)
+    out_names = ["out"] if not batch else [f"_o{k}" for k in range(len(dag.outputs))]
+    # The first output using an entry gets it computed straight into its buffer
+    out_for = {}
+    for k, i in enumerate(dag.outputs):
+        out_for.setdefault(i, out_names[k])
+    results = []   # entry index -> (name, varying)
+    for i, (node, arg_ids) in enumerate(zip(dag.nodes, dag.args)):
+        if isinstance(node, Constant):
+            results.append((em.constant(node.value), False))
+        elif isinstance(node, Var):
+            results.append((em.args[node.name], True))
+        elif isinstance(node, Func):
+            operand, varying = results[arg_ids[0]]
+            results.append((em.emit_function(node.name, operand, varying, out_for.get(i)), varying))
+        else:
+            ops = [results[a] for a in arg_ids]
+            name = em.emit(node, [o[0] for o in ops], [o[1] for o in ops], out_for.get(i))
+            results.append((name, any(o[1] for o in ops)))
+
+    params = ", ".join(em.args[n] for n in names)
+    head = f"def compiled({params}{', ' if params else ''}out=None):"
+    body = []
+    if backend == "numpy":
+        if names:
+            body.append(f"({params},), _shape, _dtype = _prepare(({params},))")
+            body.append(f"if not _shape: return _scalar_call(compiled, ({params},), out)")
+        else:
+            body.append("_shape, _dtype = (), np.float64")
+        if batch:
+            none = ", ".join(["None"] * len(out_names))
+            body.append(f"{', '.join(out_names)}, = out if out is not None else ({none},)")
+        body.extend(em.lines)
+        returned = []
+        for k, i in enumerate(dag.outputs):
+            root = results[i][0]
+            if em.written_to_out.get(root) == out_names[k]:
+                returned.append(root)
+            else:
+                # leaf, variable-free or repeated output: materialise a fresh array of the broadcast shape
+                returned.append(f"_fill({root}, _shape, _dtype, {out_names[k]})")
+    else:
+        body.append("if out is not None:")
+        body.append("    raise TypeError(\"out= requires the numpy backend\")")
+        body.extend(em.lines)
+        returned = [results[i][0] for i in dag.outputs]
+    if batch:
+        body.append(f"return ({', '.join(returned)}{',' if len(returned) == 1 else ''})")
+    else:
+        body.append(f"return {returned[0]}")
+    source = "\n".join([head] + ["    " + line for line in body]) + "\n"
+    return source, em.namespace
+
+def _prepare(args):
+    # Convert inputs to arrays of one (at least float64) dtype and broadcast them to a common shape
+    arrays = [np.asarray(a) for a in args]
+    dtype = np.result_type(*arrays, np.float64)
+    arrays = np.broadcast_arrays(*[a.astype(dtype, copy=False) for a in arrays])
+    shape = arrays[0].shape if arrays else ()
+    return arrays, shape, dtype
+
+def _scalar_call(fn, args, out):
+    # Ufuncs return scalars for 0-d operands, which in-place updates cannot write to:
+    # run 0-d calls on 1-element arrays (and 1-element views of the 'out' buffers)
+    batch = isinstance(out, (list, tuple))
+    buffers = list(out) if batch else [out]
+    views = [None if o is None else o.reshape(1) for o in buffers]
+    result = fn(*[a.reshape(1) for a in args], out=tuple(views) if batch else views[0])
+    results = result if isinstance(result, tuple) else (result,)
+    results = tuple(r[0] if o is None else o for r, o in
+                    zip(results, buffers if out is not None else [None] * len(results)))
+    return results if isinstance(result, tuple) else results[0]
+
+def _fill(value, shape, dtype, out):
+    if out is None:
+        return np.array(np.broadcast_to(value, shape), dtype=dtype)
+    out[...] = value
+    return out
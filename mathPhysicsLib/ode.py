@@ -0,0 +1,363 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the ODE solvers require it
+    np = None
+
+from typing import NamedTuple
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.autodiff import gradient
+from mathphysicslib.core import validate_var_name
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Expr, Mul, Var
+from mathphysicslib.numeric import compile
+
+METHODS = ("rk45", "dop853", "gbs8", "verlet")
+
+# Dormand-Prince 5(4): stages, 5th-order weights (= last stage row, FSAL) and the
+# difference to the embedded 4th-order weights
+_DP_C = (0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0, 1.0)
+_DP_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+    (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84),
+)
+_DP_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+# Dormand-Prince 8(5,3), Hairer's DOP853: 12 stages and the 8th-order weights (= last
+# stage row, FSAL). The step control combines two embedded error estimates.
+_DOP853_C = (0.0, 0.526001519587677318785587544488e-01, 0.789002279381515978178381316732e-01,
+             0.118350341907227396726757197510, 0.281649658092772603273242802490,
+             0.333333333333333333333333333333, 0.25, 0.307692307692307692307692307692,
+             0.651282051282051282051282051282, 0.6, 0.857142857142857142857142857142, 1.0)
+_DOP853_A = (
+    (),
+    (5.26001519587677318785587544488e-2,),
+    (1.97250569845378994544595329183e-2, 5.91751709536136983633785987549e-2),
+    (2.95875854768068491816892993775e-2, 0.0, 8.87627564304205475450678981324e-2),
+    (2.41365134159266685502369798665e-1, 0.0, -8.84549479328286085344864962717e-1,
+     9.24834003261792003115737966543e-1),
+    (3.7037037037037037037037037037e-2, 0.0, 0.0, 1.70828608729473871279604482173e-1,
+     1.25467687566822425016691814123e-1),
+    (3.7109375e-2, 0.0, 0.0, 1.70252211019544039314978060272e-1,
+     6.02165389804559606850219397283e-2, -1.7578125e-2),
+    (3.70920001185047927108779319836e-2, 0.0, 0.0, 1.70383925712239993810214054705e-1,
+     1.07262030446373284651809199168e-1, -1.53194377486244017527936158236e-2,
+     8.27378916381402288758473766002e-3),
+    (6.24110958716075717114429577812e-1, 0.0, 0.0, -3.36089262944694129406857109825,
+     -8.68219346841726006818189891453e-1, 2.75920996994467083049415600797e1,
+     2.01540675504778934086186788979e1, -4.34898841810699588477366255144e1),
+    (4.77662536438264365890433908527e-1, 0.0, 0.0, -2.48811461997166764192642586468,
+     -5.90290826836842996371446475743e-1, 2.12300514481811942347288949897e1,
+     1.52792336328824235832596922938e1, -3.32882109689848629194453265587e1,
+     -2.03312017085086261358222928593e-2),
+    (-9.3714243008598732571704021658e-1, 0.0, 0.0, 5.18637242884406370830023853209,
+     1.09143734899672957818500254654, -8.14978701074692612513997267357,
+     -1.85200656599969598641566180701e1, 2.27394870993505042818970056734e1,
+     2.49360555267965238987089396762, -3.0467644718982195003823669022),
+    (2.27331014751653820792359768449, 0.0, 0.0, -1.05344954667372501984066689879e1,
+     -2.00087205822486249909675718444, -1.79589318631187989172765950534e1,
+     2.79488845294199600508499808837e1, -2.85899827713502369474065508674,
+     -8.87285693353062954433549289258, 1.23605671757943030647266201528e1,
+     6.43392746015763530355970484046e-1),
+    (5.42937341165687622380535766363e-2, 0.0, 0.0, 0.0, 0.0, 4.45031289275240888144113950566,
+     1.89151789931450038304281599044, -5.8012039600105847814672114227,
+     3.1116436695781989440891606237e-1, -1.52160949662516078556178806805e-1,
+     2.01365400804030348374776537501e-1, 4.47106157277725905176885569043e-2),
+)
+# weights of the embedded 3rd-order formula; E3 and E5 weigh the 3rd- and 5th-order errors
+_DOP853_BHH = (0.244094488188976377952755905512, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0,
+               0.733846688281611857341361741547, 0.0, 0.0, 0.220588235294117647058823529412e-1)
+_DOP853_E3 = tuple(b - c for b, c in zip(_DOP853_A[12], _DOP853_BHH))
+_DOP853_E5 = (0.1312004499419488073250102996e-1, 0.0, 0.0, 0.0, 0.0,
+              -0.1225156446376204440720569753e+1, -0.4957589496572501915214079952,
+              0.1664377182454986536961530415e+1, -0.3503288487499736816886487290,
+              0.3341791187130174790297318841, 0.8192320648511571246570742613e-1,
+              -0.2235530786388629525884427845e-1)
+
+# Substep counts of the Gragg-Bulirsch-Stoer extrapolation: four columns give order 8
+_GBS_SEQUENCE = (2, 4, 6, 8)
+
+class Step(NamedTuple):
+    """One output point of a trajectory: time and state, shaped like the initial state."""
+    t: float
+    y: object
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the ODE solvers require NumPy")
+
+def _free_names(exprs):
+    return {node.name for node in build_dag(list(exprs)).nodes if isinstance(node, Var)}
+
+class ODESystem:
+    """
+    A first-order system y' = f(t, y) whose right-hand sides are Exprs, compiled once.
+
+        ODESystem({"x": "v", "v": Mul(-1, Var("k"), Var("x"))}, params={"k": 4.0})
+
+    - rhs is a dict {state variable: Expr or formula} (state order = dict order), or a
+      list of right-hand sides together with 'state', the list of variable names.
+    - The right-hand sides may use the state variables, 'time' and the params; param
+      values are scalars or arrays with one value per trajectory of a batch.
+    - Calling the system on (t, Y), with Y shaped (len(state), batch), returns Y'.
+    Raises:
+      - TypeError / ValueError on malformed systems or unknown variables.
+      - ImportError without NumPy.
+    """
+
+    def __init__(self, rhs, state=None, time="t", params=None):
+        _require_numpy()
+        if isinstance(rhs, dict):
+            if state is not None:
+                raise ValueError("state is taken from the keys of a dict rhs")
+            state, rhs = list(rhs), list(rhs.values())
+        else:
+            rhs = list(rhs)
+            if state is None or len(state) != len(rhs):
+                raise ValueError("one right-hand side is needed per state variable")
+        names = [v.name if isinstance(v, Var) else v for v in state]
+        for name in names + [time]:
+            validate_var_name(name)
+        params = dict(params or {})
+        if len(set(names) | {time} | set(params)) != len(names) + 1 + len(params):
+            raise ValueError("state variables, time and params must be distinct")
+        exprs = [parse_to_func(e) if isinstance(e, str) else e for e in rhs]
+        if not all(isinstance(e, Expr) for e in exprs):
+            raise TypeError("right-hand sides must be Exprs or formula strings")
+        self.state = tuple(names)
+        self.rhs = tuple(exprs)
+        self.time = time
+        self.params = params
+        self._values = [np.asarray(v, dtype=float) for v in params.values()]
+        self._fn = compile(exprs, names + [time] + list(params), backend="numpy")
+        self._split = None   # (n coordinates, dH/dq, dH/dp) of a separable Hamiltonian
+
+    @classmethod
+    def hamiltonian(cls, H, coordinates, momenta, time="t", params=None):
+        """
+        Hamilton's equations q' = dH/dp, p' = -dH/dq, with the partials taken
+        symbolically by autodiff.gradient. The state is coordinates + momenta.
+        When H = T(p) + V(q) is separable, the system also supports method="verlet".
+        """
+        if isinstance(H, str):
+            H = parse_to_func(H)
+        q = [v.name if isinstance(v, Var) else v for v in coordinates]
+        p = [v.name if isinstance(v, Var) else v for v in momenta]
+        if len(q) != len(p):
+            raise ValueError("one momentum is needed per coordinate")
+        partials = gradient(H, q + p)
+        dq, dp = partials[:len(q)], partials[len(q):]
+        rhs = dict(zip(q, dp))
+        rhs.update(zip(p, [Mul.mul_fold(-1, d) for d in dq]))
+        system = cls(rhs, time=time, params=params)
+        if not _free_names(dq) & set(p) and not _free_names(dp) & set(q):
+            names = list(system.params)
+            system._split = (len(q), compile(dq, q + [time] + names, backend="numpy"),
+                             compile(dp, p + [time] + names, backend="numpy"))
+        return system
+
+    def __call__(self, t, y):
+        return _stack(self._fn(*y, t, *self._values), y.shape[1:])
+
+    def __repr__(self):
+        equations = ", ".join(f"{n}' = {e!r}" for n, e in zip(self.state, self.rhs))
+        return f"ODESystem({equations})"
+
+def _stack(values, shape):
+    # Compiled outputs may be scalars (constant right-hand sides): broadcast to the batch
+    return np.stack([np.broadcast_to(v, shape) for v in values])
+
+def _rk45_step(f, t, y, h, f0):
+    k = [f0]
+    for i in range(1, 7):
+        dy = sum(a * kj for a, kj in zip(_DP_A[i], k) if a)
+        k.append(f(t + _DP_C[i] * h, y + h * dy))
+    y_new = y + h * sum(b * kj for b, kj in zip(_DP_A[6], k) if b)
+    # stage 7 was evaluated at (t + h, y_new): first stage of the next step
+    return y_new, h * sum(e * kj for e, kj in zip(_DP_E, k) if e), k[6]
+
+def _dop853_step(f, t, y, h, f0):
+    k = [f0]
+    for i in range(1, 12):
+        dy = sum(a * kj for a, kj in zip(_DOP853_A[i], k) if a)
+        k.append(f(t + _DOP853_C[i] * h, y + h * dy))
+    y_new = y + h * sum(b * kj for b, kj in zip(_DOP853_A[12], k) if b)
+    err5 = h * sum(e * kj for e, kj in zip(_DOP853_E5, k) if e)
+    err3 = h * sum(e * kj for e, kj in zip(_DOP853_E3, k) if e)
+    return y_new, (err5, err3), None
+
+def _gbs_step(f, t, y, h, f0):
+    # Modified midpoint with n = 2, 4, 6, 8 substeps, extrapolated to h -> 0 in h**2
+    table = []
+    for j, n in enumerate(_GBS_SEQUENCE):
+        sub = h / n
+        z0, z1 = y, y + sub * f0
+        for m in range(1, n):
+            z0, z1 = z1, z0 + 2 * sub * f(t + m * sub, z1)
+        row = [(z0 + z1 + sub * f(t + h, z1)) / 2]
+        for k in range(1, j + 1):
+            ratio = (n / _GBS_SEQUENCE[j - k]) ** 2 - 1
+            row.append(row[k - 1] + (row[k - 1] - table[j - 1][k - 1]) / ratio)
+        table.append(row)
+    return table[-1][-1], table[-1][-1] - table[-1][-2], None
+
+def _rms(values, scale):
+    # RMS over the state of each trajectory
+    return np.sqrt(np.mean((values / scale) ** 2, axis=0))
+
+def _norm(values, scale):
+    # worst trajectory of the batch
+    return float(_rms(values, scale).max())
+
+def _dop853_norm(error, scale):
+    # Hairer's combination err5**2 / sqrt(err5**2 + 0.01*err3**2): the 5th-order estimate,
+    # damped where the 3rd-order one shows it is too pessimistic for the 8th-order step
+    err5, err3 = _rms(error[0], scale), _rms(error[1], scale)
+    denominator = np.sqrt(err5 ** 2 + 0.01 * err3 ** 2)
+    combined = np.divide(err5 ** 2, denominator, out=np.zeros_like(err5), where=denominator > 0)
+    return float(combined.max())
+
+# method -> (stepper, order of the error estimate + 1, largest step growth, error norm)
+_ADAPTIVE = {"rk45": (_rk45_step, 5, 5.0, _norm), "dop853": (_dop853_step, 8, 6.0, _dop853_norm),
+             "gbs8": (_gbs_step, 7, 4.0, _norm)}
+
+def _initial_step(f, t, y, f0, direction, order, atol, rtol):
+    # Hairer, Norsett & Wanner's starting step heuristic
+    scale = atol + rtol * np.abs(y)
+    d0, d1 = _norm(y, scale), _norm(f0, scale)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    f1 = f(t + direction * h0, y + direction * h0 * f0)
+    d2 = _norm(f1 - f0, scale) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1 / order)
+    return min(100 * h0, h1)
+
+def trajectory(system, y0, t_span, method="rk45", rtol=1e-6, atol=1e-9, step=None,
+               t_eval=None, max_steps=1_000_000):
+    """
+    Integrate 'system' from y0 over t_span = (t0, t1), yielding Step(t, y) as it goes.
+
+        for t, y in trajectory(system, y0, (0, 10), t_eval=np.linspace(0, 10, 101)):
+            ...
+
+    - y0 is one state (shape (n,)) or a batch of states (shape (batch, n)); array params
+      of the system also make a batch. A batch is advanced in lockstep as arrays: every
+      step evaluates the compiled right-hand sides once for all trajectories, and the
+      step size is controlled by the worst one.
+    - Without t_eval a Step is yielded after every accepted step (t0 first); with
+      t_eval, steps are shortened to land exactly on those times and only they are
+      yielded. The history is never stored, so long runs use constant memory.
+    - Methods: "rk45" (Dormand-Prince 5(4), adaptive), "dop853" (Dormand-Prince
+      8(5,3), adaptive; for tight tolerances), "gbs8" (8th-order Gragg-Bulirsch-Stoer
+      extrapolation, adaptive; for smooth problems) and "verlet" (velocity Verlet
+      with the fixed 'step', for separable Hamiltonian systems; symplectic, so energy
+      errors stay bounded over long runs).
+      'step' is the initial step of the adaptive methods.
+    Raises:
+      - ValueError on a bad method, state shape or t_eval, or "verlet" on a system
+        that is not a separable Hamiltonian.
+      - RuntimeError when max_steps is exceeded or the step size underflows.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r}, expected one of {METHODS}")
+    t0, t1 = float(t_span[0]), float(t_span[1])
+    direction = 1.0 if t1 >= t0 else -1.0
+    y0 = np.asarray(y0, dtype=float)
+    single = y0.ndim == 1
+    y = (y0[:, None] if single else y0.T).copy()
+    if y.ndim != 2 or y.shape[0] != len(system.state):
+        raise ValueError(f"initial state must have {len(system.state)} components per trajectory")
+    # one initial state with per-trajectory params: start every trajectory from it
+    batch = np.broadcast_shapes(y.shape[1:], *[v.shape for v in system._values])
+    if batch != y.shape[1:]:
+        y = np.broadcast_to(y, (len(system.state),) + batch).copy()
+        single = False
+    if t_eval is None:
+        stops, every = [t1], True
+    else:
+        stops, every = [float(s) for s in t_eval], False
+        if any((s - t0) * direction < 0 or (t1 - s) * direction < 0 for s in stops) \
+                or any((b - a) * direction < 0 for a, b in zip(stops, stops[1:])):
+            raise ValueError("t_eval must be sorted in the direction of integration, within t_span")
+
+    def output(t, y):
+        return Step(t, y[:, 0].copy() if single else y.T.copy())
+
+    if every or stops[0] == t0:
+        yield output(t0, y)
+    stops = [s for s in stops if s != t0]
+    if method == "verlet":
+        yield from _verlet(system, y, t0, direction, stops, every, step, max_steps, output)
+        return
+    stepper, order, growth, error_norm = _ADAPTIVE[method]
+    t = t0
+    f0 = system(t, y)
+    h = abs(step) if step else _initial_step(system, t, y, f0, direction, order, atol, rtol)
+    steps = 0
+    while stops:
+        target = stops[0]
+        landing = abs(target - t) <= h
+        used = abs(target - t) if landing else h
+        y_new, error, f_new = stepper(system, t, y, direction * used, f0)
+        norm = error_norm(error, atol + rtol * np.maximum(np.abs(y), np.abs(y_new)))
+        if not np.isfinite(norm):
+            norm = float("inf")
+        factor = growth if norm == 0 else min(growth, max(0.2, 0.9 * norm ** (-1 / order)))
+        steps += 1
+        if steps > max_steps:
+            raise RuntimeError(f"maximum number of steps ({max_steps}) exceeded at t={t}")
+        if norm > 1:
+            h = used * factor
+            if h <= 1e-14 * max(1.0, abs(t)):
+                raise RuntimeError(f"step size underflow at t={t}")
+            continue
+        t = target if landing else t + direction * used
+        y = y_new
+        f0 = f_new if f_new is not None else system(t, y)
+        # a short landing step says little about the step size: keep the proposal
+        h = max(h, used * factor) if landing else used * factor
+        if landing:
+            stops.pop(0)
+        if every or landing:
+            yield output(t, y)
+
+def _verlet(system, y, t, direction, stops, every, step, max_steps, output):
+    if system._split is None:
+        raise ValueError("verlet needs a Hamiltonian system with H = T(p) + V(q)")
+    if not step or step <= 0:
+        raise ValueError("verlet needs a positive fixed step")
+    n, force, velocity = system._split
+    shape = y.shape[1:]
+    q, p = y[:n], y[n:]
+    dv = _stack(force(*q, t, *system._values), shape)
+    steps = 0
+    while stops:
+        target = stops[0]
+        landing = abs(target - t) <= step
+        h = direction * (abs(target - t) if landing else step)
+        # kick - drift - kick; the closing kick's force opens the next step
+        p = p - h / 2 * dv
+        q = q + h * _stack(velocity(*p, t + h / 2, *system._values), shape)
+        t = target if landing else t + h
+        dv = _stack(force(*q, t, *system._values), shape)
+        p = p - h / 2 * dv
+        steps += 1
+        if steps > max_steps:
+            raise RuntimeError(f"maximum number of steps ({max_steps}) exceeded at t={t}")
+        if landing:
+            stops.pop(0)
+        if every or landing:
+            yield output(t, np.concatenate([q, p]))
+
+def solve(system, y0, t_span, **options):
+    """The state at t_span[1]: trajectory() without intermediate output."""
+    for _, y in trajectory(system, y0, t_span, t_eval=[t_span[1]], **options):
+        pass
+    return y
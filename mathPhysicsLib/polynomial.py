@@ -0,0 +1,257 @@
+from fractions import Fraction
+from numbers import Number
+
+from mathphysicslib.dag import distinct_subtrees
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Pow, Func
+
+class Poly:
+    """
+    Sparse multivariate polynomial: a dict mapping exponent tuples to coefficients.
+
+        p = Poly.from_expr(parse_to_func("(x + y + 1)**3"))
+        p.gens                 -> ("x", "y")
+        p.terms[(2, 1)]        -> 3           # the coefficient of x**2*y
+        p.to_expr()            -> back to Add/Mul/Pow nodes
+
+    - gens   : sorted tuple of variable names, one per exponent slot
+    - terms  : {exponents: coefficient}, zero coefficients are never stored
+    Coefficients are kept exact as int or Fraction (floats stay floats), so conversion to
+    and from expression trees is lossless. Polys are treated as immutable values: every
+    operation returns a new Poly, over the union of the operands' variables.
+    """
+    __slots__ = ("gens", "terms")
+
+    def __init__(self, terms=None, gens=()):
+        gens = tuple(gens)
+        if list(gens) != sorted(set(gens)):
+            raise ValueError("gens must be sorted and distinct")
+        self.gens = gens
+        self.terms = {}
+        for exps, c in (terms or {}).items():
+            exps = tuple(exps)
+            if len(exps) != len(gens) or any(not isinstance(e, int) or e < 0 for e in exps):
+                raise ValueError(f"invalid exponents {exps} for gens {gens}")
+            c = _coefficient(c)
+            if c != 0:
+                self.terms[exps] = c
+
+    @classmethod
+    def constant(cls, value, gens=()):
+        return cls({(0,) * len(gens): value}, gens)
+
+    @classmethod
+    def var(cls, name, gens=None):
+        gens = tuple(sorted(set(gens or ()) | {name}))
+        return cls({tuple(int(g == name) for g in gens): 1}, gens)
+
+    @classmethod
+    def from_expr(cls, expr):
+        """
+        Convert an Add/Mul/Pow tree into a Poly, expanding products and powers.
+        Repeated subtrees are converted once (the tree is walked as a DAG whose equal
+        constants of different types, such as 2 and 2.0, stay apart).
+        Raises:
+          - ValueError if the tree is not a polynomial (a power with a negative,
+            fractional or symbolic exponent, or a function).
+          - TypeError on non-expression input.
+        """
+        if not isinstance(expr, Expr):
+            raise TypeError("expression must be an Expr")
+        nodes, node_args, (root,) = distinct_subtrees([expr])
+        gens = tuple(sorted({node.name for node in nodes if isinstance(node, Var)}))
+        values = []
+        for node, arg_ids in zip(nodes, node_args):
+            values.append(_convert(node, [values[i] for i in arg_ids], gens))
+        return values[root]
+
+    def to_expr(self):
+        """
+        The polynomial as expression nodes: a sum of coefficient * product of powers,
+        highest total degree first.
+        """
+        names = [Var(g) for g in self.gens]
+        terms = []
+        for exps in sorted(self.terms, key=lambda e: (-sum(e), [-k for k in e])):
+            factors = [Pow.pow_fold(v, e) for v, e in zip(names, exps) if e]
+            terms.append(Mul.mul_fold(*factors, self.terms[exps]))
+        return Add.add_fold(*terms)
+
+    def degree(self, name=None):
+        # Total degree, or the degree in one variable; the zero polynomial has degree -1
+        if not self.terms:
+            return -1
+        if name is None:
+            return max(sum(e) for e in self.terms)
+        if name not in self.gens:
+            return 0
+        k = self.gens.index(name)
+        return max(e[k] for e in self.terms)
+
+    def is_zero(self):
+        return not self.terms
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __repr__(self):
+        return f"Poly({self.to_expr()!r}, gens={self.gens})"
+
+    def __eq__(self, other):
+        if isinstance(other, Number):
+            other = Poly.constant(other)
+        if not isinstance(other, Poly):
+            return NotImplemented
+        a, b = _align(self, other)
+        return a.terms == b.terms
+
+    __hash__ = None
+
+    def __neg__(self):
+        return _make({e: -c for e, c in self.terms.items()}, self.gens)
+
+    def __add__(self, other):
+        other = _as_poly(other)
+        if other is None:
+            return NotImplemented
+        a, b = _align(self, other)
+        terms = dict(a.terms)
+        for e, c in b.terms.items():
+            s = terms.get(e, 0) + c
+            if s == 0:
+                terms.pop(e, None)
+            else:
+                terms[e] = s
+        return _make(terms, a.gens)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = _as_poly(other)
+        if other is None:
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return (-self) + other
+
+    def __mul__(self, other):
+        other = _as_poly(other)
+        if other is None:
+            return NotImplemented
+        a, b = _align(self, other)
+        return _make(_multiply(a.terms, b.terms), a.gens)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        # Division by a number only; integer coefficients become exact fractions
+        if not isinstance(other, Number) or isinstance(other, bool):
+            return NotImplemented
+        if other == 0:
+            raise ZeroDivisionError("polynomial division by zero")
+        if isinstance(other, int):
+            other = Fraction(other)
+        return _make({e: c / other for e, c in self.terms.items()}, self.gens)
+
+    def __pow__(self, n):
+        if not isinstance(n, int) or isinstance(n, bool) or n < 0:
+            raise ValueError("polynomial powers need a non-negative integer exponent")
+        if len(self.terms) == 1:
+            # monomial: scale the exponents
+            (e, c), = self.terms.items()
+            return _make({tuple(k * n for k in e): c ** n}, self.gens)
+        result = {(0,) * len(self.gens): 1}
+        # Repeated multiplication by the (small) base costs |p**k| * |p| per step, far
+        # below squaring, whose last step multiplies two half-size dense results.
+        for _ in range(n):
+            result = _multiply(result, self.terms)
+        return _make(result, self.gens)
+
+def expand(expr):
+    """Fully expand a polynomial expression tree: (x + 1)**2 -> x**2 + 2*x + 1."""
+    return Poly.from_expr(expr).to_expr()
+
+def _coefficient(c):
+    # Exact coefficients: integral Fractions become ints; only numbers are allowed
+    if isinstance(c, bool) or not isinstance(c, Number):
+        raise TypeError(f"polynomial coefficients must be numbers, not {type(c).__name__}")
+    if isinstance(c, Fraction) and c.denominator == 1:
+        return int(c)
+    return c
+
+def _make(terms, gens):
+    # Build a Poly from an already valid term dict, skipping validation (integral Fractions become ints)
+    p = Poly.__new__(Poly)
+    p.gens = gens
+    p.terms = {e: int(c) if type(c) is Fraction and c.denominator == 1 else c
+               for e, c in terms.items() if c != 0}
+    return p
+
+def _as_poly(value):
+    if isinstance(value, Poly):
+        return value
+    if isinstance(value, Number) and not isinstance(value, bool):
+        return Poly.constant(value)
+    return None
+
+def _embed(p, gens):
+    # Re-index p's exponent tuples over the larger variable set 'gens'
+    if p.gens == gens:
+        return p
+    slots = [gens.index(g) for g in p.gens]
+    terms = {}
+    for e, c in p.terms.items():
+        full = [0] * len(gens)
+        for k, s in zip(e, slots):
+            full[s] = k
+        terms[tuple(full)] = c
+    return _make(terms, gens)
+
+def _align(a, b):
+    if a.gens == b.gens:
+        return a, b
+    gens = tuple(sorted(set(a.gens) | set(b.gens)))
+    return _embed(a, gens), _embed(b, gens)
+
+def _multiply(x, y):
+    # Schoolbook product of two term dicts; exponents add, coefficients multiply
+    if len(x) < len(y):
+        x, y = y, x
+    result = {}
+    get = result.get
+    for ey, cy in y.items():
+        for ex, cx in x.items():
+            e = tuple([i + j for i, j in zip(ex, ey)])
+            result[e] = get(e, 0) + cx * cy
+    return result
+
+def _convert(node, args, gens):
+    if isinstance(node, Constant):
+        return Poly.constant(node.value, gens)
+    if isinstance(node, Var):
+        return Poly.var(node.name, gens)
+    if isinstance(node, Add):
+        total = args[0]
+        for a in args[1:]:
+            total = total + a
+        return total
+    if isinstance(node, Mul):
+        product = args[0]
+        for a in args[1:]:
+            product = product * a
+        return product
+    if isinstance(node, Pow):
+        base, exponent = args
+        n = exponent.terms.get((0,) * len(gens), 0) if len(exponent) <= 1 else None
+        if n is not None and exponent.degree() <= 0 and base.degree() <= 0:
+            # a constant power such as 2**-1 is just a (possibly fractional) coefficient
+            c = base.terms.get((0,) * len(gens), 0)
+            if isinstance(c, int) and isinstance(n, (int, Fraction)):
+                c = Fraction(c)
+            return Poly.constant(c ** n, gens)
+        if n is None or exponent.degree() > 0 or n != int(n) or n < 0:
+            raise ValueError(f"not a polynomial: {node!r} needs a non-negative integer exponent")
+        return base ** int(n)
+    if isinstance(node, Func):
+        raise ValueError(f"not a polynomial: {node!r} applies a function")
+    raise TypeError(f"cannot convert {type(node).__name__} to a polynomial")
@@ -0,0 +1,198 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from mathphysicslib import ast_parser, expresso
+from mathphysicslib.expresso import ExprMeta, Constant, Add, Mul, Pow, constant_conversion, variadic_field
+
+class Stats:
+    """
+    Event counts and timings collected by profile().
+
+      - counts  : Counter of event name -> occurrences, e.g.
+                    alloc.<Type>          nodes constructed, per node type
+                    key.compute.<Type>    structural keys computed: at construction for every
+                                          node type, plus Add/Mul keys sorted for like-term grouping
+                    key.compare           structural key comparisons (hash matches in ==)
+                    fold.<factory>        calls of Pow.pow_fold / Add.add_fold / Mul.mul_fold
+                    fold.<factory>.reduced  calls whose result is simpler than the plain node
+                    fold.constants.<Type> Add/Mul constructions that combined numeric operands,
+                                          passed directly or flattened from nested nodes
+                    fold.like_terms / fold.like_factors  constructions that merged like operands
+                    parse.calls, parse.cache_hits, parse.cache_misses
+      - timings : event name -> total seconds (parse: time spent parsing, cache hits excluded)
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.timings = Counter()
+
+    def __getitem__(self, event):
+        return self.counts[event]
+
+    def total(self, prefix):
+        # Sum of every count whose name starts with 'prefix', e.g. total("alloc.")
+        return sum(n for name, n in self.counts.items() if name.startswith(prefix))
+
+    def as_dict(self):
+        return {"counts": dict(sorted(self.counts.items())),
+                "timings": dict(sorted(self.timings.items()))}
+
+    def report(self):
+        """Human-readable table of all counts and timings, grouped by category."""
+        lines = []
+        category = None
+        for name, n in sorted(self.counts.items()):
+            head = name.split(".", 1)[0]
+            if head != category:
+                category = head
+                lines.append(f"{category}:")
+            lines.append(f"  {name:<32} {n:>12}")
+        if self.timings:
+            lines.append("time:")
+            for name, seconds in sorted(self.timings.items()):
+                lines.append(f"  {name:<32} {seconds * 1e3:>9.3f} ms")
+        return "\n".join(lines)
+
+    def dump(self, target):
+        """Write the statistics as JSON to a path or an open text file."""
+        if hasattr(target, "write"):
+            json.dump(self.as_dict(), target, indent=2)
+        else:
+            with open(target, "w") as fp:
+                json.dump(self.as_dict(), fp, indent=2)
+
+    def __repr__(self):
+        return f"Stats({self.total('alloc.')} nodes allocated, {len(self.counts)} event kinds)"
+
+_active = []       # Stats objects currently collecting (profiles may nest)
+_originals = {}    # (owner, attribute) -> original attribute, while instrumentation is installed
+
+def _record(event, n=1):
+    for stats in _active:
+        stats.counts[event] += n
+
+@contextmanager
+def profile():
+    """
+    Count expression-engine events inside the block:
+
+        with mathphysicslib.profile() as stats:
+            derivative("(x**2 + y)**3", "x", 2)
+        print(stats.report())
+        stats.dump("profile.json")
+
+    Instrumented versions of the hot paths (node construction, key computation,
+    folding, parsing) are swapped in when the outermost profile() starts and the
+    originals are put back when it ends, so there is no cost at all outside a profile.
+    Counting is process-wide: work done by other threads during the block is counted too.
+    """
+    stats = Stats()
+    if not _active:
+        _install()
+    _active.append(stats)
+    info = ast_parser.parse_cache_info()
+    try:
+        yield stats
+    finally:
+        after = ast_parser.parse_cache_info()
+        stats.counts["parse.cache_hits"] += max(0, after.hits - info.hits)
+        stats.counts["parse.cache_misses"] += max(0, after.misses - info.misses)
+        _active.remove(stats)
+        if not _active:
+            _uninstall()
+
+def _replace(owner, name, replacement):
+    _originals[(owner, name)] = owner.__dict__[name]
+    setattr(owner, name, replacement)
+
+def _uninstall():
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+def _install():
+    construct = ExprMeta.__dict__["__call__"]
+    def counting_construct(cls, *args):
+        node = construct(cls, *args)
+        _record("alloc." + cls.__name__)
+        if cls is Add or cls is Mul:
+            # keys of Add/Mul are counted in variadic_key, which also serves like-term grouping
+            if _folds_constants(cls, args):
+                _record("fold.constants." + cls.__name__)
+        elif node._key is not None:
+            _record("key.compute." + cls.__name__)
+        return node
+    _replace(ExprMeta, "__call__", counting_construct)
+
+    variadic_key = expresso.variadic_key
+    def counting_variadic_key(tag, children, identity):
+        _record("key.compute." + tag)
+        return variadic_key(tag, children, identity)
+    _replace(expresso, "variadic_key", counting_variadic_key)
+
+    keys_equal = expresso.keys_equal
+    def counting_keys_equal(a, b):
+        _record("key.compare")
+        return keys_equal(a, b)
+    _replace(expresso, "keys_equal", counting_keys_equal)
+
+    for name, event in (("collect_terms", "fold.like_terms"), ("collect_factors", "fold.like_factors")):
+        _replace(expresso, name, _counting_collect(getattr(expresso, name), event))
+
+    pow_fold = Pow.pow_fold
+    def counting_pow_fold(base, exponent):
+        result = pow_fold(base, exponent)
+        _record("fold.pow_fold")
+        if not isinstance(result, Pow) or result.base != constant_conversion(base):
+            _record("fold.pow_fold.reduced")
+        return result
+    _replace(Pow, "pow_fold", staticmethod(counting_pow_fold))
+
+    for cls, name in ((Add, "add_fold"), (Mul, "mul_fold")):
+        _replace(cls, name, staticmethod(_counting_fold(getattr(cls, name), cls, "fold." + name)))
+
+    parse = ast_parser._parse
+    def timed_parse(func):
+        start = time.perf_counter()
+        try:
+            return parse(func)
+        finally:
+            elapsed = time.perf_counter() - start
+            _record("parse.calls")
+            for stats in _active:
+                stats.timings["parse"] += elapsed
+    _replace(ast_parser, "_parse", timed_parse)
+
+def _folds_constants(cls, args):
+    # Mirrors the constructor: numeric operands, including the constants of flattened
+    # nested nodes of the same type, are combined, an identity dropped, a zero factor absorbs
+    field = variadic_field[cls]
+    values = []
+    for a in args:
+        if isinstance(a, cls):
+            values.extend(c.value for c in getattr(a, field) if isinstance(c, Constant))
+        elif isinstance(a, Constant):
+            values.append(a.value)
+        elif isinstance(a, (int, float)):
+            values.append(a)
+    identity = 0 if cls is Add else 1
+    return len(values) > 1 or any(v == identity or (cls is Mul and v == 0) for v in values)
+
+def _counting_collect(collect, event):
+    def counting_collect(operands):
+        collected, folded = collect(operands)
+        if collected is not operands:
+            _record(event)
+        return collected, folded
+    return counting_collect
+
+def _counting_fold(fold, cls, event):
+    def counting_fold(*operands):
+        result = fold(*operands)
+        _record(event)
+        if not isinstance(result, cls):
+            _record(event + ".reduced")
+        return result
+    return counting_fold
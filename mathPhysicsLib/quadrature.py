@@ -0,0 +1,238 @@
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; quad() then integrates one bound pair at a time
+    np = None
+
+import heapq
+import math
+from typing import NamedTuple
+
+from mathphysicslib.expresso import Expr, Var
+from mathphysicslib.numeric import compile
+
+# 15-point Kronrod rule on [-1, 1] and its embedded 7-point Gauss rule (QUADPACK's qk15)
+_XGK = (0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+        0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+        0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+        0.207784955007898467600689403773245, 0.0)
+_WGK = (0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+        0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+        0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+        0.204432940075298892414161999234649, 0.209482141084727828012999174891714)
+_WG = (0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+       0.381830050505118944950369775488975, 0.417959183673469387755102040816327)
+
+NODES = tuple(-x for x in _XGK[:7]) + (0.0,) + tuple(reversed(_XGK[:7]))
+KRONROD_WEIGHTS = _WGK[:7] + (_WGK[7],) + tuple(reversed(_WGK[:7]))
+# Gauss nodes are every other Kronrod node (odd positions of _XGK)
+GAUSS_WEIGHTS = tuple(_WG[k // 2] if k % 2 else 0.0 for k in range(7)) + (_WG[3],) \
+    + tuple(reversed([_WG[k // 2] if k % 2 else 0.0 for k in range(7)]))
+
+_EPS = 2.220446049250313e-16
+
+class QuadResult(NamedTuple):
+    """
+    Result of a definite integral.
+      - value, error : the estimate and its absolute error bound; floats for a single
+                       integral, arrays shaped like the broadcast bounds/params otherwise
+      - evaluations  : integrand evaluations used, over all integrals
+    """
+    value: object
+    error: object
+    evaluations: int
+
+def quad(expr, var, bounds, params=None, abs_tol=1.49e-8, rel_tol=1.49e-8, limit=50):
+    """
+    Definite integral of an Expr over 'var' by adaptive Gauss-Kronrod (G7/K15).
+
+        quad(parse_to_func("x**2"), "x", (0, 1))                        -> value 1/3
+        quad(parse_to_func("k*x**2"), "x", ([0, 0], [1, 2]), params={"k": 3})
+
+    - bounds is a pair (a, b); each side may be an array, and infinite bounds are
+      mapped onto a finite interval. params maps the other variables of 'expr' to
+      values or arrays. Bounds and params broadcast together and one integral is
+      computed per element, all at once: every round evaluates the compiled integrand
+      on the nodes of all the unfinished intervals of all the integrals in one call.
+    - An interval is accepted once its error estimate is within its width's share of
+      max(abs_tol, rel_tol * |value|), or once it is down to the roundoff floor
+      (50 * eps * the integral of |f| over it), which bisection cannot lower; others
+      are bisected. As QUADPACK's limit, 'limit' caps the number of subintervals of
+      each integral: integrals that would pass it, or whose tolerance is below the
+      roundoff floor, return their best estimate with the larger error.
+    - Without NumPy the integrals are computed one after another on Python floats.
+    Raises:
+      - ValueError if 'expr' has variables other than 'var' and the params.
+    """
+    if not isinstance(expr, Expr):
+        raise TypeError("integrand must be an Expr")
+    if isinstance(var, Var):
+        var = var.name
+    params = dict(params or {})
+    if var in params:
+        raise ValueError(f"{var} is the integration variable and cannot be a parameter")
+    a, b = bounds
+    names = list(params)
+    if np is None:
+        return _quad_scalar(expr, var, a, b, params, names, abs_tol, rel_tol, limit)
+    fn = compile(expr, [var] + names, backend="numpy")
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in [a, b] + [params[n] for n in names]])
+    shape = arrays[0].shape
+    a, b = arrays[0].ravel(), arrays[1].ravel()
+    values = [p.ravel() for p in arrays[2:]]
+    sign = np.where(a > b, -1.0, 1.0)
+    a, b = np.minimum(a, b), np.maximum(a, b)
+    kind = _kind(np.isinf(a), np.isinf(b))
+    lo, hi = _interval(kind, a, b)
+
+    def integrand(t, owner):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x, jac = _transform(t, kind[owner], a[owner], b[owner])
+        return fn(x, *[p[owner] for p in values]) * jac
+
+    value, error, evaluations = _adaptive(integrand, lo, hi, abs_tol, rel_tol, limit)
+    value = value * sign
+    if shape == ():
+        return QuadResult(float(value[0]), float(error[0]), evaluations)
+    return QuadResult(value.reshape(shape), error.reshape(shape), evaluations)
+
+def _kind(inf_a, inf_b):
+    # 0: [a, b]   1: [a, inf)   2: (-inf, b]   3: (-inf, inf)
+    return inf_b * 1 + inf_a * 2
+
+def _interval(kind, a, b):
+    # Integration interval in the transformed variable t
+    lo = np.select([kind == 0, kind == 1, kind == 2], [a, 0.0, 0.0], -1.0)
+    hi = np.select([kind == 0, kind == 1, kind == 2], [b, 1.0, 1.0], 1.0)
+    return lo.astype(float), hi.astype(float)
+
+def _transform(t, kind, a, b):
+    # x(t) and dx/dt; the Kronrod nodes never touch the singular end points t = 0, 1, -1
+    x = np.select([kind == 0, kind == 1, kind == 2],
+                  [t, a + t / (1 - t), b - (1 - t) / t], t / (1 - t * t))
+    jac = np.select([kind == 0, kind == 1, kind == 2],
+                    [1.0, 1 / (1 - t) ** 2, 1 / (t * t)], (1 + t * t) / (1 - t * t) ** 2)
+    return x, jac
+
+def _gk15(integrand, lo, hi, owner):
+    """Kronrod estimates and QUADPACK error estimates for a batch of intervals."""
+    center = (lo + hi) / 2
+    half = (hi - lo) / 2
+    nodes = np.asarray(NODES)
+    t = (center[:, None] + half[:, None] * nodes).ravel()
+    f = np.asarray(integrand(t, np.repeat(owner, len(NODES))), dtype=float).reshape(len(lo), len(NODES))
+    wk, wg = np.asarray(KRONROD_WEIGHTS), np.asarray(GAUSS_WEIGHTS)
+    resk = f @ wk
+    resg = f @ wg
+    scale = np.abs(half)
+    resabs = (np.abs(f) @ wk) * scale
+    resasc = (np.abs(f - (resk / 2)[:, None]) @ wk) * scale
+    err = np.abs((resk - resg) * half)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shrunk = resasc * np.minimum(1.0, (200 * err / resasc) ** 1.5)
+    err = np.where((resasc != 0) & (err != 0), shrunk, err)
+    floor = 50 * _EPS * resabs
+    return resk * half, np.maximum(err, floor), err <= floor
+
+def _adaptive(integrand, lo, hi, abs_tol, rel_tol, limit):
+    m = len(lo)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    owner = np.arange(m)
+    value = np.zeros(m)
+    error = np.zeros(m)
+    count = np.ones(m, dtype=int)   # subintervals of each integral, accepted or not
+    evaluations = 0
+    while True:
+        est, err, floor = _gk15(integrand, lo, hi, owner)
+        evaluations += len(NODES) * len(lo)
+        total = value + np.bincount(owner, est, minlength=m)
+        total_err = error + np.bincount(owner, err, minlength=m)
+        tol = np.maximum(abs_tol, rel_tol * np.abs(total))
+        done = total_err <= tol
+        accept = done[owner] | floor | (err <= tol[owner] * (hi - lo) / span[owner])
+        # each bisection adds a subinterval: integrals that would pass 'limit' stop here
+        splits = np.bincount(owner[~accept], minlength=m)
+        full = count + splits > limit
+        accept |= full[owner]
+        count += np.where(full, 0, splits)
+        value += np.bincount(owner[accept], est[accept], minlength=m)
+        error += np.bincount(owner[accept], err[accept], minlength=m)
+        keep = ~accept
+        if not keep.any():
+            break
+        lo, hi, owner = lo[keep], hi[keep], owner[keep]
+        mid = (lo + hi) / 2
+        lo, hi, owner = np.concatenate([lo, mid]), np.concatenate([mid, hi]), np.concatenate([owner, owner])
+    return value, error, evaluations
+
+def _quad_scalar(expr, var, a, b, params, names, abs_tol, rel_tol, limit):
+    # Pure-Python path: one integral per element of the (list-)broadcast inputs
+    fn = compile(expr, [var] + names, backend="math")
+    columns = [a, b] + [params[n] for n in names]
+    sizes = {len(c) for c in columns if isinstance(c, (list, tuple))}
+    if len(sizes) > 1:
+        raise ValueError("bounds and params must have matching lengths")
+    if not sizes:
+        args = [float(c) for c in columns]
+        return _adaptive_scalar(fn, args[0], args[1], args[2:], abs_tol, rel_tol, limit)
+    n = sizes.pop()
+    rows = [[float(c[k]) if isinstance(c, (list, tuple)) else float(c) for c in columns] for k in range(n)]
+    results = [_adaptive_scalar(fn, r[0], r[1], r[2:], abs_tol, rel_tol, limit) for r in rows]
+    return QuadResult([r.value for r in results], [r.error for r in results],
+                      sum(r.evaluations for r in results))
+
+def _adaptive_scalar(fn, a, b, args, abs_tol, rel_tol, limit):
+    sign = -1.0 if a > b else 1.0
+    a, b = min(a, b), max(a, b)
+    kind = (math.isinf(b) and 1 or 0) + (math.isinf(a) and 2 or 0)
+    lo, hi = {0: (a, b), 1: (0.0, 1.0), 2: (0.0, 1.0), 3: (-1.0, 1.0)}[kind]
+
+    def integrand(t):
+        if kind == 0:
+            return fn(t, *args)
+        if kind == 1:
+            return fn(a + t / (1 - t), *args) / (1 - t) ** 2
+        if kind == 2:
+            return fn(b - (1 - t) / t, *args) / (t * t)
+        return fn(t / (1 - t * t), *args) * (1 + t * t) / (1 - t * t) ** 2
+
+    def rule(lo, hi):
+        center, half = (lo + hi) / 2, (hi - lo) / 2
+        f = [integrand(center + half * x) for x in NODES]
+        resk = sum(w * v for w, v in zip(KRONROD_WEIGHTS, f))
+        resg = sum(w * v for w, v in zip(GAUSS_WEIGHTS, f))
+        resabs = sum(w * abs(v) for w, v in zip(KRONROD_WEIGHTS, f)) * abs(half)
+        resasc = sum(w * abs(v - resk / 2) for w, v in zip(KRONROD_WEIGHTS, f)) * abs(half)
+        err = abs((resk - resg) * half)
+        if resasc != 0 and err != 0:
+            err = resasc * min(1.0, (200 * err / resasc) ** 1.5)
+        floor = 50 * _EPS * resabs
+        return resk * half, max(err, floor), err <= floor
+
+    # Globally adaptive: always bisect the interval with the largest error (max-heap);
+    # intervals at the roundoff floor are set aside, bisecting them gains nothing
+    heap, settled = [], []
+
+    def add(lo, hi, piece):
+        est, err, floor = piece
+        if floor:
+            settled.append((-err, lo, hi, est))
+        else:
+            heapq.heappush(heap, (-err, lo, hi, est))
+
+    first = rule(lo, hi)
+    add(lo, hi, first)
+    total, total_err, evaluations, count = first[0], first[1], len(NODES), 1
+    while heap and count < limit and total_err > max(abs_tol, rel_tol * abs(total)):
+        neg_err, lo, hi, est = heapq.heappop(heap)
+        mid = (lo + hi) / 2
+        left, right = rule(lo, mid), rule(mid, hi)
+        evaluations += 2 * len(NODES)
+        count += 1
+        total += left[0] + right[0] - est
+        total_err += left[1] + right[1] + neg_err
+        add(lo, mid, left)
+        add(mid, hi, right)
+    # re-add the pieces to drop the rounding drift of the running updates
+    total = math.fsum(entry[3] for entry in heap + settled)
+    total_err = math.fsum(-entry[0] for entry in heap + settled)
+    return QuadResult(sign * total, total_err, evaluations)
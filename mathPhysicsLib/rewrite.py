@@ -0,0 +1,463 @@
+import math
+import weakref
+from collections import namedtuple
+from numbers import Number
+
+from mathphysicslib.dag import distinct_subtrees
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Pow, Func, children, constant_conversion
+
+ANY = "*"          # index symbol of an unrestricted operand
+TRAILING = "*>"    # index arity of patterns ending in a 'many' wildcard
+LEADING = "<*"     # index arity of patterns starting with one
+
+RuleCacheInfo = namedtuple("RuleCacheInfo", "rewritten")
+
+class Wild:
+    """
+    Pattern variable: matches one operand and binds it under 'name'.
+      - kind      : node type (or tuple of types) the operand must be; also used for indexing
+      - predicate : extra check on the operand, e.g. lambda n: n.value > 0
+      - many      : as the first or last operand of an Add/Mul pattern, binds the tuple
+                    of all the operands the others leave over (possibly empty)
+    A name used twice in one pattern must bind equal operands.
+    """
+    __slots__ = ("name", "kind", "predicate", "many")
+
+    def __init__(self, name, kind=None, predicate=None, many=False):
+        self.name = name
+        self.kind = kind
+        self.predicate = predicate
+        self.many = many
+
+    def accepts(self, node):
+        if self.kind is not None and not isinstance(node, self.kind):
+            return False
+        return self.predicate is None or bool(self.predicate(node))
+
+    def __repr__(self):
+        return f"Wild({self.name!r})"
+
+class P:
+    """
+    Pattern node: a head type and operand patterns (Wild, P, numbers or literal Exprs).
+
+        P(Pow, Wild("b"), 0)                                  # b**0
+        P(Mul, Wild("rest", many=True), Wild("c", Constant))  # rest * c
+
+    Operands are matched in stored order; for Add/Mul that is the canonical order the
+    constructors produce (the numeric operand last), so a leading 'many' wildcard is
+    the way to match "everything before the constant".
+    """
+    __slots__ = ("head", "args", "variadic")
+
+    def __init__(self, head, *args):
+        args = tuple(Constant(a) if isinstance(a, Number) else a for a in args)
+        many = []
+        for k, a in enumerate(args):
+            if not isinstance(a, (Wild, P, Expr)):
+                raise TypeError(f"invalid pattern operand {a!r}")
+            if isinstance(a, Wild) and a.many:
+                many.append(k)
+        if many and (len(many) > 1 or many[0] not in (0, len(args) - 1) or head not in (Add, Mul)):
+            raise ValueError("one 'many' wildcard, as the first or last operand of an Add/Mul pattern")
+        self.head = head
+        self.args = args
+        # where the 'many' wildcard sits: TRAILING, LEADING or None
+        if not many:
+            self.variadic = None
+        elif many[0] == len(args) - 1:
+            self.variadic = TRAILING
+        else:
+            self.variadic = LEADING
+
+    def fixed(self):
+        # The operand patterns matched one-to-one, in the order the index walks them
+        if self.variadic is TRAILING:
+            return self.args[:-1]
+        if self.variadic is LEADING:
+            return self.args[:0:-1]   # matched from the end, last operand first
+        return self.args
+
+    def __repr__(self):
+        return f"P({self.head.__name__}, {', '.join(map(repr, self.args))})"
+
+class Rule:
+    """
+    A rewrite rule: when 'pattern' matches a node, action(**bindings) gives its replacement.
+    The action may return None to decline (a guard that needs several bindings).
+    'hits' counts successful applications.
+    """
+    __slots__ = ("name", "pattern", "action", "hits")
+
+    def __init__(self, name, pattern, action):
+        if not isinstance(pattern, P):
+            raise TypeError("a rule pattern must be a P(...) node pattern")
+        self.name = name
+        self.pattern = pattern
+        self.action = action
+        self.hits = 0
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.pattern!r})"
+
+
+class RuleSet:
+    """
+    An ordered collection of rules with a discrimination-tree index.
+
+        rules = RuleSet([Rule("x**1", P(Pow, Wild("b"), 1), lambda b: b)])
+        rules.apply(node)      # first applicable rule at the top of 'node', or None
+        rules.rewrite(expr)    # rewrite everywhere, bottom-up, to a fixpoint
+        rules.stats()          # {rule name: hits}
+
+    Rules are filed under the head type and arity of their pattern and then, one level
+    per operand, under the operand's shape: its head type, its literal constant, or '*'.
+    A node only walks the branches matching its own operands, so it is tried against
+    the rules that can apply instead of all of them. Candidates keep insertion order,
+    which is also the priority order.
+
+    rewrite() memoizes its results by structural key across calls, holding the subtrees
+    weakly: an entry lives as long as a tree containing the subtree is alive, so
+    re-rewriting an edited tree only walks the edited path, and trees dropped by the
+    caller are not kept alive by the rule set. The memo is dropped whenever a rule is
+    added or by clear_cache(); cache_info() reports its size. apply() is not memoized:
+    equal nodes may hold constants of different types (3, 3.0, Fraction(3)), and its
+    result must keep the types of the node it is given. Hit counters count actual rule
+    applications, not memo hits. Rules must terminate: a rewrite that cycles raises
+    ValueError.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self._index = {}
+        # node -> (weak reference to the node stored, result of rewrite()); the result
+        # is None when the node is its own result
+        self._memo = weakref.WeakKeyDictionary()
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def add(self, rule):
+        pattern = rule.pattern
+        fixed = pattern.fixed()
+        node = self._index.setdefault((pattern.head, pattern.variadic or len(fixed)), {})
+        for a in fixed:
+            node = node.setdefault(_pattern_symbol(a), {})
+        node.setdefault(None, []).append((len(self.rules), rule))
+        self.rules.append(rule)
+        self.clear_cache()
+        return rule
+
+    def candidates(self, node):
+        """Rules whose pattern shape fits 'node', in priority order."""
+        ops = children(node)
+        head = type(node)
+        found = []
+        fixed = self._index.get((head, len(ops)))
+        if fixed is not None:
+            levels = [fixed]
+            for op in ops:
+                symbols = _node_symbols(op)
+                levels = [level[s] for level in levels for s in symbols if s in level]
+                if not levels:
+                    break
+            for level in levels:
+                found.extend(level.get(None, ()))
+        for arity, walk in ((TRAILING, ops), (LEADING, ops[::-1])):
+            root = self._index.get((head, arity))
+            if root is None:
+                continue
+            levels = [root]
+            for op in walk:
+                symbols = _node_symbols(op)
+                nxt = []
+                for level in levels:
+                    # a variadic pattern ends here: its wildcard absorbs the remaining operands
+                    found.extend(level.get(None, ()))
+                    nxt.extend(level[s] for s in symbols if s in level)
+                levels = nxt
+                if not levels:
+                    break
+            for level in levels:
+                found.extend(level.get(None, ()))
+        if len(found) > 1:
+            found.sort(key=lambda entry: entry[0])
+        return [rule for _, rule in found]
+
+    def apply(self, node):
+        """Apply the first matching rule at the top of 'node'; None if no rule applies."""
+        if not isinstance(node, Expr) or node._key is None:
+            return None
+        for rule in self.candidates(node):
+            bindings = match(rule.pattern, node)
+            if bindings is None:
+                continue
+            result = rule.action(**bindings)
+            if result is not None:
+                rule.hits += 1
+                return result
+        return None
+
+    def rewrite(self, expr):
+        """
+        Rewrite every subexpression bottom-up until no rule applies. Each distinct
+        subtree is rewritten once; the replacement produced by a rule is rewritten too.
+        """
+        if not isinstance(expr, Expr):
+            return expr
+        memo = self._memo
+        done = {}        # id(node) -> (node, result) for this call; holding the node keeps its id
+        stack = [(expr, None)]
+        active = set()   # nodes whose replacement is still being normalized (cycle check)
+        while stack:
+            node, replacement = stack[-1]
+            if replacement is not None:
+                # the rule result has been normalized: it is the node's result too
+                result = done[id(replacement)][1]
+                memo[node] = (weakref.ref(node), result)
+                done[id(node)] = (node, result)
+                active.discard(node)
+                stack.pop()
+                continue
+            if _known(memo, done, node):
+                stack.pop()
+                continue
+            ops = children(node)
+            todo = [c for c in ops if isinstance(c, Expr) and not _known(memo, done, c)]
+            if todo:
+                stack.extend((c, None) for c in todo)
+                continue
+            new_ops = [done[id(c)][1] if isinstance(c, Expr) else c for c in ops]
+            result = None
+            if any(a is not b for a, b in zip(new_ops, ops)):
+                # folding the new operands may build new structure: normalize it like a rule result
+                result = rebuild(node, new_ops)
+                if result == node:
+                    result = None
+            if result is None:
+                result = self.apply(node)
+            if result is None or result == node:
+                memo[node] = (weakref.ref(node), None)
+                done[id(node)] = (node, node)
+                stack.pop()
+                continue
+            if result in active or result == node:
+                raise ValueError(f"rewrite rules cycle on {node!r}")
+            active.add(node)
+            stack[-1] = (node, result)
+            stack.append((result, None))
+        return done[id(expr)][1]
+
+    def stats(self):
+        return {rule.name: rule.hits for rule in self.rules}
+
+    def reset_stats(self):
+        for rule in self.rules:
+            rule.hits = 0
+
+    def cache_info(self):
+        # (rewritten,): entries of the rewrite() memo
+        return RuleCacheInfo(len(self._memo))
+
+    def clear_cache(self):
+        self._memo.clear()
+
+def _known(memo, done, node):
+    # Whether this call has the node's result, taking it from the memo on a hit whose
+    # constants have the node's types: equal nodes may hold 2 and 2.0, or 0.5 and 1/2
+    if id(node) in done:
+        return True
+    entry = memo.get(node)
+    if entry is None:
+        return False
+    ref, result = entry
+    stored = ref()
+    if stored is not node and (stored is None or not _same_constant_types(stored, node)):
+        return False
+    # an unchanged node stands for itself, not for the equal node stored in the memo
+    done[id(node)] = (node, node if result is None else result)
+    return True
+
+def _same_constant_types(a, b):
+    # a == b structurally; typed keys tell whether their constants have the same types too
+    _, _, (root_a, root_b) = distinct_subtrees([a, b])
+    return root_a == root_b
+
+def rebuild(node, args):
+    # Same node type over new operands, folded the way the smart factories fold
+    if isinstance(node, Add):
+        return Add.add_fold(*args)
+    if isinstance(node, Mul):
+        return Mul.mul_fold(*args)
+    if isinstance(node, Pow):
+        return Pow.pow_fold(*args)
+    if isinstance(node, Func):
+        return Func.func_fold(node.name, *args)
+    return type(node)(*args)
+
+def subs(expr, mapping):
+    """
+    Simultaneous substitution: every subexpression equal to a key of 'mapping' is
+    replaced by its value.
+
+        subs(lagrangian, {"m": 2.5, Var("g"): Var("g0"), Pow(x, 2): Var("u")})
+
+    - keys are variable names, Vars or any Expr (matched structurally); values are
+      Exprs or numbers. Replacements are not substituted into again.
+    - Each distinct subtree is visited once (memoized by structural key). A node none
+      of whose operands changed is returned as is, the very same object; the others
+      are rebuilt with the folding factories, so constants fold where values went in.
+    Raises:
+      - TypeError on keys or values of other types.
+    """
+    return _substitute(expr, _substitutions(mapping), False)
+
+def partial_eval(expr, values):
+    """
+    Substitute numbers for variables and evaluate whatever becomes constant.
+
+        partial_eval(parse_to_func("m*g*h + m*v**2"), {"m": 2, "g": 9.81})
+            -> 19.62*h + 2*v**2
+
+    Like subs(), but the values must be numbers, and every power of two constants and
+    every function of a constant is computed in floating point (the folding factories
+    only fold exact values). Results that are not real numbers, such as (-1)**0.5 or
+    log(-1), are left symbolic.
+    Raises:
+      - TypeError when a key is not a variable or a value is not a number.
+      - ValueError on division by zero.
+    """
+    table = _substitutions(values)
+    for key, value in table.items():
+        if not isinstance(key, Var) or not isinstance(value, Constant):
+            raise TypeError("partial_eval maps variables to numbers")
+    return _substitute(expr, table, True)
+
+def _substitutions(mapping):
+    table = {}
+    for key, value in mapping.items():
+        if isinstance(key, str):
+            key = Var(key)
+        if not isinstance(key, Expr) or key._key is None:
+            raise TypeError(f"cannot substitute for {key!r}")
+        value = constant_conversion(value)
+        if not isinstance(value, Expr):
+            raise TypeError(f"cannot substitute {value!r}: not an Expr or a number")
+        table[key] = value
+    return table
+
+def _memo_key(node):
+    # structural key where there is one, identity for nodes with non-expression operands
+    return node if node._key is not None else id(node)
+
+def _substitute(expr, table, evaluate):
+    if not isinstance(expr, Expr):
+        raise TypeError("expression must be an Expr")
+    memo = {}   # memo key -> new node, or None when the subtree is unchanged
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        key = _memo_key(node)
+        if key in memo:
+            stack.pop()
+            continue
+        if node._key is not None and node in table:
+            memo[key] = table[node]
+            stack.pop()
+            continue
+        ops = children(node)
+        todo = [c for c in ops if isinstance(c, Expr) and _memo_key(c) not in memo]
+        if todo:
+            stack.extend(todo)
+            continue
+        stack.pop()
+        new_ops = [memo[_memo_key(c)] if isinstance(c, Expr) else None for c in ops]
+        result = None
+        if any(c is not None for c in new_ops):
+            result = rebuild(node, [c if n is None else n for c, n in zip(ops, new_ops)])
+        if evaluate and isinstance(result or node, (Pow, Func)):
+            evaluated = _evaluate(result or node)
+            if evaluated is not node:
+                result = evaluated
+        memo[key] = result
+    result = memo[_memo_key(expr)]
+    return expr if result is None else result
+
+def _evaluate(node):
+    if isinstance(node, Func):
+        if not isinstance(node.arg, Constant):
+            return node
+        try:
+            return Constant(getattr(math, node.name)(node.arg.value))
+        except (ValueError, OverflowError):   # outside the domain
+            return node
+    base, exponent = node.base, node.exponent
+    if not (isinstance(base, Constant) and isinstance(exponent, Constant)):
+        return node
+    try:
+        value = base.value ** exponent.value
+    except ZeroDivisionError:
+        raise ValueError("Division by zero") from None
+    except OverflowError:
+        return node
+    if isinstance(value, complex):
+        return node
+    return Constant(value)
+
+def match(pattern, node, bindings=None):
+    """Match 'pattern' against 'node'; returns the bindings dict, or None."""
+    if bindings is None:
+        bindings = {}
+    stack = [(pattern, node)]
+    while stack:
+        pat, node = stack.pop()
+        if isinstance(pat, Wild):
+            if pat.many:
+                node = tuple(node)
+            elif not pat.accepts(node):
+                return None
+            bound = bindings.get(pat.name)
+            if bound is None:
+                bindings[pat.name] = node
+            elif bound != node:
+                return None
+        elif isinstance(pat, P):
+            if type(node) is not pat.head:
+                return None
+            ops = children(node)
+            if pat.variadic is not None:
+                fixed = len(pat.args) - 1
+                if len(ops) < fixed:
+                    return None
+                if pat.variadic is TRAILING:
+                    stack.append((pat.args[-1], ops[fixed:]))
+                    stack.extend(zip(pat.args[:fixed], ops[:fixed]))
+                else:
+                    split = len(ops) - fixed
+                    stack.append((pat.args[0], ops[:split]))
+                    stack.extend(zip(pat.args[1:], ops[split:]))
+            else:
+                if len(ops) != len(pat.args):
+                    return None
+                stack.extend(zip(pat.args, ops))
+        elif not (isinstance(node, Expr) and pat == node):
+            return None
+    return bindings
+
+def _pattern_symbol(pat):
+    # Index symbol of an operand pattern: a head type, a literal constant's key or '*'
+    if isinstance(pat, P):
+        return pat.head
+    if isinstance(pat, Wild):
+        return pat.kind if isinstance(pat.kind, type) else ANY
+    if isinstance(pat, Constant):
+        return pat._key
+    return ANY   # other literal Exprs are checked by the matcher
+
+def _node_symbols(node):
+    # Every index symbol an operand can be filed under
+    if isinstance(node, Constant):
+        return (node._key, Constant, ANY)
+    return (type(node), ANY)
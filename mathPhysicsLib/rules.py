@@ -1,9 +1,117 @@
-from mathphysicslib.expresso import Constant,Mul, Add, Var, Pow
+from mathphysicslib.expresso import Constant,Mul, Add, Var, Pow, Func
 from mathphysicslib.ast_parser import parse_to_func, convert
+from mathphysicslib.dag import build_dag
+from mathphysicslib.rewrite import RuleSet, Rule, P, Wild
 import math
 
+POWER_RULES = RuleSet([
+    # d(c**e)/dc with a constant base is 0
+    Rule("power-constant-base", P(Pow, Wild("b", Constant), Wild("e")),
+         lambda b, e: Constant(0)),
+    # d(b**n)/db = n * b**(n - 1)
+    Rule("power-constant-exponent", P(Pow, Wild("b"), Wild("n", Constant)),
+         lambda b, n: Mul.mul_fold(Constant(n.value), Pow.pow_fold(b, Constant(n.value - 1)))),
+    # d(b**e)/db = e * b**(e - 1)
+    Rule("power", P(Pow, Wild("b"), Wild("e")),
+         lambda b, e: Mul.mul_fold(e, Pow.pow_fold(b, Add.add_fold(e, -1)))),
+])
+
 def power_rule(base, exponent):
-    if isinstance(base, Var) and isinstance(exponent, Constant):
-        return Mul(Constant(exponent.value),Pow(base, Constant(exponent.value - 1)))
-    elif isinstance(base, Constant):
+    """
+    d(base**exponent)/d(base) for an exponent that does not depend on the variable:
+    exponent * base**(exponent - 1). A constant base differentiates to 0.
+    The cases are the rules of POWER_RULES, tried through its index.
+    """
+    return POWER_RULES.apply(Pow(base, exponent))
+
+def exponent_rule(base, exponent):
+    """d(base**exponent)/d(exponent) = base**exponent * log(base)."""
+    return Mul.mul_fold(Pow.pow_fold(base, exponent), Func.func_fold("log", base))
+
+def is_zero(expr):
+    return isinstance(expr, Constant) and expr.value == 0
+
+def sum_rule(dterms):
+    # (f + g + ...)' = f' + g' + ...
+    return Add.add_fold(*[d for d in dterms if not is_zero(d)])
+
+def product_rule(factors, dfactors):
+    # (f1 * f2 * ... * fn)' = sum over i of f1 * ... * fi' * ... * fn
+    terms = []
+    for i, d in enumerate(dfactors):
+        if not is_zero(d):
+            terms.append(Mul.mul_fold(*factors[:i], d, *factors[i + 1:]))
+    return Add.add_fold(*terms)
+
+def chain_power_rule(base, exponent, dbase, dexponent):
+    # (b**e)' = e * b**(e - 1) * b' + b**e * log(b) * e'
+    terms = []
+    if not is_zero(dbase):
+        terms.append(Mul.mul_fold(power_rule(base, exponent), dbase))
+    if not is_zero(dexponent):
+        terms.append(Mul.mul_fold(exponent_rule(base, exponent), dexponent))
+    return Add.add_fold(*terms)
+
+def _one_minus_square(u):
+    return Add.add_fold(1, Mul.mul_fold(Pow.pow_fold(u, 2), -1))
+
+# d f(u)/du for every Func
+FUNCTION_DERIVATIVES = {
+    "exp": lambda u: Func("exp", u),
+    "log": lambda u: Pow.pow_fold(u, -1),
+    "sin": lambda u: Func("cos", u),
+    "cos": lambda u: Mul.mul_fold(Func("sin", u), -1),
+    "tan": lambda u: Add.add_fold(1, Pow.pow_fold(Func("tan", u), 2)),
+    "sinh": lambda u: Func("cosh", u),
+    "cosh": lambda u: Func("sinh", u),
+    "tanh": lambda u: _one_minus_square(Func("tanh", u)),
+    "asin": lambda u: Pow.pow_fold(_one_minus_square(u), -0.5),
+    "acos": lambda u: Mul.mul_fold(Pow.pow_fold(_one_minus_square(u), -0.5), -1),
+    "atan": lambda u: Pow.pow_fold(Add.add_fold(1, Pow.pow_fold(u, 2)), -1),
+}
+
+def function_rule(name, arg):
+    """d name(arg) / d arg as an Expr, e.g. function_rule("sin", x) -> cos(x)."""
+    return FUNCTION_DERIVATIVES[name](arg)
+
+def chain_function_rule(name, arg, darg):
+    # f(u)' = f'(u) * u'
+    if is_zero(darg):
         return Constant(0)
+    return Mul.mul_fold(function_rule(name, arg), darg)
+
+def differentiate(expr, var, cache=None):
+    """
+    Symbolic derivative of 'expr' with respect to the variable named 'var'.
+      - Walks the expression DAG once, so repeated subtrees are differentiated once.
+      - 'cache' maps (subexpression, var) -> derivative. Passing the same dict to
+        several calls (e.g. every step of a derivative path) reuses derivatives of
+        subtrees that reappear in later expressions.
+    """
+    if cache is None:
+        cache = {}
+    dag = build_dag(expr)
+    derivs = []
+    for node, arg_ids in zip(dag.nodes, dag.args):
+        memo_key = (node, var)
+        d = cache.get(memo_key)
+        if d is None:
+            args = [dag.nodes[a] for a in arg_ids]
+            dargs = [derivs[a] for a in arg_ids]
+            if isinstance(node, Constant):
+                d = Constant(0)
+            elif isinstance(node, Var):
+                d = Constant(1 if node.name == var else 0)
+            elif isinstance(node, Add):
+                d = sum_rule(dargs)
+            elif isinstance(node, Mul):
+                d = product_rule(args, dargs)
+            elif isinstance(node, Pow):
+                d = chain_power_rule(args[0], args[1], dargs[0], dargs[1])
+            elif isinstance(node, Func):
+                d = chain_function_rule(node.name, args[0], dargs[0])
+            else:
+                raise TypeError(f"cannot differentiate {type(node).__name__}")
+            cache[memo_key] = d
+        derivs.append(d)
+    return derivs[dag.outputs[0]]
@@ -0,0 +1,263 @@
+import mmap
+import struct
+from fractions import Fraction
+
+from mathphysicslib.dag import distinct_subtrees
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Pow, Func
+
+MAGIC = b"MPLX"
+VERSION = 2   # version 2 adds Func records; files without them are still written as 1
+
+# Record tags
+_INT, _BIGINT, _FLOAT, _FRACTION, _VAR, _ADD, _MUL, _POW, _SMALLINT, _FUNC = range(10)
+_SMALL_BIAS = 2**31   # a _SMALLINT stores value + bias in the record's payload word
+
+# magic, version, flags, string count, node count, root count,
+# offsets of the string table, node index, records and roots
+_HEADER = struct.Struct("<4sHHIII4Q")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_RECORD = struct.Struct("<BI")   # tag, payload word (child count, string index, byte length)
+
+def dumps(exprs):
+    """
+    Serialize an Expr or a list of Exprs to bytes.
+
+    Layout (little-endian), version 2:
+      - header       : magic b"MPLX", version, flags, counts and section offsets
+      - string table : u32 length + UTF-8 bytes per variable or function name, each stored once
+      - records      : one per distinct subtree (the expression DAG), operands first;
+                       tag + payload, operands referenced by node number (a Func
+                       record holds its name's string index and then its operand).
+                       Constants of different types (2, 2.0, Fraction(2)) and the
+                       nodes built from them get records of their own.
+      - node index   : u32 offset of every record, so any node can be read directly
+      - roots        : u32 node number of each input expression, in input order
+    Raises:
+      - TypeError for operands or constants that cannot be stored (only int, float
+        and Fraction constants are supported).
+    """
+    single = isinstance(exprs, Expr)
+    nodes, node_args, outputs = distinct_subtrees([exprs] if single else list(exprs))
+    strings, string_ids = [], {}
+    records = bytearray()
+    offsets = []
+    version = 1
+
+    def string_id(s):
+        sid = string_ids.get(s)
+        if sid is None:
+            sid = string_ids[s] = len(strings)
+            strings.append(s)
+        return sid
+
+    for node, arg_ids in zip(nodes, node_args):
+        offsets.append(len(records))
+        if isinstance(node, Constant):
+            records += _constant_record(node.value)
+        elif isinstance(node, Var):
+            records += _RECORD.pack(_VAR, string_id(node.name))
+        elif isinstance(node, Func):
+            records += _RECORD.pack(_FUNC, string_id(node.name)) + _U32.pack(arg_ids[0])
+            version = 2
+        elif isinstance(node, (Add, Mul, Pow)):
+            tag = _ADD if isinstance(node, Add) else _MUL if isinstance(node, Mul) else _POW
+            records += _RECORD.pack(tag, len(arg_ids))
+            records += struct.pack(f"<{len(arg_ids)}I", *arg_ids)
+        else:
+            raise TypeError(f"cannot serialize {type(node).__name__}")
+    table = bytearray()
+    for s in strings:
+        data = s.encode("utf-8")
+        table += _U32.pack(len(data)) + data
+    strings_at = _HEADER.size
+    records_at = strings_at + len(table)
+    index_at = records_at + len(records)
+    if len(records) >= 2**32:
+        raise OverflowError("expression set too large for the format's 32-bit offsets")
+    roots_at = index_at + _U32.size * len(offsets)
+    header = _HEADER.pack(MAGIC, version, 1 if single else 0, len(strings), len(nodes),
+                          len(outputs), strings_at, index_at, records_at, roots_at)
+    index = struct.pack(f"<{len(offsets)}I", *offsets)
+    roots = struct.pack(f"<{len(outputs)}I", *outputs)
+    return b"".join([header, bytes(table), bytes(records), index, roots])
+
+
+def loads(data):
+    """Deserialize bytes from dumps(): an Expr, or a list when a list was stored."""
+    with ExprFile(data) as f:
+        return f[0] if f.single else list(f)
+
+def save(exprs, path):
+    """Write an Expr or a list of Exprs to 'path' in the binary format."""
+    with open(path, "wb") as fp:
+        fp.write(dumps(exprs))
+
+def load(path, lazy=True):
+    """
+    Open a file written by save().
+      - lazy=True : memory-map the file and return an ExprFile; expressions are
+                    built on first access, sharing every node built so far.
+      - lazy=False: read everything now and return the Expr or list, like loads().
+    """
+    if not lazy:
+        with open(path, "rb") as fp:
+            return loads(fp.read())
+    with open(path, "rb") as fp:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    return ExprFile(buffer)
+
+class ExprFile:
+    """
+    Read-only view of serialized expressions over bytes or a memory map.
+
+        with load("jacobians.mplx") as f:
+            len(f)          # number of stored expressions
+            f[3]            # builds only the nodes expression 3 needs
+
+    Records are decoded through the node index on demand and each node is built once,
+    so expressions sharing subtrees share the built nodes too.
+    Raises ValueError for data that is not in this format or from a newer version.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        if len(buffer) < _HEADER.size:
+            raise ValueError("not an expression file: too short")
+        (magic, version, flags, n_strings, n_nodes, n_roots,
+         strings_at, index_at, records_at, roots_at) = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("not an expression file: bad magic")
+        if version > VERSION:
+            raise ValueError(f"expression file version {version} is newer than supported ({VERSION})")
+        if roots_at + 4 * n_roots > len(buffer):
+            raise ValueError("truncated expression file")
+        self.single = bool(flags & 1)
+        self._n_nodes = n_nodes
+        self._index_at = index_at
+        self._records_at = records_at
+        self._strings = [None] * n_strings
+        self._string_offsets = self._scan_strings(strings_at, n_strings)
+        self._roots = struct.unpack_from(f"<{n_roots}I", buffer, roots_at)
+        self._built = {}   # node number -> Expr
+
+    def _scan_strings(self, at, count):
+        offsets = []
+        for _ in range(count):
+            offsets.append(at)
+            (n,) = _U32.unpack_from(self._buffer, at)
+            at += 4 + n
+        return offsets
+
+    def _string(self, sid):
+        s = self._strings[sid]
+        if s is None:
+            at = self._string_offsets[sid]
+            (n,) = _U32.unpack_from(self._buffer, at)
+            s = self._strings[sid] = bytes(self._buffer[at + 4:at + 4 + n]).decode("utf-8")
+        return s
+
+    def __len__(self):
+        return len(self._roots)
+
+    def __getitem__(self, i):
+        return self.node(self._roots[i])
+
+    def __iter__(self):
+        for root in self._roots:
+            yield self.node(root)
+
+    def node(self, number):
+        """Build (once) and return stored node 'number' and, first, the operands it needs."""
+        built = self._built
+        if number in built:
+            return built[number]
+        stack = [number]
+        while stack:
+            n = stack[-1]
+            if n in built:
+                stack.pop()
+                continue
+            tag, payload, at = self._record(n)
+            if tag in (_ADD, _MUL, _POW):
+                arg_ids = struct.unpack_from(f"<{payload}I", self._buffer, at)
+                if any(a >= n for a in arg_ids):
+                    raise ValueError(f"corrupt expression file: node {n} refers forward")
+                missing = [a for a in arg_ids if a not in built]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                args = [built[a] for a in arg_ids]
+                node = Add(*args) if tag == _ADD else Mul(*args) if tag == _MUL else Pow(*args)
+            elif tag == _VAR:
+                node = Var(self._string(payload))
+            elif tag == _FUNC:
+                (a,) = _U32.unpack_from(self._buffer, at)
+                if a >= n:
+                    raise ValueError(f"corrupt expression file: node {n} refers forward")
+                if a not in built:
+                    stack.append(a)
+                    continue
+                node = Func(self._string(payload), built[a])
+            else:
+                node = Constant(self._constant(tag, payload, at))
+            built[n] = node
+            stack.pop()
+        return built[number]
+
+    def _record(self, n):
+        if not 0 <= n < self._n_nodes:
+            raise ValueError(f"corrupt expression file: no node {n}")
+        (offset,) = _U32.unpack_from(self._buffer, self._index_at + 4 * n)
+        at = self._records_at + offset
+        tag, payload = _RECORD.unpack_from(self._buffer, at)
+        return tag, payload, at + _RECORD.size
+
+    def _constant(self, tag, payload, at):
+        if tag == _SMALLINT:
+            return payload - _SMALL_BIAS
+        if tag == _INT:
+            return _I64.unpack_from(self._buffer, at)[0]
+        if tag == _FLOAT:
+            return _F64.unpack_from(self._buffer, at)[0]
+        if tag == _BIGINT:
+            return int.from_bytes(self._buffer[at:at + payload], "little", signed=True)
+        if tag == _FRACTION:
+            (n,) = _U32.unpack_from(self._buffer, at)
+            numerator = int.from_bytes(self._buffer[at + 4:at + 4 + n], "little", signed=True)
+            denominator = int.from_bytes(self._buffer[at + 4 + n:at + payload], "little", signed=True)
+            return Fraction(numerator, denominator)
+        raise ValueError(f"corrupt expression file: unknown record tag {tag}")
+
+    def close(self):
+        self._built.clear()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _int_bytes(value):
+    return value.to_bytes(value.bit_length() // 8 + 1, "little", signed=True)
+
+def _constant_record(value):
+    if isinstance(value, bool):
+        raise TypeError("cannot serialize a boolean constant")
+    if isinstance(value, int):
+        if -_SMALL_BIAS <= value < _SMALL_BIAS:
+            return _RECORD.pack(_SMALLINT, value + _SMALL_BIAS)
+        if -2**63 <= value < 2**63:
+            return _RECORD.pack(_INT, 0) + _I64.pack(value)
+        data = _int_bytes(value)
+        return _RECORD.pack(_BIGINT, len(data)) + data
+    if isinstance(value, float):
+        return _RECORD.pack(_FLOAT, 0) + _F64.pack(value)
+    if isinstance(value, Fraction):
+        numerator, denominator = _int_bytes(value.numerator), _int_bytes(value.denominator)
+        data = _U32.pack(len(numerator)) + numerator + denominator
+        return _RECORD.pack(_FRACTION, len(data)) + data
+    raise TypeError(f"cannot serialize constant of type {type(value).__name__}")
@@ -0,0 +1,429 @@
+import math
+from fractions import Fraction
+from numbers import Number
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.core import validate_var_name
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Expr, Constant, Var, Add, Mul, Pow, Func
+from mathphysicslib.polynomial import Poly
+
+MODES = ("rational", "float")
+
+class Series:
+    """
+    Truncated power series c_0 + c_1*(var - point) + ... + c_order*(var - point)**order.
+
+        s = series("(1 + x)**-1", "x", order=4)
+        s.coefficients          -> [1, -1, 1, -1, 1]
+        s.to_expr()             -> back to Add/Mul/Pow nodes
+        s(0.1)                  -> the truncated sum at var = 0.1
+
+    - coefficients : list of order + 1 numbers, exact (int / Fraction) in rational mode
+                     and floats in float mode; a coefficient depending on other
+                     variables of the expression is a Poly in them.
+    Series over the same variable and point combine with +, * and ** (by a number);
+    the result keeps the smaller order. Treated as immutable values.
+    """
+    __slots__ = ("coefficients", "var", "point", "order")
+
+    def __init__(self, coefficients, var, point=0, order=None):
+        coefficients = [int(c) if type(c) is Fraction and c.denominator == 1 else c
+                        for c in coefficients]
+        if order is None:
+            order = len(coefficients) - 1
+        coefficients = coefficients[:order + 1]
+        coefficients += [0] * (order + 1 - len(coefficients))
+        self.coefficients = coefficients
+        self.var = var
+        self.point = point
+        self.order = order
+
+    def __getitem__(self, k):
+        return self.coefficients[k] if k <= self.order else 0
+
+    def __repr__(self):
+        return f"Series({self.to_expr()!r} + O(({self.var} - {self.point})**{self.order + 1}))"
+
+    def __eq__(self, other):
+        if not isinstance(other, Series):
+            return NotImplemented
+        return (self.var, self.point, self.order, self.coefficients) == \
+            (other.var, other.point, other.order, other.coefficients)
+
+    __hash__ = None
+
+    def _combine(self, other):
+        if isinstance(other, Series):
+            if (other.var, other.point) != (self.var, self.point):
+                raise ValueError("series must share the variable and expansion point")
+            return min(self.order, other.order), self.coefficients, other.coefficients
+        if isinstance(other, (Number, Poly)) and not isinstance(other, bool):
+            return self.order, self.coefficients, [other] + [0] * self.order
+        return None
+
+    def __add__(self, other):
+        combined = self._combine(other)
+        if combined is None:
+            return NotImplemented
+        n, a, b = combined
+        return Series([a[k] + b[k] for k in range(n + 1)], self.var, self.point)
+
+    __radd__ = __add__
+
+    def __mul__(self, other):
+        combined = self._combine(other)
+        if combined is None:
+            return NotImplemented
+        n, a, b = combined
+        return Series(_cauchy(a, b, n), self.var, self.point)
+
+    __rmul__ = __mul__
+
+    def __pow__(self, exponent):
+        if not isinstance(exponent, Number) or isinstance(exponent, bool):
+            return NotImplemented
+        mode = "float" if any(isinstance(c, float) for c in self.coefficients) else "rational"
+        return Series(_power(self.coefficients, exponent, self.order, mode), self.var, self.point)
+
+    def __call__(self, value):
+        """The truncated sum at var = value (Horner); coefficients must be numbers."""
+        h = value - self.point
+        total = 0
+        for c in reversed(self.coefficients):
+            total = total * h + c
+        return total
+
+    def to_expr(self):
+        """sum_k c_k * (var - point)**k as an Expr, built through the folding factories."""
+        shift = Var(self.var) if self.point == 0 else Add.add_fold(Var(self.var), -self.point)
+        terms = []
+        for k, c in enumerate(self.coefficients):
+            if isinstance(c, Poly):
+                if c.is_zero():
+                    continue
+                c = c.to_expr()
+            elif c == 0:
+                continue
+            terms.append(Mul.mul_fold(c, Pow.pow_fold(shift, k)) if k else c)
+        return Add.add_fold(*terms) if terms else Constant(0)
+
+def series(expr, var, point=0, order=6, mode="rational"):
+    """
+    Taylor expansion of an Expr (or formula string) in 'var' about 'point', through
+    (var - point)**order, by truncated power-series arithmetic over the expression DAG.
+
+        series("(1 + x)**0.5", "x", order=3)           -> 1 + x/2 - x**2/8 + x**3/16
+        series("m*(1 - v**2)**-0.5", "v", order=4)     -> coefficients are Polys in m
+
+    - Every shared subexpression is expanded once. Add is coefficient-wise, Mul is a
+      truncated Cauchy product and Pow with a numeric exponent uses Miller's recurrence,
+      all O(order**2) per node; nothing is differentiated and no tree grows.
+    - mode="rational" keeps coefficients exact (float constants are converted exactly);
+      mode="float" computes in floating point, needed for e.g. (2 + x)**0.5.
+    - Variables other than 'var' become Poly coefficients. Their powers must be
+      non-negative integers, and a power's leading coefficient must be a number
+      unless the exponent is a non-negative integer.
+    Raises:
+      - ValueError when the expansion does not exist as a power series (a pole or
+        branch point at 'point'), or needs irrational numbers in rational mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"unknown mode {mode!r}, expected one of {MODES}")
+    if isinstance(var, Var):
+        var = var.name
+    validate_var_name(var)
+    if not isinstance(order, int) or isinstance(order, bool) or order < 0:
+        raise ValueError("order must be a non-negative integer")
+    if isinstance(expr, str):
+        expr = parse_to_func(expr)
+    if not isinstance(expr, Expr):
+        raise TypeError("expression must be an Expr or a string")
+    number = _rational if mode == "rational" else float
+    point = number(point)
+    dag = build_dag(expr)
+    values = dag.map(lambda node, args: _expand(node, args, var, point, order, number, mode))
+    return Series(values[dag.outputs[0]], var, point, order)
+
+def _expand(node, args, var, point, order, number, mode):
+    if isinstance(node, Constant):
+        return [number(node.value)] + [0] * order
+    if isinstance(node, Var):
+        if node.name != var:
+            return [Poly.var(node.name)] + [0] * order
+        return ([point, 1] + [0] * (order - 1))[:order + 1]
+    if isinstance(node, Add):
+        total = args[0]
+        for a in args[1:]:
+            total = [x + y for x, y in zip(total, a)]
+        return total
+    if isinstance(node, Mul):
+        product = args[0]
+        for a in args[1:]:
+            product = _cauchy(product, a, order)
+        return product
+    value = _exact_value if mode == "rational" else _float_value
+    if isinstance(node, Pow):
+        base, exponent = args
+        if _is_constant(exponent) and isinstance(exponent[0], Number):
+            return _power(base, exponent[0], order, mode)
+        # variable exponent: b**e = exp(e * log b)
+        log = elementary_series("log", _numeric_start(base, "log"), order, value)
+        return elementary_series("exp", _numeric_start(_cauchy(exponent, log, order), "exp"), order, value)
+    if isinstance(node, Func):
+        return elementary_series(node.name, _numeric_start(args[0], node.name), order, value)
+    raise TypeError(f"cannot expand {type(node).__name__}")
+
+def _rational(value):
+    if isinstance(value, Fraction) or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            raise ValueError(f"{value} has no rational value")
+        return Fraction(value)
+    raise TypeError(f"cannot use {value!r} as a coefficient")
+
+def _is_constant(a):
+    return all(isinstance(c, Number) and c == 0 for c in a[1:])
+
+def _numeric_start(h, name):
+    # h with its leading coefficient as a plain number (functions are evaluated there)
+    h0 = _number(h[0])
+    if h0 is None:
+        raise ValueError(f"{name} of a series needs a numeric leading coefficient")
+    return [h0] + list(h[1:])
+
+def _plain_zero(c):
+    # A coefficient known to be zero without looking inside Polys or arrays
+    return isinstance(c, Number) and c == 0
+
+def _is_zero(c):
+    return c.is_zero() if isinstance(c, Poly) else c == 0
+
+def _number(c):
+    # A coefficient as a plain number, or None if it depends on other variables
+    if isinstance(c, Poly):
+        if c.is_zero():
+            return 0
+        if any(any(e) for e in c.terms):
+            return None
+        return next(iter(c.terms.values()))
+    return c
+
+def _divide(x, d):
+    # int / int stays exact; everything else (Fraction, float, Poly) divides natively
+    if isinstance(x, int) and isinstance(d, int):
+        return Fraction(x, d)
+    return x / d
+
+def _cauchy(a, b, n):
+    # (a * b) truncated after degree n; plain zeros are skipped (sparse inputs are common)
+    result = [0] * (n + 1)
+    nonzero = [j for j in range(n + 1) if not _plain_zero(b[j])]
+    for i in range(n + 1):
+        x = a[i]
+        if _plain_zero(x):
+            continue
+        for j in nonzero:
+            if i + j > n:
+                break
+            result[i + j] = result[i + j] + x * b[j]
+    return result
+
+def _power(a, e, n, mode):
+    if isinstance(e, Fraction) and e.denominator == 1:
+        e = int(e)
+    if isinstance(e, float) and e.is_integer():
+        e = int(e)
+    # split off the leading zeros: a = t**v * b with b[0] != 0
+    v = next((k for k, c in enumerate(a) if not _is_zero(c)), None)
+    if v is None:
+        if e < 0:
+            raise ValueError("negative power of a series that vanishes identically")
+        return [1 if e == 0 else 0] + [0] * n
+    if v and not isinstance(e, int):
+        raise ValueError("non-integer power of a series vanishing at the expansion point (branch point)")
+    if v and e < 0:
+        raise ValueError("negative power of a series vanishing at the expansion point (pole)")
+    shift = v * e if v else 0
+    if shift > n:
+        return [0] * (n + 1)
+    m = n - shift
+    b = a[v:v + m + 1]
+    b += [0] * (m + 1 - len(b))
+    b0 = _number(b[0])
+    if b0 is None:
+        # Poly leading coefficient: only products are available, not division
+        if not isinstance(e, int) or e < 0:
+            raise ValueError("a power with a non-integer or negative exponent needs a numeric leading coefficient")
+        result = _binary_power(b, e, m)
+    else:
+        result = _miller(b, b0, e, m, mode)
+    return [0] * shift + result
+
+def _binary_power(b, e, n):
+    result = [1] + [0] * n
+    for bit in bin(e)[2:]:
+        result = _cauchy(result, result, n)
+        if bit == "1":
+            result = _cauchy(result, b, n)
+    return result
+
+def _miller(b, b0, e, n, mode):
+    # g = b**e: g_0 = b_0**e, g_k = (sum_{j=1..k} ((e + 1)*j - k) * b_j * g_{k-j}) / (k * b_0)
+    if mode == "rational":
+        e = _rational(e)
+        g0 = _exact_power(b0, e)
+    else:
+        g0 = float(b0) ** float(e)
+    g = [g0]
+    for k in range(1, n + 1):
+        total = 0
+        for j in range(1, k + 1):
+            if _is_zero(b[j]):
+                continue
+            total = total + ((e + 1) * j - k) * b[j] * g[k - j]
+        g.append(_divide(total, k * b0))
+    return g
+
+def _exact_power(base, e):
+    # base**e as an exact rational, or ValueError when it is irrational
+    if isinstance(e, int):
+        return Fraction(base) ** e if e < 0 else base ** e
+    base = Fraction(base)
+    if base < 0:
+        raise ValueError(f"({base})**({e}) is not real")
+    num = _exact_root(base.numerator, e.denominator)
+    den = _exact_root(base.denominator, e.denominator)
+    if num is None or den is None:
+        raise ValueError(f"({base})**({e}) is irrational; use mode='float'")
+    return Fraction(num, den) ** e.numerator
+
+def _exact_root(n, k):
+    # The integer k-th root of n if n is a perfect k-th power (Newton's method from above)
+    if n == 0:
+        return 0
+    r = 1 << -(-n.bit_length() // k)
+    while True:
+        s = ((k - 1) * r + n // r ** (k - 1)) // k
+        if s >= r:
+            break
+        r = s
+    return r if r ** k == n else None
+
+def _check_domain(name, x):
+    # name(x) must exist and be analytic at x for its series to exist, whatever the mode
+    if name == "log" and x <= 0:
+        problem = "a singularity" if x == 0 else "outside the domain"
+    elif name in ("asin", "acos") and abs(x) >= 1:
+        problem = "a branch point" if abs(x) == 1 else "outside the domain"
+    else:
+        return
+    raise ValueError(f"{name}({x}) has no series: {x} is {problem} of {name}")
+
+def _exact_value(name, x):
+    # name(x) in rational mode: only the values that are rational numbers exist
+    _check_domain(name, x)
+    if name == "sqrt":
+        return _exact_power(x, Fraction(1, 2))
+    value = Func.func_fold(name, Constant(x))
+    if not isinstance(value, Constant):
+        raise ValueError(f"{name}({x}) is irrational; use mode='float'")
+    return value.value
+
+def _float_value(name, x):
+    _check_domain(name, x)
+    try:
+        return getattr(math, name)(x)
+    except ValueError:
+        raise ValueError(f"{name}({x}) is not a real number") from None
+
+def elementary_series(name, h, n, value):
+    """
+    Coefficients 0..n of name(h) for a series h (a coefficient list) and an elementary
+    function 'name' (one of expresso.FUNCTIONS), in O(n**2) operations.
+
+    The coefficients follow from the function's differential equation, e.g. y = exp(h)
+    has y' = y*h', so k*y_k = sum_j j*h_j*y_{k-j}; only value(fn, h[0]) is ever evaluated
+    (for fn the function itself, its sin/cos or sinh/cosh partner, or "sqrt"). The rest
+    is + - * and division by integers and h[0]-derived numbers, so coefficients may be
+    exact rationals, floats or NumPy arrays alike.
+    """
+    h0 = h[0]
+    dh = [0] + [j * h[j] for j in range(1, n + 1)]   # k*h_k: the coefficients of t*h'(t)
+    used = [j for j in range(1, n + 1) if not _plain_zero(h[j])]
+
+    def tangent(y, k):
+        # sum_{j=1..k} j*h_j*y_{k-j}, which is k*z_k when z' = y*h'
+        total = 0
+        for j in used:
+            if j > k:
+                break
+            total = total + dh[j] * y[k - j]
+        return total
+
+    if name == "exp":
+        y = [value("exp", h0)]
+        for k in range(1, n + 1):
+            y.append(_divide(tangent(y, k), k))
+        return y
+    if name == "log":
+        # h*y' = h': k*h0*y_k = k*h_k - sum_{i=1..k-1} i*y_i*h_{k-i}
+        y = [value("log", h0)]
+        for k in range(1, n + 1):
+            total = dh[k]
+            for i in range(1, k):
+                total = total - i * y[i] * h[k - i]
+            y.append(_divide(total, k * h0))
+        return y
+    if name in ("sin", "cos", "sinh", "cosh"):
+        # s' = c*h' and c' = -s*h' (sin/cos) or c' = s*h' (sinh/cosh)
+        hyperbolic = name in ("sinh", "cosh")
+        s = [value("sinh" if hyperbolic else "sin", h0)]
+        c = [value("cosh" if hyperbolic else "cos", h0)]
+        for k in range(1, n + 1):
+            s_k = _divide(tangent(c, k), k)
+            c_k = _divide(tangent(s, k), k)
+            s.append(s_k)
+            c.append(c_k if hyperbolic else -c_k)
+        return s if name in ("sin", "sinh") else c
+    if name in ("tan", "tanh"):
+        # y' = w*h' with w = 1 + y**2 (tan) or 1 - y**2 (tanh)
+        sign = 1 if name == "tan" else -1
+        y = [value(name, h0)]
+        w = []
+        for k in range(1, n + 1):
+            m = k - 1
+            square = 0
+            for i in range(m + 1):
+                square = square + y[i] * y[m - i]
+            w.append((1 if m == 0 else 0) + sign * square)
+            y.append(_divide(tangent(w, k), k))
+        return y
+    if name in ("atan", "asin", "acos"):
+        # y' = g*h' with g = 1/q, q = 1 + h**2 (atan), or g = q**(-1/2), q = 1 - h**2
+        y = [value(name, h0)]
+        square = _cauchy(h, h, n)
+        sign = 1 if name == "atan" else -1
+        q = [1 + sign * square[0]] + [sign * c for c in square[1:]]
+        q0 = q[0]
+        if name == "atan":
+            g = [_divide(1, q0)]
+            for k in range(1, n):
+                total = 0
+                for j in range(1, k + 1):
+                    total = total + q[j] * g[k - j]
+                g.append(_divide(-total, q0))
+        else:
+            # Miller's recurrence for e = -1/2: g_k = sum_j (j - 2k)*q_j*g_{k-j} / (2k*q0)
+            g = [_divide(1, value("sqrt", q0))]
+            for k in range(1, n):
+                total = 0
+                for j in range(1, k + 1):
+                    total = total + (j - 2 * k) * q[j] * g[k - j]
+                g.append(_divide(total, 2 * k * q0))
+        for k in range(1, n + 1):
+            y_k = _divide(tangent(g, k), k)
+            y.append(-y_k if name == "acos" else y_k)
+        return y
+    raise ValueError(f"unknown function {name!r}")
@@ -0,0 +1,71 @@
+from fractions import Fraction
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Expr, Constant, Add, Mul, Pow
+from mathphysicslib.rewrite import RuleSet, Rule, P, Wild
+
+def _integer(node):
+    return isinstance(node, Constant) and type(node.value) is int
+
+def _rational(node):
+    return isinstance(node, Constant) and type(node.value) in (int, Fraction)
+
+def _single(operands):
+    return operands[0] if len(operands) == 1 else None
+
+def _exact_power(b, n):
+    # b**n for a rational b and an integer n, as an exact int or Fraction
+    if b.value == 0 and n.value < 0:
+        return None   # left to pow_fold's division-by-zero error
+    value = Fraction(b.value) ** n.value
+    return Constant(int(value) if value.denominator == 1 else value)
+
+def _fold_pow(b, e):
+    result = Pow.pow_fold(b, e)
+    return None if isinstance(result, Pow) and result.base is b and result.exponent is e else result
+
+def _distribute(terms, c):
+    # c*(a + b + k) -> c*a + c*b + c*k, so the scaled terms can meet their like terms
+    return Add.add_fold(*[Mul.mul_fold(t, c) for t in terms])
+
+SIMPLIFY_RULES = RuleSet([
+    # one-operand sums and products built directly (the factories never leave these)
+    Rule("single-term", P(Add, Wild("terms", many=True)), lambda terms: _single(terms)),
+    Rule("single-factor", P(Mul, Wild("factors", many=True)), lambda factors: _single(factors)),
+    # b**n for rational b and integer n, kept exact: 2**-2 -> 1/4, (2/3)**2 -> 4/9
+    Rule("rational-power", P(Pow, Wild("b", Constant, _rational), Wild("n", Constant, _integer)),
+         _exact_power),
+    # (x**a)**n -> x**(a*n) for integer n, which holds for any a
+    Rule("power-of-power", P(Pow, P(Pow, Wild("x"), Wild("a")), Wild("n", Constant, _integer)),
+         lambda x, a, n: Pow.pow_fold(x, Mul.mul_fold(a, n))),
+    # (x*y)**n -> x**n * y**n for integer n, so the factors can meet their equal bases
+    Rule("power-of-product", P(Pow, Wild("m", Mul), Wild("n", Constant, _integer)),
+         lambda m, n: Mul.mul_fold(*[Pow.pow_fold(f, n) for f in m.factors])),
+    # identities and integer powers of Pow nodes built without pow_fold: x**1, 1**e, x**0
+    Rule("fold-power", P(Pow, Wild("b"), Wild("e")), _fold_pow),
+    Rule("distribute-constant", P(Mul, P(Add, Wild("terms", many=True)), Wild("c", Constant)),
+         _distribute),
+])
+
+def simplify(expr, rules=None):
+    """
+    Simplify an Expr (or formula string) bottom-up to a fixpoint of SIMPLIFY_RULES:
+
+        simplify(Pow(Mul(x, y), 2) * Pow(x, -1))     -> x * y**2
+        simplify(subs(model, {"k": 0}))              -> re-simplified where the edit landed
+
+    - Each rewritten node is rebuilt through the folding factories, so constant folding
+      and like-term / equal-base collection run again wherever an operand changed.
+    - The simplified form of every subtree is cached by structural key across calls
+      for as long as a tree holding the subtree is alive (see RuleSet), so simplifying
+      a slightly edited copy of an already simplified expression only does work along
+      the edited paths.
+    - 'rules' replaces the default rule set; SIMPLIFY_RULES.clear_cache() drops the cache.
+    Raises:
+      - ValueError on a division by zero, or when rules rewrite in a cycle.
+    """
+    if isinstance(expr, str):
+        expr = parse_to_func(expr)
+    if not isinstance(expr, Expr):
+        raise TypeError("expression must be an Expr or a string")
+    return (SIMPLIFY_RULES if rules is None else rules).rewrite(expr)
@@ -0,0 +1,118 @@
+from fractions import Fraction
+
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func, parse_many, parse_file
+from mathphysicslib.ast_parser import parse_cache_info, clear_parse_cache, set_parse_cache_size
+from mathphysicslib.ast_parser import PARSE_CACHE_SIZE
+from mathphysicslib.expresso import Add, Mul, Pow, Var, Constant, Func, interning
+
+def test_parse_basic_operators():
+    x, y = Var("x"), Var("y")
+    assert parse_to_func("x + 2*y") == Add(x, Mul(2, y))
+    assert parse_to_func("x**3") == Pow(x, 3)
+    with pytest.raises(TypeError):
+        parse_to_func(3)
+
+def test_parse_cache_hits_and_misses():
+    clear_parse_cache()
+    a = parse_to_func("x*y + 1")
+    b = parse_to_func("x*y + 1")
+    info = parse_cache_info()
+    assert a is b
+    assert info.hits == 1 and info.misses == 1
+
+def test_parse_cache_hits_are_interned_inside_interning():
+    clear_parse_cache()
+    before = parse_to_func("x**2 + y")
+    with interning():
+        a = parse_to_func("x**2 + y")
+        b = parse_to_func("y + x**2")
+        square = Pow(Var("x"), 2)
+    assert a is b and a == before
+    assert any(t is square for t in a.terms)
+    assert parse_cache_info().hits == 1
+
+def test_parse_cache_bypass():
+    a = parse_to_func("z + 4")
+    b = parse_to_func("z + 4", cache=False)
+    assert a == b and a is not b
+
+def test_parse_cache_is_bounded():
+    set_parse_cache_size(2)
+    try:
+        for s in ["a", "b", "c", "a"]:
+            parse_to_func(s)
+        info = parse_cache_info()
+        assert info.currsize == 2 and info.misses == 4
+    finally:
+        set_parse_cache_size(PARSE_CACHE_SIZE)
+    with pytest.raises(ValueError):
+        set_parse_cache_size(-1)
+
+def test_parse_many_dedupes_and_shares():
+    out = parse_many(["x**2 + y", "y + x**2", "(x**2 + y)*z", "x**2 + y"])
+    assert out[0] is out[1] is out[3]
+    assert out[2].factors[0] is out[0]
+
+def test_parse_many_without_sharing():
+    out = parse_many(["x + 1", "1 + x"], share=False)
+    assert out[0] == out[1] and out[0] is not out[1]
+    with pytest.raises(TypeError):
+        parse_many(["x", 1])
+
+def test_parse_subtraction_division_and_unary():
+    x, y = Var("x"), Var("y")
+    assert parse_to_func("x - y") == Add(x, Mul(y, -1))
+    assert parse_to_func("x - (y - 1)") == Add(x, Mul(y, -1), 1)
+    assert parse_to_func("x / y") == Mul(x, Pow(y, -1))
+    assert parse_to_func("x / 4") == Mul(x, Constant(Fraction(1, 4)))
+    assert parse_to_func("-x + +y") == Add(Mul(x, -1), y)
+    assert parse_to_func("-2.5") == Constant(-2.5)
+    assert parse_to_func("-x**2") == Mul(Pow(x, 2), -1)
+
+def test_parse_function_calls():
+    x = Var("x")
+    assert parse_to_func("sin(x) * exp(-x)") == Mul(Func("sin", x), Func("exp", Mul(x, -1)))
+    assert parse_to_func("sqrt(1 + x)") == Pow(Add(1, x), 0.5)
+
+@pytest.mark.parametrize("source, error", [
+    ("foo(x)", ValueError), ("sin(x, y)", ValueError), ("sin()", ValueError),
+    ("x / 0", ValueError), ("x % 2", TypeError), ("x < y", TypeError), ("'a'", TypeError),
+])
+def test_parse_rejects_unsupported_input(source, error):
+    with pytest.raises(error):
+        parse_to_func(source, cache=False)
+
+def write_formulas(tmp_path, lines):
+    path = tmp_path / "formulas.txt"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+def test_parse_file_streams_numbered_results(tmp_path):
+    path = write_formulas(tmp_path, ["# comment", "x - y", "", "foo(x)", "x +", "sin(x)/2"])
+    results = list(parse_file(path, chunk_lines=2))
+    assert [k for k, _ in results] == [2, 4, 5, 6]
+    assert results[0][1] == parse_to_func("x - y")
+    assert isinstance(results[1][1], ValueError)
+    assert isinstance(results[2][1], SyntaxError)
+    assert results[3][1] == Mul(Func("sin", Var("x")), Constant(Fraction(1, 2)))
+
+def test_parse_file_with_workers_keeps_file_order(tmp_path):
+    lines = [f"x**{k} - {k}/y" if k % 7 else "x +" for k in range(200)]
+    path = write_formulas(tmp_path, lines)
+    expected = list(parse_file(path))
+    results = list(parse_file(path, workers=2, chunk_lines=16))
+    assert [k for k, _ in results] == list(range(1, 201))
+    for (_, got), (_, want) in zip(results, expected):
+        if isinstance(want, Exception):
+            assert type(got) is type(want)
+        else:
+            assert got == want
+
+def test_parse_file_rejects_bad_arguments(tmp_path):
+    path = write_formulas(tmp_path, ["x"])
+    with pytest.raises(ValueError):
+        parse_file(path, workers=0)
+    with pytest.raises(ValueError):
+        parse_file(path, chunk_lines=0)
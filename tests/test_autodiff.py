@@ -0,0 +1,111 @@
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.autodiff import gradient, jacobian, hessian
+from mathphysicslib.core import derivative
+from mathphysicslib.expresso import Constant, Var
+
+def test_gradient_matches_derivative():
+    f = "x**3*y + 2*x*y*z + z**2"
+    grad = gradient(f, ["x", "y", "z"])
+    assert grad == [derivative(f, v) for v in ["x", "y", "z"]]
+
+def test_gradient_unused_variable_is_zero():
+    assert gradient("x*y", ["x", "w"])[1] == Constant(0)
+
+def test_gradient_numeric():
+    g = gradient("x**2*y + y**3", [Var("x"), "y"], at={"x": 1.0, "y": 2.0})
+    assert g == [4.0, 13.0]
+
+def test_gradient_numeric_variable_exponent():
+    gx, gy = gradient("x**y", ["x", "y"], at={"x": 2.0, "y": 3.0})
+    assert gx == pytest.approx(12.0)
+    assert gy == pytest.approx(8.0 * 0.6931471805599453)
+    gx, gy = gradient("x**y", ["x", "y"])
+    assert gx == parse_to_func("y*x**(y - 1)")
+    assert gy == parse_to_func("x**y*log(x)")
+    [g] = gradient("2**x", ["x"])
+    assert g == parse_to_func("2**x*log(2)")
+
+def test_gradient_numeric_missing_value():
+    with pytest.raises(ValueError):
+        gradient("x*y", ["x"], at={"x": 1.0})
+
+def test_jacobian_rows():
+    J = jacobian(["x*y", "x + y", "(x + y)**2"], ["x", "y"])
+    assert J[0] == [Var("y"), Var("x")]
+    assert J[1] == [Constant(1), Constant(1)]
+    assert J[2][0] == J[2][1] == parse_to_func("2*(x + y)")
+
+def test_hessian_symmetric():
+    H = hessian("x**2*y + y**3 + x*z", ["x", "y", "z"])
+    for i in range(3):
+        for j in range(3):
+            assert H[i][j] == H[j][i]
+    assert H[1][1] == parse_to_func("6*y")
+
+def test_hessian_numeric_arrays():
+    np = pytest.importorskip("numpy")
+    xs = np.array([1.0, 2.0, 3.0])
+    H = hessian("x**2*y + y**3", ["x", "y"], at={"x": xs, "y": 2.0})
+    assert np.allclose(H[0][1], 2 * xs)
+    assert H[1][1] == pytest.approx(12.0)
+
+def test_derivative_at_matches_symbolic():
+    from mathphysicslib.autodiff import derivative_at
+    from mathphysicslib.numeric import compile
+    f = "(x**2 + y)**8 + x**0.5*y**3"
+    at = {"x": 1.5, "y": 0.5}
+    for path in ["x", {"x": 3}, {"x": 1, "y": 1}, ["y", "x", "y"]]:
+        expected = compile(derivative(f, path), ["x", "y"], backend="math")(1.5, 0.5)
+        assert derivative_at(f, path, at) == pytest.approx(expected, rel=1e-12)
+
+def test_derivative_at_hyper_dual_mixed_partial():
+    from mathphysicslib.autodiff import derivative_at
+    assert derivative_at("x**3*y**2*z", {"x": 2, "y": 1, "z": 1}, {"x": 1.0, "y": 2.0, "z": 3.0}) == 24.0
+
+def test_derivative_at_vanishing_base_and_inactive():
+    from mathphysicslib.autodiff import derivative_at
+    assert derivative_at("x**2", "x", {"x": 0.0}, order=2) == 2.0
+    assert derivative_at("x**2", "x", {"x": 0.0}, order=3) == 0.0
+    assert derivative_at("y**2", "x", {"x": 1.0, "y": 3.0}) == 0.0
+    assert derivative_at("x*y", "x", {"x": 2.0, "y": 3.0}, order=0) == 6.0
+
+def test_derivative_at_arrays_keep_the_point_shape():
+    np = pytest.importorskip("numpy")
+    from mathphysicslib.autodiff import derivative_at
+    xs = np.linspace(0, 1, 5)
+    at = {"x": xs, "y": 3.0}
+    for f, path in [("y**2", "x"), ("x*y", "x"), ("x**2", {"x": 3}), ("y", {"x": 1, "y": 1})]:
+        assert derivative_at(f, path, at).shape == (5,)
+    assert np.array_equal(derivative_at("y**2", "x", at), np.zeros(5))
+    assert np.array_equal(derivative_at("x*y", "x", at), np.full(5, 3.0))
+    assert derivative_at("y**2", "x", {"x": 1.0, "y": 3.0}) == 0.0
+
+def test_derivative_at_variable_exponent():
+    import math
+    from mathphysicslib.autodiff import derivative_at
+    assert derivative_at("x**y", {"x": 1, "y": 1}, {"x": 2.0, "y": 3.0}) == \
+        pytest.approx(4 * (1 + 3 * math.log(2)))
+    assert derivative_at("2**x", "x", {"x": 1.0}, order=2) == pytest.approx(2 * math.log(2) ** 2)
+
+def test_derivative_at_arrays_and_core():
+    np = pytest.importorskip("numpy")
+    xs = np.linspace(0, 1, 5)
+    d2 = derivative("(x**2 + 1)**0.5", "x", 2, at={"x": xs})
+    assert np.allclose(d2, (xs**2 + 1) ** -1.5)
+
+def test_gradient_and_derivative_at_with_functions():
+    import math
+    from mathphysicslib.autodiff import derivative_at
+    f = "sin(x*y) + log(x)*tanh(y)"
+    assert gradient(f, ["x", "y"]) == [derivative(f, v) for v in ["x", "y"]]
+    gx, gy = gradient(f, ["x", "y"], at={"x": 0.5, "y": 2.0})
+    assert gx == pytest.approx(2 * math.cos(1.0) + math.tanh(2.0) / 0.5)
+    assert gy == pytest.approx(0.5 * math.cos(1.0) + math.log(0.5) / math.cosh(2.0) ** 2)
+    # d^3/dx^3 atan(x**2) against the symbolic derivative
+    from mathphysicslib.numeric import compile
+    expected = compile(derivative("atan(x**2)", "x", 3), ["x"], backend="math")(0.7)
+    assert derivative_at("atan(x**2)", "x", {"x": 0.7}, order=3) == pytest.approx(expected, rel=1e-12)
+    assert derivative_at("sin(x)*cos(y)", {"x": 2, "y": 1}, {"x": 0.7, "y": 0.2}) == \
+        pytest.approx(math.sin(0.7) * math.sin(0.2))
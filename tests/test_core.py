@@ -121,4 +121,132 @@ def test_integral_empty_func():
     from mathphysicslib.core import integral
     with pytest.raises(ValueError) as e:
         integral(None, "x", order=1)
-    assert str(e.value) == "function cannot be empty"
\ No newline at end of file
+    assert str(e.value) == "function cannot be empty"
+
+def test_derivative_polynomial():
+    from mathphysicslib.core import derivative
+    from mathphysicslib.expresso import Var, Mul, Add, Pow, Constant
+    x = Var("x")
+    assert derivative("x**3 + 2*x + 7", "x") == Add(Mul(3, Pow(x, 2)), 2)
+    assert derivative("x**3 + 2*x + 7", "x", order=4) == Constant(0)
+    assert derivative("5", "x") == Constant(0)
+
+def test_derivative_product_rule_nary():
+    from mathphysicslib.core import derivative
+    from mathphysicslib.ast_parser import parse_to_func
+    # d/dx (x*y*z) = y*z
+    assert derivative("x*y*z", "x") == parse_to_func("y*z")
+
+def test_derivative_mixed_path():
+    from mathphysicslib.core import derivative
+    from mathphysicslib.ast_parser import parse_to_func
+    f = "x**3*y**2 + 4*x*y + 7"
+    assert derivative(f, {"x": 2, "y": 1}) == parse_to_func("12*x*y")
+    assert derivative(f, ["y", "x", "x"]) == derivative(f, {"x": 2, "y": 1})
+
+def test_derivative_chain_rule():
+    from mathphysicslib.core import derivative
+    from mathphysicslib.numeric import compile
+    d = derivative("(x**2 + y**2)**3", "x", order=2)
+    f = compile(d, ["x", "y"], backend="math")
+    x, y = 1.5, -0.5
+    r = x**2 + y**2
+    assert abs(f(x, y) - (6 * r**2 + 24 * x**2 * r)) < 1e-9
+
+def test_derivative_symbolic_exponent():
+    from mathphysicslib.core import derivative
+    from mathphysicslib.expresso import Var, Mul, Add, Pow
+    n, x = Var("n"), Var("x")
+    assert derivative("x**n", "x") == Mul(n, Pow(x, Add(n, -1)))
+
+def test_derivative_variable_exponent():
+    import math
+    from mathphysicslib.core import derivative
+    from mathphysicslib.numeric import compile
+    d = compile(derivative("2**x", "x"), ["x"], backend="math")
+    assert d(1.5) == pytest.approx(2**1.5 * math.log(2))
+    d = compile(derivative("x**x", "x"), ["x"], backend="math")
+    assert d(1.5) == pytest.approx(1.5**1.5 * (math.log(1.5) + 1))
+    d = compile(derivative("x**x", "x", 2), ["x"], backend="math")
+    assert d(1.5) == pytest.approx(1.5**1.5 * ((math.log(1.5) + 1)**2 + 1 / 1.5))
+
+def test_differentiate_shares_memo():
+    from mathphysicslib.rules import differentiate
+    from mathphysicslib.ast_parser import parse_to_func
+    cache = {}
+    expr = parse_to_func("(x**2 + y)**3 * (x**2 + y)**2")
+    first = differentiate(expr, "x", cache)
+    size = len(cache)
+    assert differentiate(expr, "x", cache) is first
+    assert len(cache) == size
+
+def test_batch_derivative_matches_serial_and_keeps_order():
+    from mathphysicslib.core import batch_derivative, derivative
+    formulas = [f"x**{k}*y + {k}*x*y**2" for k in range(2, 12)]
+    expected = [derivative(f, {"x": 1, "y": 1}) for f in formulas]
+    assert batch_derivative(formulas, {"x": 1, "y": 1}, workers=2, chunksize=3) == expected
+    assert batch_derivative(formulas, {"x": 1, "y": 1}, workers=1) == expected
+
+def test_batch_derivative_captures_errors_per_item():
+    from mathphysicslib.core import batch_derivative, BatchError
+    from mathphysicslib.expresso import Var, Mul
+    results = batch_derivative(["x**2", "x**", "x**n"], "x", workers=2, chunksize=1)
+    assert results[0] == Mul(Var("x"), 2)
+    assert isinstance(results[1], BatchError) and results[1].index == 1
+    assert results[1].error_type == "SyntaxError"
+    assert not isinstance(results[2], BatchError)
+    with pytest.raises(BatchError) as e:
+        batch_derivative(["x**2", "x**"], "x", workers=1, errors="raise")
+    assert e.value.index == 1
+
+def test_batch_derivative_validates_path_up_front():
+    from mathphysicslib.core import batch_derivative
+    with pytest.raises(ValueError):
+        batch_derivative(["x"], "x", order=-1)
+    with pytest.raises(TypeError):
+        batch_derivative(["x"], 5)
+
+def test_batch_map_workers_keep_constant_types():
+    from mathphysicslib.core import batch_map
+    from mathphysicslib.ast_parser import parse_to_func
+    formulas = ["x**2", "x**2.0", "2", "2.0"] * 4
+    serial = batch_map(parse_to_func, formulas, workers=1)
+    parallel = batch_map(parse_to_func, formulas, workers=2, chunksize=8)
+    assert [repr(e) for e in parallel] == [repr(e) for e in serial]
+    assert type(parallel[1].exponent.value) is float and type(parallel[3].value) is float
+
+def test_batch_map_ships_deep_trees():
+    import sys
+    from mathphysicslib.core import batch_map
+    from mathphysicslib.expresso import Var, Add, Mul, intern
+    x, y = Var("x"), Var("y")
+    expr = Add(x, 1)
+    for i in range(2 * sys.getrecursionlimit()):
+        expr = Add(Mul(expr, y), i + 2)
+    results = batch_map(intern, [expr, Add(x, 2)], workers=2, chunksize=1)
+    assert results[0] == expr and results[1] == Add(x, 2)
+
+def test_integral_definite():
+    from mathphysicslib.core import integral
+    r = integral("x**3 + 1", "x", bounds=(0, 2))
+    assert r.value == pytest.approx(6.0)
+    assert integral("k*x", {"x": 1}, bounds=(0, 1), params={"k": 4}).value == pytest.approx(2.0)
+
+def test_integral_definite_rejects_repeated_variable():
+    from mathphysicslib.core import integral
+    with pytest.raises(ValueError):
+        integral("x*y", ["x", "x"], bounds=[(0, 1), (0, 1)])
+    with pytest.raises(NotImplementedError):
+        integral("x", "x")
+
+def test_derivative_elementary_functions():
+    import math
+    from mathphysicslib.core import derivative
+    from mathphysicslib.ast_parser import parse_to_func
+    from mathphysicslib.numeric import compile
+    assert derivative("sin(x**2)", "x") == parse_to_func("cos(x**2)*x*2")
+    assert derivative("log(x)", "x") == parse_to_func("x**-1")
+    d = compile(derivative("atan(x)*exp(-x)", "x", 2), ["x"], backend="math")
+    x = 0.7
+    expected = (-2 * x / (1 + x**2) ** 2 - 2 / (1 + x**2) + math.atan(x)) * math.exp(-x)
+    assert d(x) == pytest.approx(expected, rel=1e-12)
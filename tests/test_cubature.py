@@ -0,0 +1,92 @@
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.core import integral
+from mathphysicslib.cubature import sobol, halton, smolyak_grid, sparse_grid, qmc
+from mathphysicslib.expresso import Pow
+
+BOX = {"x": (0, 1), "y": (0, 2), "z": (0, 3)}
+
+def test_sobol_unscrambled_prefix():
+    p = sobol(4, 3, scramble=False)
+    assert p.tolist() == [[0, 0, 0], [0.5, 0.5, 0.5], [0.25, 0.75, 0.75], [0.75, 0.25, 0.25]]
+
+def test_sequences_are_balanced_and_reproducible():
+    for points in (sobol(1024, 6, seed=1), sobol(1024, 6, scramble=False)):
+        for d in range(6):
+            # one point in each of the 1024 equal intervals of every coordinate
+            assert len(np.unique(np.floor(points[:, d] * 1024))) == 1024
+    assert np.array_equal(sobol(64, 4, seed=7)[32:], sobol(32, 4, seed=7, skip=32))
+    assert np.array_equal(halton(64, 4, seed=7)[32:], halton(32, 4, seed=7, skip=32))
+    assert halton(3, 2, scramble=False).tolist() == [[0, 0], [0.5, 1 / 3], [0.25, 2 / 3]]
+
+def test_sequence_dimension_limits():
+    with pytest.raises(ValueError):
+        sobol(8, 17)
+    with pytest.raises(ValueError):
+        halton(8, 0)
+
+def test_smolyak_weights_integrate_polynomials_exactly():
+    points, weights, coarse = smolyak_grid(3, 2)
+    assert weights.sum() == pytest.approx(1.0) and coarse.sum() == pytest.approx(1.0)
+    # exact up to total degree 2*level + 1
+    x, y, z = points.T
+    assert weights @ (x**3 * y * z) == pytest.approx(1 / 16)
+    assert coarse[weights == 0].sum() == 0
+
+def test_sparse_grid_moment_of_inertia():
+    r = sparse_grid(parse_to_func("m*(x**2 + y**2)"), ["x", "y", "z"], BOX, params={"m": 2})
+    assert r.value == pytest.approx(2 * 6 * (1 / 3 + 4 / 3), rel=1e-13)
+    assert r.error < 1e-10
+
+def test_sparse_grid_smooth_six_dimensions():
+    names = ["a", "b", "c", "d", "e", "g"]
+    f = Pow(parse_to_func("(1+a)*(1+b)*(1+c)*(1+d)*(1+e)*(1+g)"), -1)
+    r = sparse_grid(f, names, [(0, 1)] * 6, rel_tol=1e-6)
+    assert r.value == pytest.approx(math.log(2) ** 6, rel=1e-6)
+
+def test_sparse_grid_that_does_not_converge_falls_back_to_qmc():
+    # a Gaussian peaked inside a wide box: level 8 is still far from converged
+    expr = parse_to_func("exp(-(x**2 + y**2 + z**2 + w**2))")
+    names, box = ["x", "y", "z", "w"], [(-3, 3)] * 4
+    exact = math.pi ** 2 * math.erf(3) ** 4
+    with pytest.raises(ValueError, match="did not converge"):
+        sparse_grid(expr, names, box, rel_tol=1e-3, fallback=None)
+    r = sparse_grid(expr, names, box, rel_tol=1e-3)
+    assert abs(r.value - exact) <= 5 * r.error + 1e-12 and r.error <= 1e-3 * exact
+    assert r.evaluations > smolyak_grid(4, 8)[0].shape[0]
+    assert sparse_grid(expr, names, box, level=3, fallback=None).evaluations == smolyak_grid(4, 3)[0].shape[0]
+
+def test_qmc_error_estimate_covers_error():
+    f = Pow(parse_to_func("(1+x)*(1+y)*(1+z)"), -1)
+    for sequence in ("sobol", "halton"):
+        r = qmc(f, ["x", "y", "z"], {"x": (0, 1), "y": (0, 1), "z": (0, 1)},
+                sequence=sequence, seed=0, rel_tol=1e-5)
+        assert abs(r.value - math.log(2) ** 3) < 5 * r.error + 1e-12
+        assert r.error <= 1e-5 * r.value
+
+def test_qmc_is_deterministic_per_seed_and_blocking():
+    f = parse_to_func("x*y + z")
+    a = qmc(f, ["x", "y", "z"], BOX, seed=5, points=256, max_points=256)
+    b = qmc(f, ["x", "y", "z"], BOX, seed=5, points=256, max_points=256, block=64)
+    assert a.value == pytest.approx(b.value, rel=1e-14)
+    assert a.evaluations == 8 * 256
+
+def test_qmc_workers():
+    f = parse_to_func("x*y + z")
+    a = qmc(f, ["x", "y", "z"], BOX, seed=5, points=512, max_points=512, block=128)
+    b = qmc(f, ["x", "y", "z"], BOX, seed=5, points=512, max_points=512, block=128, workers=2)
+    assert a.value == pytest.approx(b.value, rel=1e-14)
+
+def test_core_integral_multiple_variables():
+    r = integral("x*y*z", {"x": 1, "y": 1, "z": 1}, bounds=BOX)
+    assert r.value == pytest.approx(9 / 2)
+    r = integral("x*y*z", ["x", "y", "z"], bounds=[(0, 1), (0, 2), (0, 3)], method="qmc", seed=1)
+    assert r.value == pytest.approx(9 / 2, rel=1e-3)
+    with pytest.raises(ValueError):
+        integral("x*y", ["x", "y"], bounds=[(0, 1), (0, 1)], method="simpson")
+    with pytest.raises(ValueError):
+        integral("x*y", ["x", "y"], bounds={"x": (0, 1), "y": (0, float("inf"))})
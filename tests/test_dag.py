@@ -0,0 +1,53 @@
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Add, Mul, Var, Constant, Pow
+
+def test_dag_dedupes_repeated_subtrees():
+    r2 = Add(Pow(Var("x"), 2), Pow(Var("y"), 2))
+    h = Add(Mul(r2, Var("a")), Pow(r2, 2), Mul(Var("b"), Add(Pow(Var("y"), 2), Pow(Var("x"), 2))))
+    dag = build_dag(h)
+    assert sum(1 for n in dag.nodes if n == r2) == 1
+    assert r2 in dag.shared()
+    assert sum(1 for n in dag.nodes if n == Var("x")) == 1
+
+def test_dag_is_topologically_ordered():
+    dag = build_dag(parse_to_func("(x + y)**2 * (x + y) + x"))
+    for i, arg_ids in enumerate(dag.args):
+        assert all(a < i for a in arg_ids)
+    assert dag.outputs == [len(dag) - 1]
+
+def test_dag_batch_shares_entries():
+    a = parse_to_func("x**2 + y**2")
+    b = parse_to_func("(x**2 + y**2) * z")
+    dag = build_dag([a, b])
+    assert dag.nodes[dag.outputs[0]] == a and dag.nodes[dag.outputs[1]] == b
+    assert dag.uses[dag.outputs[0]] == 2   # output of a, operand of b
+    assert len(dag) == len(build_dag(b))
+
+def test_dag_map_evaluates_each_entry_once():
+    calls = []
+    def visit(node, values):
+        calls.append(node)
+        if isinstance(node, Constant):
+            return node.value
+        if isinstance(node, Var):
+            return {"x": 3, "y": 4}[node.name]
+        if isinstance(node, Add):
+            return sum(values)
+        if isinstance(node, Mul):
+            out = 1
+            for v in values:
+                out *= v
+            return out
+        return values[0] ** values[1]
+    expr = parse_to_func("(x**2 + y**2) * (x**2 + y**2) + (x**2 + y**2)")
+    dag = build_dag(expr)
+    values = dag.map(visit)
+    assert values[dag.outputs[0]] == 25 * 25 + 25
+    assert len(calls) == len(dag) == len(set(calls))
+
+def test_dag_rejects_non_expr():
+    with pytest.raises(TypeError):
+        build_dag([Var("x"), "y"])
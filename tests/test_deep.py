@@ -0,0 +1,84 @@
+# Stress tests: very wide and very deep generated expressions must not hit RecursionError
+import ast
+import sys
+
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func, convert
+from mathphysicslib.core import derivative
+from mathphysicslib.dag import build_dag
+from mathphysicslib.expresso import Add, Mul, Pow, Var, Constant, variadic_flatten, intern
+from mathphysicslib.numeric import compile
+
+DEPTH = 5 * sys.getrecursionlimit()
+
+def test_wide_sum_parses_flat():
+    source = " + ".join(f"a{i}" for i in range(DEPTH))
+    expr = parse_to_func(source, cache=False)
+    assert isinstance(expr, Add) and len(expr.terms) == DEPTH
+
+def test_wide_product_with_constants():
+    source = "*".join(["2", "x"] * (DEPTH // 2))
+    expr = parse_to_func(source, cache=False)
+    assert isinstance(expr, Mul)
+    assert Constant(2 ** (DEPTH // 2)) in expr.factors
+
+def test_deep_parentheses():
+    source = "(" * DEPTH + "x + 1" + ")" * DEPTH
+    assert parse_to_func(source, cache=False) == Add(Var("x"), 1)
+
+def test_power_tower_parses_and_hashes():
+    source = "**".join(["x"] * DEPTH)
+    a = parse_to_func(source, cache=False)
+    b = parse_to_func(source, cache=False)
+    assert a is not b
+    assert hash(a) == hash(b) and a == b
+    assert a.key() is a.key()
+    depth = 0
+    node = a
+    while isinstance(node, Pow):
+        node = node.exponent
+        depth += 1
+    assert depth == DEPTH - 1
+
+def test_convert_deep_ast():
+    node = ast.Name(id="x", ctx=ast.Load())
+    for _ in range(DEPTH):
+        node = ast.BinOp(left=ast.Name(id="y", ctx=ast.Load()), op=ast.Pow(), right=node)
+    assert isinstance(convert(node), Pow)
+
+def test_pow_fold_left_tower():
+    expr = Var("x")
+    for _ in range(DEPTH):
+        expr = Pow(expr, 2)
+    folded = Pow.pow_fold(expr, 1)
+    assert folded is expr
+    folded = Pow.pow_fold(expr, 3)
+    assert folded == Pow(Var("x"), 3 * 2 ** DEPTH)
+
+def test_pow_fold_left_tower_symbolic_exponents():
+    expr = Var("x")
+    for i in range(DEPTH):
+        expr = Pow(expr, Var(f"n{i % 3}"))
+    assert Pow.pow_fold(expr, Var("m")) == Pow(expr, Var("m"))
+
+def test_variadic_flatten_wide():
+    terms = [Var(f"v{i}") for i in range(DEPTH)]
+    expr = Add(*terms)
+    assert variadic_flatten(expr, Add) == expr
+
+def test_intern_deep_tree():
+    expr = parse_to_func("**".join(["x"] * DEPTH), cache=False)
+    assert intern(expr) == expr
+
+def test_dag_derivative_and_compile_deep_product():
+    source = " + ".join(f"x*y**{i % 7 + 1}" for i in range(DEPTH))
+    expr = parse_to_func(source, cache=False)
+    assert len(build_dag(expr)) == 26   # x, y, 7 exponents, 7 powers, 7 collected products, 2 counts, the sum
+    d = derivative(expr, "x")
+    f = compile(d, ["y"], backend="math")
+    assert f(1.0) == DEPTH
+
+def test_malformed_deep_input_is_a_syntax_error():
+    with pytest.raises(SyntaxError):
+        parse_to_func("(" * DEPTH + "x", cache=False)
@@ -1,8 +1,9 @@
 import pytest
 
 
-from mathphysicslib.expresso import Add, Mul, Var, Constant, Pow, variadic_field
+from mathphysicslib.expresso import Add, Mul, Var, Constant, Pow, Func, variadic_field, children
 from mathphysicslib.expresso import constant_conversion, variadic_flatten
+from mathphysicslib.expresso import interning, intern, intern_table_size
 
 def test_constant_conversion():
     c1 = constant_conversion(3)
@@ -137,4 +138,137 @@ def test_pow_equality():
 
 def test_variadic_registry():
     assert variadic_field.get(Add) == "terms"
-    assert variadic_field.get(Mul) == "factors"
\ No newline at end of file
+    assert variadic_field.get(Mul) == "factors"
+
+def test_key_is_cached_at_construction():
+    x, y = Var("x"), Var("y")
+    expr = Add(Mul(x, y), Pow(x, 2))
+    assert expr.key() is expr.key()
+    # parent keys reuse the children's cached key objects
+    assert Pow(x, 2).key()[1] is x.key()
+
+def test_hash_matches_equality():
+    x, y = Var("x"), Var("y")
+    a = Add(Mul(2, x, y), Pow(y, 3), 1)
+    b = Add(1, Pow(Var("y"), 3), Mul(y, x, 2))
+    assert a == b and hash(a) == hash(b)
+    assert len({a, b}) == 1
+    assert Constant(2.0) == Constant(2) and hash(Constant(2.0)) == hash(Constant(2))
+
+def test_deep_tree_as_dict_key():
+    x = Var("x")
+    expr = x
+    for i in range(200):
+        expr = Add(Mul(expr, i + 2), Pow(x, i + 1))
+    table = {expr: "deep"}
+    assert table[expr] == "deep"
+
+def test_non_expression_operand_has_no_key():
+    expr = Mul(3, "x")
+    with pytest.raises(TypeError):
+        expr.key()
+
+def test_interning_is_opt_in():
+    assert Var("x") is not Var("x")
+    with interning():
+        assert Var("x") is Var("x")
+        assert Add(Var("x"), Var("y"), 1) is Add(1, Var("y"), Var("x"))
+        assert Pow(Var("x"), 2) is Pow(Var("x"), 2)
+    assert Var("x") is not Var("x")
+
+def test_interning_shares_subtrees():
+    with interning():
+        a = Mul(Add(Var("x"), Var("y")), Var("z"))
+        b = Pow(Add(Var("y"), Var("x")), 3)
+    assert a.factors[0] is b.base
+
+def test_interning_keeps_constant_types():
+    with interning():
+        a, b = Constant(2), Constant(2.0)
+    assert a is not b and a == b
+    assert type(b.value) is float
+
+def test_interning_keeps_constant_types_inside_composites():
+    with interning():
+        a, b = Pow(Var("x"), 2), Pow(Var("x"), 2.0)
+        c, d = Add(Var("x"), 2), Add(2.0, Var("x"))
+        assert Pow(Var("x"), 2.0) is b
+    assert a is not b and a == b
+    assert type(a.exponent.value) is int and type(b.exponent.value) is float
+    assert c is not d and type(d.terms[-1].value) is float
+    assert type(intern(Pow(Var("x"), 2.0)).exponent.value) is float
+
+def test_intern_existing_tree():
+    x = Var("x")
+    a = Add(Mul(x, 2), Pow(x, 3))
+    b = Add(Pow(Var("x"), 3), Mul(2, Var("x")))
+    ia, ib = intern(a), intern(b)
+    assert ia is ib and ia == a
+    assert intern(x) is ia.terms[0].factors[0]
+
+def test_intern_table_is_weak():
+    import gc
+    with interning():
+        node = Pow(Var("weak_only"), 7)
+    before = intern_table_size()
+    del node
+    gc.collect()
+    assert intern_table_size() < before
+
+def test_nodes_are_slotted_and_immutable():
+    x = Var("x")
+    nodes = [Constant(1), x, Add(x, 1), Mul(x, 2), Pow(x, 3)]
+    for node in nodes:
+        assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        x.name = "y"
+    with pytest.raises(AttributeError):
+        Add(x, 1).terms = ()
+    with pytest.raises(AttributeError):
+        del Pow(x, 3).base
+    assert isinstance(Add(x, 1).terms, tuple)
+    assert isinstance(Mul(x, 2).factors, tuple)
+
+def test_nodes_pickle_and_copy():
+    import copy
+    import pickle
+    x, y = Var("x"), Var("y")
+    expr = Add(Mul(x, y, 3), Pow(x, 2.5), 1)
+    assert pickle.loads(pickle.dumps(expr)) == expr
+    assert copy.copy(expr) is expr
+    assert copy.deepcopy(expr) is expr
+
+def test_add_collects_like_terms():
+    x, y = Var("x"), Var("y")
+    assert Add.add_fold(x, x, x) == Mul(x, 3)
+    assert Add.add_fold(Mul(x, y, 2), Mul(y, x, 3)) == Mul(x, y, 5)
+    assert Add.add_fold(x, Mul(x, -1), 4) == Constant(4)
+    assert Add(x, y, Mul(x, 2)) == Add(Mul(x, 3), y)
+    assert Add.add_fold(Mul(x, y), Mul(x, y, 2)) == Mul(x, y, 3)
+
+def test_add_keeps_unrepeated_terms_as_is():
+    x, y = Var("x"), Var("y")
+    term = Mul(x, y, 2)
+    assert Add(term, x).terms[0] is term
+
+def test_mul_collects_equal_bases():
+    x, y = Var("x"), Var("y")
+    assert Mul.mul_fold(x, x, x) == Pow(x, 3)
+    assert Mul.mul_fold(x, Pow(x, -1)) == Constant(1)
+    assert Mul(x, y, Pow(x, 2), 5) == Mul(Pow(x, 3), y, 5)
+    assert Mul.mul_fold(Pow(x, y), Pow(x, 2)) == Pow(x, Add(y, 2))
+
+def test_func_node():
+    x = Var("x")
+    f = Func("sin", x)
+    assert f == Func("sin", Var("x")) and hash(f) == hash(Func("sin", Var("x")))
+    assert f != Func("cos", x)
+    assert repr(f) == "sin(x)"
+    assert children(f) == (x,)
+    with pytest.raises(ValueError):
+        Func("sqrt", x)
+
+def test_func_fold_exact_values():
+    assert Func.func_fold("cos", Constant(0)) == Constant(1)
+    assert Func.func_fold("log", Constant(1)) == Constant(0)
+    assert isinstance(Func.func_fold("sin", Constant(1)), Func)
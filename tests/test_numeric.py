@@ -0,0 +1,130 @@
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Add, Mul, Var, Constant, Pow
+from mathphysicslib.numeric import compile
+
+def test_math_backend_scalars():
+    f = compile(parse_to_func("x**2 + 3*x*y + 1"), ["x", "y"], backend="math")
+    assert f(2, 5) == 2**2 + 3*2*5 + 1
+    assert f.variables == ("x", "y")
+
+def test_math_backend_rejects_out():
+    f = compile(Var("x"), ["x"], backend="math")
+    with pytest.raises(TypeError):
+        f(1.0, out=[0.0])
+
+def test_variables_accept_var_nodes():
+    f = compile(Mul(Var("x"), 2), [Var("x")], backend="math")
+    assert f(4) == 8
+
+def test_missing_variable():
+    with pytest.raises(ValueError) as e:
+        compile(Add(Var("x"), Var("z")), ["x"])
+    assert str(e.value) == "expression uses variables not listed: z"
+
+def test_bad_inputs():
+    with pytest.raises(TypeError):
+        compile("x + 1", ["x"])
+    with pytest.raises(TypeError):
+        compile(Mul(3, "x"), ["x"])
+    with pytest.raises(ValueError):
+        compile(Var("x"), ["x"], backend="fortran")
+    with pytest.raises(ValueError):
+        compile(Var("x"), ["x", "x"])
+
+def test_numpy_matches_math_backend():
+    np = pytest.importorskip("numpy")
+    expr = parse_to_func("x**3 + 2*x*y**2 + y**0.5 + 7")
+    xs = np.linspace(-2, 2, 11)
+    ys = np.linspace(0, 4, 11)
+    vec = compile(expr, ["x", "y"], backend="numpy")
+    scalar = compile(expr, ["x", "y"], backend="math")
+    expected = [scalar(float(a), float(b)) for a, b in zip(xs, ys)]
+    assert np.allclose(vec(xs, ys), expected)
+
+def test_numpy_broadcasting_and_out():
+    np = pytest.importorskip("numpy")
+    f = compile(parse_to_func("x*y + x + y"), ["x", "y"])
+    x = np.arange(3.0)[:, None]
+    y = np.arange(4.0)[None, :]
+    assert f(x, y).shape == (3, 4)
+    buf = np.empty((3, 4))
+    assert f(x, y, out=buf) is buf
+    assert np.allclose(buf, x*y + x + y)
+
+def test_numpy_does_not_modify_inputs():
+    np = pytest.importorskip("numpy")
+    x = np.arange(5.0)
+    f = compile(Add(Var("x"), 1), ["x"])
+    g = compile(Var("x"), ["x"])
+    f(x)
+    out = g(x)
+    out += 1
+    assert np.array_equal(x, np.arange(5.0))
+
+def test_numpy_constant_expression_fills_shape():
+    np = pytest.importorskip("numpy")
+    f = compile(Pow(Constant(2), Constant(0.5)), ["x"])
+    assert np.allclose(f(np.zeros(4)), np.full(4, 2**0.5))
+    buf = np.zeros(4)
+    assert f(np.zeros(4), out=buf) is buf and np.allclose(buf, 2**0.5)
+
+def test_batch_compile_returns_tuple():
+    f = compile([parse_to_func("x + y"), parse_to_func("x * y")], ["x", "y"], backend="math")
+    assert f(2, 3) == (5, 6)
+    with pytest.raises(ValueError):
+        compile([], ["x"])
+
+def test_compile_computes_shared_subexpressions_once():
+    pytest.importorskip("numpy")
+    r2 = parse_to_func("x**2 + y**2")
+    h = Add(Mul(r2, Var("a")), Pow(r2, 2), Mul(Var("b"), r2))
+    f = compile(h, ["x", "y", "a", "b"])
+    assert f.source.count("np.power") == 3   # x**2, y**2, r2**2
+    g = compile(h, ["x", "y", "a", "b"], backend="math")
+    assert g(1.0, 2.0, 3.0, 4.0) == 5 * 3 + 25 + 4 * 5
+
+def test_numpy_batch_out_buffers():
+    np = pytest.importorskip("numpy")
+    a = parse_to_func("x**2 + y**2")
+    b = Mul(a, Var("x"))
+    f = compile([a, b, a], ["x", "y"])
+    x, y = np.arange(4.0), np.ones(4)
+    bufs = (np.empty(4), np.empty(4), np.empty(4))
+    ra, rb, ra2 = f(x, y, out=bufs)
+    assert ra is bufs[0] and rb is bufs[1] and ra2 is bufs[2]
+    assert np.allclose(ra, x**2 + 1) and np.allclose(rb, (x**2 + 1) * x)
+    assert np.allclose(ra2, ra)
+    fresh = f(x, y)
+    assert np.allclose(fresh[1], rb) and fresh[0] is not fresh[2]
+
+def test_numpy_small_integer_powers_multiply():
+    np = pytest.importorskip("numpy")
+    f = compile(parse_to_func("x**3 + x**4*y + x**13"), ["x", "y"])
+    assert "np.power" not in f.source
+    x = np.linspace(-2, 2, 9)
+    assert np.allclose(f(x, 2.0), x**3 + 2 * x**4 + x**13, rtol=1e-14)
+    buf = np.empty(9)
+    g = compile(parse_to_func("x**5"), ["x"])
+    assert g(x, out=buf) is buf and np.allclose(buf, x**5, rtol=1e-14)
+
+def test_numpy_scalar_inputs():
+    np = pytest.importorskip("numpy")
+    f = compile(parse_to_func("x*y*2 + x**3"), ["x", "y"], backend="numpy")
+    assert f(2.0, 3.0) == 20.0
+    buf = np.zeros(())
+    assert f(2.0, 3.0, out=buf) is buf and buf == 20.0
+    g = compile([parse_to_func("x*y*2"), parse_to_func("x**4")], ["x", "y"], backend="numpy")
+    assert g(2.0, 3.0) == (12.0, 16.0)
+
+def test_elementary_functions_on_both_backends():
+    import math
+    expr = parse_to_func("sin(x)*exp(-y) + atan(x*y) - sqrt(y)")
+    f = compile(expr, ["x", "y"], backend="math")
+    expected = math.sin(0.3) * math.exp(-2.0) + math.atan(0.6) - math.sqrt(2.0)
+    assert f(0.3, 2.0) == pytest.approx(expected, rel=1e-12)
+    np = pytest.importorskip("numpy")
+    g = compile(expr, ["x", "y"], backend="numpy")
+    xs = np.linspace(-1, 1, 5)
+    assert np.allclose(g(xs, 2.0), [f(float(v), 2.0) for v in xs])
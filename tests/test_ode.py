@@ -0,0 +1,90 @@
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mathphysicslib.expresso import Mul, Var
+from mathphysicslib.ode import ODESystem, Step, trajectory, solve
+
+def oscillator(k=4.0):
+    # x'' = -k x
+    return ODESystem({"x": "v", "v": Mul(-1, Var("k"), Var("x"))}, params={"k": k})
+
+def test_system_evaluates_batches():
+    system = oscillator()
+    y = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert system(0.0, y).tolist() == [[3.0, 4.0], [-4.0, -8.0]]
+    assert system.state == ("x", "v")
+
+def test_system_validation():
+    with pytest.raises(ValueError):
+        ODESystem(["v"], state=["x", "v"])
+    with pytest.raises(ValueError):
+        ODESystem({"x": "t"}, time="x")
+    with pytest.raises(ValueError):
+        ODESystem({"x": "y"})   # y is neither state, time nor a param
+
+@pytest.mark.parametrize("method", ["rk45", "dop853", "gbs8"])
+def test_adaptive_methods_match_exact_solution(method):
+    y = solve(oscillator(), [1.0, 0.0], (0, 10), method=method, rtol=1e-10, atol=1e-12)
+    assert y == pytest.approx([math.cos(20), -2 * math.sin(20)], abs=1e-7)
+
+def test_dop853_takes_far_fewer_steps_at_tight_tolerance():
+    steps = {m: sum(1 for _ in trajectory(oscillator(), [1.0, 0.0], (0, 10), method=m,
+                                          rtol=1e-11, atol=1e-13))
+             for m in ("rk45", "dop853")}
+    assert steps["dop853"] * 5 < steps["rk45"]
+    y0 = np.array([[1.0, 0.0], [0.5, 1.0]])
+    batch = solve(oscillator(), y0, (0, 3), method="dop853", rtol=1e-11)
+    assert batch[:, 0] == pytest.approx([math.cos(6.0), 0.5 * math.cos(6.0) + 0.5 * math.sin(6.0)], abs=1e-9)
+
+def test_time_dependent_and_backward():
+    system = ODESystem({"y": "t**2"})
+    assert solve(system, [0.0], (0, 3))[0] == pytest.approx(9.0)
+    assert solve(system, [9.0], (3, 0))[0] == pytest.approx(0.0, abs=1e-9)
+
+def test_trajectory_streams_steps_and_lands_on_t_eval():
+    steps = trajectory(oscillator(), [1.0, 0.0], (0, 1))
+    first = next(steps)
+    assert isinstance(first, Step) and first.t == 0 and first.y.tolist() == [1.0, 0.0]
+    times = [s.t for s in steps]
+    assert times[-1] == 1.0 and times == sorted(times)
+    out = list(trajectory(oscillator(), [1.0, 0.0], (0, 1), t_eval=[0.25, 0.5, 1.0]))
+    assert [s.t for s in out] == [0.25, 0.5, 1.0]
+    assert out[1].y[0] == pytest.approx(math.cos(1.0), abs=1e-6)
+    with pytest.raises(ValueError):
+        list(trajectory(oscillator(), [1.0, 0.0], (0, 1), t_eval=[0.5, 0.25]))
+
+def test_batch_lockstep_matches_single_runs():
+    y0 = np.stack([np.linspace(0.1, 1.0, 50), np.zeros(50)], axis=1)
+    batch = solve(oscillator(), y0, (0, 2), rtol=1e-9)
+    assert batch.shape == (50, 2)
+    assert np.allclose(batch[:, 0], y0[:, 0] * np.cos(4.0), atol=1e-7)
+    # per-trajectory parameters fan a single initial state out into a batch
+    k = np.array([1.0, 4.0, 9.0])
+    fan = solve(oscillator(k), [1.0, 0.0], (0, 1), rtol=1e-9)
+    assert np.allclose(fan[:, 0], np.cos(np.sqrt(k)), atol=1e-7)
+
+def test_hamiltonian_equations_and_verlet():
+    system = ODESystem.hamiltonian("c*p**2 + k*q**2", ["q"], ["p"], params={"c": 0.5, "k": 0.5})
+    assert system.rhs == (Mul(Var("c"), Var("p"), 2), Mul(Var("k"), Var("q"), -2))
+    energy = lambda y: 0.5 * y[1] ** 2 + 0.5 * y[0] ** 2
+    drift = max(abs(energy(y) - 0.5) for _, y in
+                trajectory(system, [1.0, 0.0], (0, 200), method="verlet", step=0.05))
+    assert drift < 0.05 ** 2 / 4   # bounded, no secular growth
+    y = solve(system, [1.0, 0.0], (0, 1), method="verlet", step=1e-3)
+    assert y == pytest.approx([math.cos(1.0), -math.sin(1.0)], abs=1e-6)
+
+def test_verlet_requires_separable_hamiltonian_and_step():
+    coupled = ODESystem.hamiltonian("p**2*q**2 + q**2", ["q"], ["p"])
+    with pytest.raises(ValueError):
+        solve(coupled, [1.0, 0.5], (0, 1), method="verlet", step=0.1)
+    with pytest.raises(ValueError):
+        solve(oscillator(), [1.0, 0.0], (0, 1), method="verlet", step=0.1)
+    separable = ODESystem.hamiltonian("p**2 + q**2", ["q"], ["p"])
+    with pytest.raises(ValueError):
+        solve(separable, [1.0, 0.0], (0, 1), method="verlet")
+
+def test_max_steps():
+    with pytest.raises(RuntimeError):
+        solve(oscillator(), [1.0, 0.0], (0, 100), max_steps=10)
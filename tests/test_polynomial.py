@@ -0,0 +1,62 @@
+import pytest
+from fractions import Fraction
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Constant, Var, Add, Mul, Pow
+from mathphysicslib.polynomial import Poly, expand
+
+def test_from_expr_expands_products_and_powers():
+    p = Poly.from_expr(parse_to_func("(x + y + 1)**3"))
+    assert p.gens == ("x", "y")
+    assert len(p) == 10
+    assert p.terms[(2, 1)] == 3
+    assert p.terms[(1, 1)] == 6
+    assert p.degree() == 3 and p.degree("y") == 3
+
+def test_round_trip_through_expressions():
+    p = Poly.from_expr(parse_to_func("(x + y + z + 1)**6"))
+    assert Poly.from_expr(p.to_expr()) == p
+
+def test_round_trip_keeps_int_and_float_coefficients_apart():
+    x, y = Var("x"), Var("y")
+    for expr in (Add(Mul(x, 2), Mul(y, 2.0)), Add(Mul(y, 2.0), Mul(x, 2))):
+        p = Poly.from_expr(expr)
+        assert type(p.terms[(1, 0)]) is int and type(p.terms[(0, 1)]) is float
+        back = Poly.from_expr(p.to_expr())
+        assert {e: type(c) for e, c in back.terms.items()} == {(1, 0): int, (0, 1): float}
+
+def test_large_power_term_count_and_coefficients():
+    p = Poly.from_expr(parse_to_func("(x + y + z + 1)**20"))
+    assert len(p) == 1771                           # C(23, 3) monomials
+    assert p.terms[(20, 0, 0)] == 1
+    assert p.terms[(1, 1, 1)] == 20 * 19 * 18      # multinomial 20! / (1! 1! 1! 17!)
+
+def test_cancellation_and_arithmetic():
+    x, y = Poly.var("x"), Poly.var("y")
+    assert ((x + y) * (x - y)) == x ** 2 - y ** 2
+    assert (x - x).is_zero()
+    assert (x + 1) - 1 == x
+    assert 2 * x + 3 == Poly.from_expr(Add(Mul(Var("x"), 2), 3))
+
+def test_exact_rational_coefficients():
+    p = (Poly.var("x") + 1) / 3
+    assert p.terms[(1,)] == Fraction(1, 3)
+    assert (p * 3).terms == {(1,): 1, (0,): 1}
+    assert isinstance((p * 3).terms[(1,)], int)
+    half = Poly.from_expr(Mul(Pow(Constant(2), Constant(-1)), Var("x")))
+    assert half.terms == {(1,): Fraction(1, 2)}
+
+def test_expand():
+    assert expand(parse_to_func("(x + 1)**2")) == Add(Pow(Var("x"), 2), Mul(Var("x"), 2), 1)
+    assert expand(parse_to_func("(x + 1)*(x + 1) + 0*y")) == expand(parse_to_func("x**2 + 2*x + 1"))
+
+def test_non_polynomials_raise():
+    x = Var("x")
+    with pytest.raises(ValueError):
+        Poly.from_expr(Pow(x, -1))
+    with pytest.raises(ValueError):
+        Poly.from_expr(Pow(x, Var("n")))
+    with pytest.raises(ValueError):
+        Poly.var("x") ** -2
+    with pytest.raises(TypeError):
+        Poly.from_expr("x + 1")
@@ -0,0 +1,81 @@
+import io
+import json
+
+import mathphysicslib
+from mathphysicslib import ast_parser
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.core import derivative
+from mathphysicslib.expresso import ExprMeta, Constant, Var, Add, Mul, Pow
+
+def test_counts_allocations_per_node_type():
+    with mathphysicslib.profile() as stats:
+        x = Var("x")
+        Add(Mul(x, 2), Pow(x, 3))
+    assert stats["alloc.Var"] == 1
+    assert stats["alloc.Add"] == 1 and stats["alloc.Mul"] == 1 and stats["alloc.Pow"] == 1
+    assert stats.total("alloc.") >= 4
+
+def test_counts_folds_and_keys():
+    x = Var("x")
+    with mathphysicslib.profile() as stats:
+        Pow.pow_fold(x, 1)
+        Pow.pow_fold(x, Var("n"))
+        Add.add_fold(x)
+        Add(x, 2, 3)
+        Add(x, Mul(x, 2))
+        Mul(x, x)
+        assert Add(x, 1) == Add(1, x)
+    assert stats["fold.pow_fold"] == 3              # x*x folds through pow_fold as well
+    assert stats["fold.pow_fold.reduced"] == 1
+    assert stats["fold.add_fold.reduced"] == 1
+    assert stats["fold.constants.Add"] == 1
+    assert stats["fold.like_terms"] == 1 and stats["fold.like_factors"] == 1
+    assert stats["key.compute.Add"] > 0
+    assert stats["key.compare"] >= 1
+
+def test_counts_nested_constant_folds_and_every_key():
+    x = Var("x")
+    inner_sum, inner_product = Add(x, 1), Mul(x, 3)
+    with mathphysicslib.profile() as stats:
+        Add(inner_sum, 2)          # 1 + 2, with the 1 flattened from the inner sum
+        Mul(inner_product, 2)      # likewise 3 * 2
+        Mul(x, 0)
+        Pow(x, 2)
+    assert stats["fold.constants.Add"] == 1
+    assert stats["fold.constants.Mul"] == 2
+    assert stats["key.compute.Pow"] == 1
+    assert stats["key.compute.Constant"] >= 3   # at least the folded 3, 6 and 0
+
+def test_parse_timing_and_cache_counts():
+    ast_parser.clear_parse_cache()
+    with mathphysicslib.profile() as stats:
+        parse_to_func("x**2 + 3*y")
+        parse_to_func("x**2 + 3*y")
+        parse_to_func("x + 1", cache=False)
+    assert stats["parse.calls"] == 2
+    assert stats["parse.cache_hits"] == 1 and stats["parse.cache_misses"] == 1
+    assert stats.timings["parse"] > 0
+
+def test_instrumentation_is_removed_afterwards():
+    call = ExprMeta.__dict__["__call__"]
+    pow_fold = Pow.__dict__["pow_fold"]
+    with mathphysicslib.profile() as outer:
+        with mathphysicslib.profile() as inner:
+            Var("a")
+        Var("b")
+    assert ExprMeta.__dict__["__call__"] is call
+    assert Pow.__dict__["pow_fold"] is pow_fold
+    assert inner["alloc.Var"] == 1 and outer["alloc.Var"] == 2
+    Var("c")
+    assert outer["alloc.Var"] == 2
+
+def test_report_and_dump():
+    with mathphysicslib.profile() as stats:
+        derivative("x**3*y + y**2", "x", 2)
+    text = stats.report()
+    assert "alloc:" in text and "alloc.Mul" in text
+    buffer = io.StringIO()
+    stats.dump(buffer)
+    data = json.loads(buffer.getvalue())
+    assert data["counts"]["alloc.Mul"] == stats["alloc.Mul"]
+    assert "parse" in data["timings"]
@@ -0,0 +1,71 @@
+import math
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Pow, Var
+from mathphysicslib.quadrature import quad
+
+INF = float("inf")
+
+def test_polynomial_is_exact():
+    r = quad(parse_to_func("x**2 + 3*x"), "x", (0, 2))
+    assert r.value == pytest.approx(8 / 3 + 6, rel=1e-14)
+    assert r.error < 1e-12
+    assert r.evaluations == 15
+
+def test_reversed_and_empty_bounds():
+    f = parse_to_func("x**2")
+    assert quad(f, "x", (1, 0)).value == pytest.approx(-1 / 3)
+    assert quad(f, "x", (2, 2)).value == 0
+
+def test_infinite_bounds():
+    f = Pow(parse_to_func("1 + x**2"), -1)
+    assert quad(f, "x", (-INF, INF)).value == pytest.approx(math.pi, rel=1e-10)
+    assert quad(f, "x", (0, INF)).value == pytest.approx(math.pi / 2, rel=1e-10)
+    assert quad(f, Var("x"), (-INF, 0)).value == pytest.approx(math.pi / 2, rel=1e-10)
+
+def test_endpoint_singularity_within_tolerance():
+    r = quad(Pow(Var("x"), -0.5), "x", (0, 1))
+    assert abs(r.value - 2) <= max(r.error, 1e-7)
+
+def test_scalar_params():
+    r = quad(parse_to_func("k*x**2"), "x", (0, 1), params={"k": 3})
+    assert r.value == pytest.approx(1.0)
+
+def test_parameter_named_like_variable_rejected():
+    with pytest.raises(ValueError):
+        quad(parse_to_func("x"), "x", (0, 1), params={"x": 1})
+
+def test_many_integrals_broadcast():
+    np = pytest.importorskip("numpy")
+    upper = np.linspace(0.5, 2.0, 1000)
+    k = np.arange(1000) % 5
+    r = quad(parse_to_func("x**k"), "x", (0, upper), params={"k": k})
+    assert r.value.shape == (1000,)
+    assert np.allclose(r.value, upper ** (k + 1) / (k + 1), rtol=1e-12)
+    assert np.all(r.error < 1e-8)
+
+def test_broadcast_shape_of_bounds_and_params():
+    np = pytest.importorskip("numpy")
+    k = np.array([[1.0], [2.0]])
+    r = quad(parse_to_func("k*x"), "x", (0, [1.0, 2.0, 3.0]), params={"k": k})
+    assert r.value.shape == (2, 3)
+    assert np.allclose(r.value, k * np.array([1.0, 2.0, 3.0]) ** 2 / 2)
+
+def test_converged_integrals_stop_early():
+    np = pytest.importorskip("numpy")
+    # the polynomial integrals finish in one round; only the singular one keeps refining
+    f = Pow(Var("x"), parse_to_func("k"))
+    r = quad(f, "x", (0, 1), params={"k": np.array([2.0, 3.0, -0.5])})
+    alone = quad(f, "x", (0, 1), params={"k": -0.5})
+    assert r.evaluations == alone.evaluations + 2 * 15
+
+def test_tolerance_below_roundoff_returns_best_estimate():
+    # the roundoff floor of this integral is about 7e-13: no interval can meet 1e-13
+    exact = 1 - math.cos(100)
+    r = quad(parse_to_func("sin(x)"), "x", (0, 100), abs_tol=1e-13, rel_tol=1e-13)
+    assert abs(r.value - exact) <= r.error
+    assert r.error > 1e-13
+    assert r.evaluations <= 15 * (2 * 50 + 1)
+    capped = quad(parse_to_func("sin(x)"), "x", (0, 100), abs_tol=1e-13, rel_tol=1e-13, limit=4)
+    assert capped.evaluations <= 15 * (2 * 4 + 1) and capped.error > abs(capped.value - exact)
@@ -0,0 +1,144 @@
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Constant, Var, Add, Mul, Pow, Func
+from mathphysicslib.rewrite import RuleSet, Rule, P, Wild, match, subs, partial_eval
+from mathphysicslib.rules import POWER_RULES, power_rule
+
+def identities():
+    return RuleSet([
+        Rule("pow-one", P(Pow, Wild("b"), 1), lambda b: b),
+        Rule("pow-zero", P(Pow, Wild("b"), 0), lambda b: Constant(1)),
+        Rule("self-power", P(Pow, Wild("a"), Wild("a")), lambda a: Mul.mul_fold(a, 2)),
+        Rule("scaled-sum", P(Mul, Wild("rest", many=True), Wild("c", Constant, lambda c: c.value == 1)),
+             lambda rest, c: Mul.mul_fold(*rest)),
+    ])
+
+def test_match_binds_wildcards():
+    x, y = Var("x"), Var("y")
+    assert match(P(Pow, Wild("b"), Wild("e", Constant)), Pow(x, 3)) == {"b": x, "e": Constant(3)}
+    assert match(P(Pow, Wild("b"), Wild("e", Constant)), Pow(x, y)) is None
+    assert match(P(Pow, Wild("a"), Wild("a")), Pow(x, x)) == {"a": x}
+    assert match(P(Pow, Wild("a"), Wild("a")), Pow(x, y)) is None
+    assert match(P(Add, Wild("head"), Wild("rest", many=True)), Add(x, y, 2)) == {"head": x, "rest": (y, Constant(2))}
+    assert match(P(Mul, Wild("rest", many=True), Wild("c", Constant)), Mul(x, y, 2)) == {"rest": (x, y), "c": Constant(2)}
+
+def test_index_only_offers_fitting_rules():
+    rules = identities()
+    x = Var("x")
+    assert [r.name for r in rules.candidates(Pow(x, 1))] == ["pow-one", "self-power"]
+    assert [r.name for r in rules.candidates(Pow(x, Var("y")))] == ["self-power"]
+    assert [r.name for r in rules.candidates(Add(x, 1))] == []
+    assert [r.name for r in rules.candidates(Mul(x, 3))] == ["scaled-sum"]
+
+def test_apply_and_hit_counters():
+    rules = identities()
+    x = Var("x")
+    assert rules.apply(Pow(x, 1)) == x
+    assert rules.apply(Pow(x, Var("y"))) is None
+    assert rules.apply(Mul(x, 3)) is None            # guard declined
+    assert rules.stats()["pow-one"] == 1
+    rules.apply(Pow(x, 1))                           # applied again: apply() does not memoize
+    assert rules.stats()["pow-one"] == 2
+    rules.reset_stats()
+    assert set(rules.stats().values()) == {0}
+
+def test_rewrite_bottom_up_to_fixpoint():
+    rules = identities()
+    x, y = Var("x"), Var("y")
+    expr = Add(Pow(Pow(x, 1), 1), Pow(Pow(y, 0), 1), Pow(Pow(x, 1), Pow(x, 1)))
+    assert rules.rewrite(expr) == Add.add_fold(Mul(x, 3), 1)
+    assert rules.stats()["pow-one"] == 1             # x**1 is rewritten once, however often it occurs
+    hits = rules.stats()
+    assert rules.rewrite(expr) == Add.add_fold(Mul(x, 3), 1)
+    assert rules.stats() == hits                     # second call served from the memo
+
+def test_rewrite_cycle_raises():
+    x = Var("x")
+    rules = RuleSet([Rule("swap", P(Pow, Wild("a"), Wild("b", Var)), lambda a, b: Pow(b, a))])
+    with pytest.raises(ValueError):
+        rules.rewrite(Pow(x, Var("y")))
+
+def test_many_wildcard_position_is_checked():
+    with pytest.raises(ValueError):
+        P(Add, Wild("a"), Wild("rest", many=True), Wild("b"))
+    with pytest.raises(ValueError):
+        P(Pow, Wild("b"), Wild("rest", many=True))
+
+def test_power_rule_is_declarative():
+    x, n = Var("x"), Var("n")
+    assert power_rule(Constant(2), x) == Constant(0)
+    assert power_rule(x, Constant(3)) == Mul(Constant(3), Pow(x, 2))
+    assert power_rule(x, n) == Mul.mul_fold(n, Pow.pow_fold(x, Add.add_fold(n, -1)))
+    assert {"power-constant-base", "power-constant-exponent", "power"} <= set(POWER_RULES.stats())
+
+def test_subs_replaces_and_folds():
+    e = parse_to_func("m*g*h + m*v**2 + (x + y)**2")
+    assert subs(e, {"m": 2}) == parse_to_func("2*g*h + 2*v**2 + (x + y)**2")
+    assert subs(e, {Var("m"): 0, "x": Var("y")}) == Pow(Mul(Var("y"), 2), 2)
+    assert subs(Pow(Var("x"), 3), {"x": 2}) == Constant(8)
+
+def test_subs_keeps_untouched_subtrees():
+    e = parse_to_func("m*g*h + m*v**2 + (x + y)**2")
+    assert subs(e, {"z": 1}) is e
+    assert subs(e, {"m": 2}).terms[-1] is e.terms[-1]
+
+def test_subs_is_simultaneous_and_structural():
+    x, y = Var("x"), Var("y")
+    assert subs(Add(x, Mul(y, 2)), {"x": y, "y": x}) == Add(y, Mul(x, 2))
+    assert subs(parse_to_func("(x + y)**2 + x"), {Add(x, y): Var("u")}) == Add(Pow(Var("u"), 2), x)
+    with pytest.raises(TypeError):
+        subs(x, {"x": "y"})
+    with pytest.raises(TypeError):
+        subs(x, {3: x})
+
+def test_subs_deep_tree():
+    e = Var("x")
+    for _ in range(5000):
+        e = Pow(Add(e, Var("y")), Var("k"))
+    result = subs(e, {"y": 1})
+    for _ in range(5000):
+        assert result.exponent == Var("k") and result.base.terms[-1] == Constant(1)
+        result = result.base.terms[0]
+    assert result == Var("x")
+
+def test_partial_eval():
+    e = parse_to_func("m*g*h + m*v**2")
+    assert partial_eval(e, {"m": 2, "g": 9.81}) == Add(Mul(Var("h"), 19.62), Mul(Pow(Var("v"), 2), 2))
+    assert partial_eval(Pow(Var("x"), 0.5), {"x": 2.0}) == Constant(2.0 ** 0.5)
+    assert partial_eval(Pow(2, Constant(-1)), {}) == Constant(0.5)
+    assert partial_eval(Pow(Var("x"), 0.5), {"x": -1}) == Pow(-1, 0.5)   # no real value
+    with pytest.raises(TypeError):
+        partial_eval(e, {"m": Var("k")})
+    with pytest.raises(ValueError):
+        partial_eval(Pow(Var("x"), -1), {"x": 0})
+
+def test_power_rule_keeps_exponent_types_whatever_came_before():
+    from fractions import Fraction
+    x = Var("x")
+    cases = [(3, 2, int), (3.0, 2.0, float), (Fraction(3), Fraction(2), Fraction),
+             (0.5, -0.5, float), (Fraction(1, 2), Fraction(-1, 2), Fraction)]
+    for _ in range(2):
+        for exponent, lowered, kind in cases:
+            d = power_rule(x, Constant(exponent))
+            assert d == Mul(Constant(exponent), Pow(x, Constant(lowered)))
+            coefficient = next(f for f in d.factors if isinstance(f, Constant))
+            power = next(f for f in d.factors if isinstance(f, Pow))
+            assert type(coefficient.value) is kind and type(power.exponent.value) is kind
+
+def test_rewrite_memo_keeps_constant_types():
+    # 0.5 and 1/2 share a structural key; a memo hit must not swap one for the other
+    from fractions import Fraction
+    rules = identities()
+    assert rules.rewrite(Mul(Var("x"), 0.5)) == Mul(Var("x"), 0.5)
+    result = rules.rewrite(Add(Var("y"), Constant(Fraction(1, 2))))
+    assert type(result.terms[-1].value) is Fraction
+
+def test_partial_eval_functions():
+    import math
+    e = parse_to_func("sin(k*x) + exp(k)")
+    assert partial_eval(e, {"k": 0}) == Constant(1)   # 0*x folds to 0, sin(0) to 0
+    assert partial_eval(e, {"x": 0.5}) == parse_to_func("sin(k*0.5) + exp(k)")
+    assert partial_eval(e, {"k": 0, "x": 1.0}) == Constant(1)
+    assert partial_eval(e, {"k": 2.0, "x": 0.25}) == Constant(math.sin(0.5) + math.exp(2.0))
+    assert partial_eval(parse_to_func("log(x)"), {"x": -1.0}) == Func("log", Constant(-1.0))
@@ -0,0 +1,82 @@
+import pytest
+from fractions import Fraction
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.autodiff import jacobian
+from mathphysicslib.expresso import Constant, Var, Add, Mul, Pow
+from mathphysicslib.serialize import dumps, loads, save, load, ExprFile, MAGIC
+
+def test_round_trip_single_expression():
+    expr = parse_to_func("x**2*y + 3*x*y**3 + 2.5")
+    restored = loads(dumps(expr))
+    assert restored == expr
+    assert repr(restored) == repr(expr)
+
+def test_round_trip_list_shares_nodes():
+    exprs = [row[0] for row in jacobian(["x**3*y + y**2", "x*y**4"], ["x", "y"])]
+    restored = loads(dumps(exprs))
+    assert restored == exprs
+    shared = parse_to_func("x**2 + y")
+    a, b = loads(dumps([Mul(shared, 2), Pow(shared, 3)]))
+    assert a.factors[0] is b.base
+
+def test_constants_keep_their_types():
+    x = Var("x")
+    values = [7, -2**70, 0.125, Fraction(-3, 7)]
+    expr = Add(*[Mul(x, Pow(Var(f"v{i}"), Constant(v))) for i, v in enumerate(values)])
+    restored = loads(dumps(expr))
+    assert restored == expr
+    stored = [t.factors[1].exponent.value for t in restored.terms]
+    assert sorted(map(type, stored), key=str) == sorted(map(type, values), key=str)
+
+def test_equal_constants_of_different_types_round_trip_apart():
+    x = Var("x")
+    exprs = [Constant(2), Constant(2.0), Constant(Fraction(2)),
+             Pow(x, 2), Pow(x, 2.0), Pow(x, Constant(Fraction(2))),
+             Mul(Add(x, 2), Add(Var("y"), 2.0)), Add(Mul(x, 0.5), Pow(Var("y"), Constant(Fraction(1, 2))))]
+    restored = loads(dumps(exprs))
+    assert restored == exprs
+    assert [type(c.value) for c in restored[:3]] == [int, float, Fraction]
+    assert [type(p.exponent.value) for p in restored[3:6]] == [int, float, Fraction]
+    assert [type(t.terms[1].value) for t in restored[6].factors] == [int, float]
+    assert type(restored[7].terms[0].factors[1].value) is float
+    assert type(restored[7].terms[1].exponent.value) is Fraction
+
+def test_shared_subtrees_are_stored_once():
+    sub = parse_to_func("x**2 + y**2 + z**2")
+    once = len(dumps(sub))
+    many = len(dumps(Add(*[Mul(sub, Var(f"w{i}")) for i in range(20)])))
+    assert many < 20 * once
+
+def test_memory_mapped_lazy_loading(tmp_path):
+    exprs = [parse_to_func(f"x**{i} + y*{i}") for i in range(1, 50)]
+    path = tmp_path / "exprs.mplx"
+    save(exprs, path)
+    with load(path) as f:
+        assert isinstance(f, ExprFile)
+        assert len(f) == len(exprs)
+        assert f[10] == exprs[10]
+        assert len(f._built) < 10          # only the nodes expression 10 needs
+        assert list(f) == exprs
+    assert load(path, lazy=False) == exprs
+
+def test_bad_input_raises():
+    with pytest.raises(ValueError):
+        loads(b"nope")
+    with pytest.raises(ValueError):
+        loads(b"XXXX" + dumps(Var("x"))[4:])
+    with pytest.raises(ValueError):
+        loads(dumps(Var("x"))[:-2])
+    newer = bytearray(dumps(Var("x")))
+    newer[4] = 99
+    with pytest.raises(ValueError):
+        loads(bytes(newer))
+    with pytest.raises(TypeError):
+        dumps(Constant(1j))
+    assert dumps(Var("x")).startswith(MAGIC)
+
+def test_round_trip_functions():
+    exprs = [parse_to_func("sin(x)*exp(-x) + log(1 + x**2)"), parse_to_func("atan(sin(x))")]
+    restored = loads(dumps(exprs))
+    assert restored == exprs
+    assert restored[1].arg is restored[0].terms[0].factors[0]   # sin(x) stored once
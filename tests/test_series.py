@@ -0,0 +1,106 @@
+import math
+from fractions import Fraction
+
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Constant, Var, Add, Mul, Pow
+from mathphysicslib.polynomial import Poly
+from mathphysicslib.series import Series, series
+
+def test_series_geometric():
+    s = series(Pow(parse_to_func("1 + x"), -1), "x", order=5)
+    assert s.coefficients == [1, -1, 1, -1, 1, -1]
+    assert s.order == 5 and s.point == 0
+
+def test_series_fractional_power_exact():
+    s = series("(1 + x)**0.5", "x", order=3)
+    assert s.coefficients == [1, Fraction(1, 2), Fraction(-1, 8), Fraction(1, 16)]
+    assert series("(4 + x)**0.5", "x", order=1).coefficients == [2, Fraction(1, 4)]
+
+def test_series_float_mode():
+    s = series("(2 + x)**0.5", "x", order=3, mode="float")
+    assert s.coefficients[0] == pytest.approx(math.sqrt(2))
+    assert s.coefficients[1] == pytest.approx(0.5 / math.sqrt(2))
+    assert all(isinstance(c, float) for c in s.coefficients)
+    with pytest.raises(ValueError):
+        series("(2 + x)**0.5", "x", order=3)
+
+def test_series_about_point():
+    s = series("x**3", "x", point=2, order=5)
+    assert s.coefficients == [8, 12, 6, 1, 0, 0]
+    assert s(2.5) == pytest.approx(2.5 ** 3)
+
+def test_series_other_variables_are_poly_coefficients():
+    # relativistic gamma factor m*(1 + v**2)**(-1/2)
+    s = series(Mul(Var("m"), Pow(parse_to_func("1 + v**2"), -0.5)), "v", order=4)
+    m = Poly.var("m")
+    assert s.coefficients == [m, 0, m * Fraction(-1, 2), 0, m * Fraction(3, 8)]
+    assert series("(m + x)**3", "x", order=4).coefficients[:4] == [m ** 3, 3 * m ** 2, 3 * m, 1]
+
+def test_series_factors_out_leading_zeros():
+    assert series("(x + x**2)**3", "x", order=5).coefficients == [0, 0, 0, 1, 3, 3]
+    assert series("(x + x**2)**3", "x", order=2).coefficients == [0, 0, 0]
+
+def test_series_variable_exponent():
+    # (1 + x)**x = exp(x*log(1 + x)) = 1 + x**2 - x**3/2 + ...
+    assert series("(1 + x)**x", "x", order=3).coefficients == [1, 0, 1, Fraction(-1, 2)]
+    s = series("2**x", "x", order=3, mode="float")
+    assert s.coefficients == pytest.approx([math.log(2) ** k / math.factorial(k) for k in range(4)])
+
+def test_series_singular_points():
+    with pytest.raises(ValueError):
+        series(Pow(Var("x"), -1), "x")
+    with pytest.raises(ValueError):
+        series("x**0.5", "x")
+    with pytest.raises(ValueError):
+        series("x**y", "x")
+
+def test_series_to_expr_round_trip():
+    s = series("(1 + x)**4", "x", point=1, order=4)
+    expr = s.to_expr()
+    assert series(expr, "x", point=1, order=4) == s
+    assert series("x**2", "x", order=1).to_expr() == Constant(0)
+
+def test_series_arithmetic():
+    a = series("1 + x", "x", order=4)
+    assert (a ** 0.5 * a ** 0.5).coefficients == [1, 1, 0, 0, 0]
+    assert (2 * a + 1).coefficients == [3, 2, 0, 0, 0]
+    assert (a * series("1 + x", "x", order=2)).order == 2
+    with pytest.raises(ValueError):
+        a + series("1 + x", "x", point=1, order=4)
+
+def test_series_shared_subexpressions_expanded_once():
+    inner = parse_to_func("1 + x + x**2")
+    expr = Add(*[Pow(inner, k) for k in range(1, 6)])
+    s = series(expr, "x", order=3)
+    assert s == Series([5, 15, 35, 55], "x")
+
+def test_series_validation():
+    with pytest.raises(ValueError):
+        series("x", "x", order=-1)
+    with pytest.raises(ValueError):
+        series("x", "x", mode="decimal")
+    with pytest.raises(TypeError):
+        series(3, "x")
+
+def test_series_elementary_functions():
+    assert series("sin(x)", "x", order=5).coefficients == [0, 1, 0, Fraction(-1, 6), 0, Fraction(1, 120)]
+    assert series("tan(x)", "x", order=5).coefficients == [0, 1, 0, Fraction(1, 3), 0, Fraction(2, 15)]
+    assert series("exp(sin(x))", "x", order=4).coefficients == [1, 1, Fraction(1, 2), 0, Fraction(-1, 8)]
+    assert series("atan(x)", "x", order=5).coefficients == [0, 1, 0, Fraction(-1, 3), 0, Fraction(1, 5)]
+    s = series("acos(x)", "x", point=0.3, order=2, mode="float")
+    assert s[0] == pytest.approx(math.acos(0.3))
+    assert s[1] == pytest.approx(-1 / math.sqrt(1 - 0.09))
+    with pytest.raises(ValueError):
+        series("sin(x)", "x", point=1)   # sin(1) is irrational
+
+def test_series_outside_the_domain_is_not_called_irrational():
+    with pytest.raises(ValueError, match="singularity of log"):
+        series("log(x)", "x")
+    with pytest.raises(ValueError, match="outside the domain of log"):
+        series("log(x)", "x", point=-1, mode="float")
+    with pytest.raises(ValueError, match="branch point of asin"):
+        series("asin(x)", "x", point=1)
+    with pytest.raises(ValueError, match="outside the domain of acos"):
+        series("acos(x)", "x", point=2, mode="float")
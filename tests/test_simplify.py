@@ -0,0 +1,72 @@
+import gc
+from fractions import Fraction
+
+import pytest
+
+from mathphysicslib.ast_parser import parse_to_func
+from mathphysicslib.expresso import Constant, Var, Add, Mul, Pow
+from mathphysicslib.rewrite import RuleSet, subs
+from mathphysicslib.simplify import SIMPLIFY_RULES, simplify
+
+x, y, z = Var("x"), Var("y"), Var("z")
+
+def test_simplify_folds_directly_built_nodes():
+    assert simplify(Add(x)) == x
+    assert simplify(Mul(y)) == y
+    assert simplify(Pow(x, 1)) == x
+    assert simplify(Pow(Add(x, Mul(Var("k"), 0)), 2)) == Pow(x, 2)
+
+def test_simplify_exact_rational_powers():
+    assert simplify(Pow(2, Constant(-2))) == Constant(Fraction(1, 4))
+    assert simplify(Pow(Constant(Fraction(2, 3)), 2)) == Constant(Fraction(4, 9))
+    with pytest.raises(ValueError):
+        simplify(Pow(0, Constant(-1)))
+
+def test_simplify_powers():
+    assert simplify(Mul(Pow(Mul(x, y), 2), Pow(x, -1))) == Mul(x, Pow(y, 2))
+    assert simplify(Pow(Pow(x, Constant(0.5)), 4)) == Pow(x, 2)
+    assert simplify(Pow(Mul(x, 2), -1)) == Mul(Pow(x, -1), Constant(Fraction(1, 2)))
+
+def test_simplify_distributes_numeric_factor():
+    assert simplify(Add(Mul(Add(x, y), 2), Mul(x, -2))) == Mul(y, 2)
+
+def test_simplify_after_substitution():
+    e = parse_to_func("k*(x + y)**2 + (x*y)**3 + z")
+    assert simplify(subs(e, {"k": 0})) == Add(Mul(Pow(x, 3), Pow(y, 3)), z)
+    assert simplify("(x*y)**2") == Mul(Pow(x, 2), Pow(y, 2))
+
+def test_simplify_edit_costs_the_edited_path():
+    rules = RuleSet(SIMPLIFY_RULES.rules)
+    terms = [Mul(Pow(Mul(Var(f"a{i}"), Var(f"b{i}")), 2), Pow(Var(f"a{i}"), -1)) for i in range(500)]
+    simplify(Add(*terms), rules)
+    cached = rules.cache_info().rewritten
+    edited = Add(*terms[:-1], Pow(Mul(z, x), 2))
+    result = simplify(edited, rules)
+    assert result.terms[0] == Mul(Var("a0"), Pow(Var("b0"), 2))
+    assert Mul(Pow(z, 2), Pow(x, 2)) in result.terms
+    # only the new term's nodes and the new root were rewritten
+    assert rules.cache_info().rewritten - cached < 15
+
+def test_simplify_cache_lets_go_of_dropped_trees():
+    rules = RuleSet(SIMPLIFY_RULES.rules)
+    expr = Add(*[Pow(Mul(Var(f"p{i}"), x), 2) for i in range(50)])
+    simplify(expr, rules)
+    assert rules.cache_info().rewritten > 100
+    del expr
+    gc.collect()
+    assert rules.cache_info().rewritten <= 1     # only x, which is still alive
+    rules.clear_cache()
+    assert rules.cache_info().rewritten == 0
+
+def test_simplify_cache_keeps_constant_types():
+    from fractions import Fraction
+    rules = RuleSet(SIMPLIFY_RULES.rules)
+    trees = [Pow(Pow(x, Constant(base)), 3) for base in (2, 2.0, Fraction(2))]   # all alive
+    for tree in trees + trees:
+        result = simplify(tree, rules)
+        assert result == Pow(x, 6)
+        assert type(result.exponent.value) is type(tree.base.exponent.value)
+
+def test_simplify_rejects_other_input():
+    with pytest.raises(TypeError):
+        simplify(3)